@@ -1,13 +1,17 @@
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Optional
-from jose import JWTError, jwt
+from typing import Any, Dict, Optional, Tuple
+import threading
+import time
 import bcrypt
 from fastapi import Depends, HTTPException, status, Request
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, make_transient_to_detached, object_session
 from app.config import get_settings
-from app.database import get_db
-from app.models import User
+from app.database import get_async_db, get_db
+from app.models import User, UserRole, UserRoleModel
 
 settings = get_settings()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login")
@@ -26,11 +30,25 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
 
 def get_password_hash(password: str) -> str:
-    # Use minimal salt rounds for faster hashing (4 rounds = ~50ms)
-    # Production should use 10-12 rounds for better security
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=4)).decode('utf-8')
+    # Cost comes from PASSWORD_HASH_ROUNDS; each extra round doubles the time
+    rounds = settings.PASSWORD_HASH_ROUNDS
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=rounds)).decode('utf-8')
+
+def get_hash_rounds(hashed_password: str) -> Optional[int]:
+    """bcrypt cost of a stored hash ("$2b$12$..." -> 12), None if it isn't bcrypt"""
+    try:
+        return int(hashed_password.split("$")[2])
+    except (IndexError, ValueError):
+        return None
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """True if the hash is weaker than PASSWORD_HASH_ROUNDS and should be upgraded on login"""
+    rounds = get_hash_rounds(hashed_password)
+    return rounds is not None and rounds < settings.PASSWORD_HASH_ROUNDS
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
+    # python-jose pulls in cryptography; imported on first use, not at startup
+    from jose import jwt
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
@@ -40,25 +58,215 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
+class AuthCache:
+    """
+    Per-process cache of verified tokens and the user rows behind them, so a
+    repeat request skips both the JWT signature check and the user SELECT.
+    Entries live at most ttl seconds (never past the token's exp), and a user
+    is dropped as soon as a commit updates or deletes them.
+    """
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        # token -> (user id, expires at)
+        self._tokens: "OrderedDict[str, Tuple[int, float]]" = OrderedDict()
+        # user id -> (column values, expires at)
+        self._users: "OrderedDict[int, Tuple[Dict[str, Any], float]]" = OrderedDict()
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.token_hits = 0
+        self.token_misses = 0
+        self.user_hits = 0
+        self.user_misses = 0
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def _get(self, entries: OrderedDict, key):
+        if self.ttl <= 0:
+            return None
+        with self._lock:
+            entry = entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if time.time() >= expires_at:
+                del entries[key]
+                return None
+            entries.move_to_end(key)
+            return value
+
+    def _put(self, entries: OrderedDict, key, value, expires_at: float) -> None:
+        entries[key] = (value, expires_at)
+        entries.move_to_end(key)
+        while len(entries) > self.max_entries:
+            entries.popitem(last=False)
+
+    def get_user_id(self, token: str) -> Optional[int]:
+        user_id = self._get(self._tokens, token)
+        if user_id is None:
+            self.token_misses += 1
+        else:
+            self.token_hits += 1
+        return user_id
+
+    def put_token(self, token: str, user_id: int, exp: Optional[float]) -> None:
+        if self.ttl <= 0:
+            return
+        expires_at = time.time() + self.ttl
+        if exp is not None:
+            expires_at = min(expires_at, exp)
+        with self._lock:
+            self._put(self._tokens, token, user_id, expires_at)
+
+    def get_user(self, user_id: int) -> Optional[Dict[str, Any]]:
+        values = self._get(self._users, user_id)
+        if values is None:
+            self.user_misses += 1
+        else:
+            self.user_hits += 1
+        return values
+
+    def put_user(self, user: User, generation: int) -> None:
+        """Cache user's columns unless something was invalidated since generation was read"""
+        if self.ttl <= 0:
+            return
+        values = {attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs}
+        with self._lock:
+            if generation == self._generation:
+                self._put(self._users, user.id, values, time.time() + self.ttl)
+
+    def invalidate(self, user_id: int) -> None:
+        with self._lock:
+            self._generation += 1
+            self._users.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._tokens.clear()
+            self._users.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "ttl": self.ttl,
+            "tokens": len(self._tokens),
+            "users": len(self._users),
+            "token_hits": self.token_hits,
+            "token_misses": self.token_misses,
+            "user_hits": self.user_hits,
+            "user_misses": self.user_misses,
+        }
+
+auth_cache = AuthCache(ttl=settings.AUTH_CACHE_TTL, max_entries=settings.AUTH_CACHE_MAX_ENTRIES)
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _mark_user_written(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault("auth_cache_users", set()).add(target.id)
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_written_users(session):
+    for user_id in session.info.pop("auth_cache_users", ()):
+        auth_cache.invalidate(user_id)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_written_users(session):
+    session.info.pop("auth_cache_users", None)
+
+def _get_token_user_id(token: str) -> Optional[int]:
+    """User id from a bearer token, verifying its signature on a cache miss"""
+    user_id = auth_cache.get_user_id(token)
+    if user_id is None:
+        from jose import JWTError, jwt
+        try:
+            payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+            user_id = int(payload.get("sub"))
+        except (JWTError, TypeError, ValueError):
+            return None
+        auth_cache.put_token(token, user_id, payload.get("exp"))
+    return user_id
+
+def _cached_user(values: Dict[str, Any]) -> User:
+    # A detached copy of the cached row; merge(load=False) attaches it to the
+    # request session without a SELECT, relationships still lazy-load and
+    # changes commit as usual
+    user = User(**values)
+    make_transient_to_detached(user)
+    return user
+
+def _authenticate(token: str, db: Session) -> Optional[User]:
+    """User for a bearer token, or None if the token or user is not valid"""
+    user_id = _get_token_user_id(token)
+    if user_id is None:
+        return None
+
+    values = auth_cache.get_user(user_id)
+    if values is not None:
+        return db.merge(_cached_user(values), load=False)
+
+    generation = auth_cache.generation
+    user = db.query(User).filter(User.id == user_id).first()
+    if user is not None:
+        auth_cache.put_user(user, generation)
+    return user
+
+async def _authenticate_async(token: str, db: AsyncSession) -> Optional[User]:
+    """_authenticate for routes on the async session"""
+    user_id = _get_token_user_id(token)
+    if user_id is None:
+        return None
+
+    values = auth_cache.get_user(user_id)
+    if values is not None:
+        return await db.merge(_cached_user(values), load=False)
+
+    generation = auth_cache.generation
+    result = await db.execute(select(User).where(User.id == user_id))
+    user = result.scalars().first()
+    if user is not None:
+        auth_cache.put_user(user, generation)
+    return user
+
 def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        user_id: int = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
-    except JWTError:
-        raise credentials_exception
-    
-    user = db.query(User).filter(User.id == user_id).first()
+    user = _authenticate(token, db)
     if user is None:
         raise credentials_exception
     return user
 
+async def get_current_user_async(
+    token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)
+) -> User:
+    """get_current_user for async def routes; the user belongs to the request's AsyncSession"""
+    user = await _authenticate_async(token, db)
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return user
+
+def get_current_admin(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)) -> User:
+    """get_current_user, restricted to ADMIN_EMAILS and users holding the admin role"""
+    if current_user.email.lower() in {email.lower() for email in settings.ADMIN_EMAILS}:
+        return current_user
+    is_admin = db.query(UserRoleModel.id).filter(
+        UserRoleModel.user_id == current_user.id, UserRoleModel.role == UserRole.ADMIN
+    ).first()
+    if is_admin is None:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
+    return current_user
+
 def get_current_user_optional(request: Request, db: Session = Depends(get_db)) -> Optional[User]:
     """Optional authentication - returns None if no valid token provided"""
     token = get_token_from_request(request)
@@ -66,13 +274,4 @@ def get_current_user_optional(request: Request, db: Session = Depends(get_db)) -
     if not token:
         return None
     
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        user_id: int = payload.get("sub")
-        if user_id is None:
-            return None
-    except JWTError:
-        return None
-    
-    user = db.query(User).filter(User.id == user_id).first()
-    return user
+    return _authenticate(token, db)
@@ -1,3 +1,4 @@
+from functools import lru_cache
 from pydantic_settings import BaseSettings
 from typing import Optional, List
 import json
@@ -5,10 +6,31 @@ import json
 class Settings(BaseSettings):
     APP_NAME: str = "Unified Services Portal"
     DATABASE_URL: str = "sqlite:///./unified_portal.db"
+    # Defaults to DATABASE_URL with its async driver (aiosqlite / asyncpg)
+    ASYNC_DATABASE_URL: Optional[str] = None
+    
+    # Connection pool, per engine (sync and async) per worker process
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_RECYCLE: int = 1800  # seconds, -1 never recycles
+    DB_POOL_TIMEOUT: float = 30.0  # seconds to wait for a free connection
+    
+    # Apply pending schema migrations when a worker starts. Turn off when
+    # deploys run `python -m app.migrations upgrade` as a release step
+    DB_MIGRATE_ON_STARTUP: bool = True
+    
+    # SQLite connection pragmas
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
     SECRET_KEY: str = "your-secret-key-here-change-in-production"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     
+    # Users allowed on /admin and /api/internal besides those with the admin
+    # role in user_roles, as a JSON list: ["ops@example.gov.in"]
+    ADMIN_EMAILS: List[str] = []
+    
     # Server Configuration
     HOST: Optional[str] = "127.0.0.1"
     PORT: Optional[str] = "8000"
@@ -38,6 +60,74 @@ class Settings(BaseSettings):
     WHATSAPP_API_TOKEN: str = ""
     WHATSAPP_VERIFY_TOKEN: str = "my_secure_token_2024"
     
+    # Services catalog hot-reload (seconds between file checks, 0 disables)
+    SERVICES_RELOAD_INTERVAL: float = 5.0
+    
+    # Grants facet counts cache (seconds); also bounds staleness across workers
+    GRANT_FACETS_CACHE_TTL: float = 300.0
+    
+    # Compiled open grants for batch eligibility scoring (seconds), same role
+    GRANT_ELIGIBILITY_CACHE_TTL: float = 300.0
+    
+    # Grant view counts are flushed to the database this often (seconds);
+    # 0 writes every view through immediately
+    GRANT_VIEW_FLUSH_INTERVAL: float = 10.0
+    
+    # Authenticated users are cached this long (seconds) before the token and
+    # user row are checked again; 0 disables the cache
+    AUTH_CACHE_TTL: float = 30.0
+    AUTH_CACHE_MAX_ENTRIES: int = 10000
+    
+    # bcrypt cost for new hashes; weaker stored hashes are upgraded on login
+    PASSWORD_HASH_ROUNDS: int = 12
+    
+    # bcrypt runs in its own thread pool; logins beyond workers + queue get 503
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_QUEUE: int = 32
+    
+    # Shared outbound HTTP client (proxy, WhatsApp), per worker process
+    HTTP_CLIENT_MAX_CONNECTIONS: int = 100
+    HTTP_CLIENT_MAX_KEEPALIVE: int = 20
+    HTTP_CLIENT_MAX_PER_HOST: int = 10  # concurrent requests to a single host
+    HTTP_CLIENT_KEEPALIVE_EXPIRY: float = 30.0  # seconds an idle connection is kept
+    HTTP_CLIENT_CONNECT_TIMEOUT: float = 10.0
+    HTTP_CLIENT_READ_TIMEOUT: float = 30.0
+    HTTP_CLIENT_HTTP2: bool = True  # only if the h2 package is installed
+
+    # Per-host upstream guard. Requests wait this long (seconds) for one of the
+    # host's HTTP_CLIENT_MAX_PER_HOST slots before failing with 503
+    HTTP_CLIENT_HOST_QUEUE_TIMEOUT: float = 5.0
+    # Read timeout follows the host's p95 latency times this multiplier,
+    # clamped between the minimum and HTTP_CLIENT_READ_TIMEOUT
+    HTTP_CLIENT_TIMEOUT_MULTIPLIER: float = 4.0
+    HTTP_CLIENT_MIN_READ_TIMEOUT: float = 5.0
+    # Consecutive failures (transport errors, 5xx) that open a host's circuit,
+    # and how long it stays open before one probe request is let through
+    HTTP_CLIENT_BREAKER_FAILURES: int = 5
+    HTTP_CLIENT_BREAKER_COOLDOWN: float = 30.0
+
+    # Rewritten proxy pages; upstream Cache-Control wins over the defaults
+    # below, which apply when the Torrent Power portal doesn't say (seconds).
+    # Other proxied sites without freshness headers are revalidated each time
+    PROXY_CACHE_ENABLED: bool = True
+    PROXY_CACHE_DIR: str = "./proxy_cache"
+    PROXY_CACHE_MEMORY_MAX_BYTES: int = 32 * 1024 * 1024  # per worker process
+    PROXY_CACHE_DISK_MAX_BYTES: int = 256 * 1024 * 1024
+    PROXY_CACHE_MAX_ENTRY_BYTES: int = 2 * 1024 * 1024
+    PROXY_CACHE_DEFAULT_TTL: float = 60.0
+    PROXY_CACHE_STALE_WHILE_REVALIDATE: float = 300.0
+
+    # RPA job queue (rpa_submissions), worker threads per process; 0 workers
+    # only enqueues, for deployments that run the queue elsewhere
+    RPA_QUEUE_WORKERS: int = 2
+    RPA_QUEUE_POLL_INTERVAL: float = 2.0  # seconds between checks when idle
+    # Failed attempts retry after base * 2^retry_count seconds (jittered, capped)
+    RPA_RETRY_BASE_DELAY: float = 30.0
+    RPA_RETRY_MAX_DELAY: float = 900.0
+    RPA_MAX_RETRIES: int = 3
+    # A job processing longer than this is assumed orphaned and claimed again
+    RPA_JOB_TIMEOUT: float = 600.0
+
     # RPA Safety Settings
     RPA_MODE: str = "DEMO"  # DEMO, STAGING, PRODUCTION
     DEMO_BASE_URL: str = "http://localhost:8000/demo-govt"
@@ -55,7 +145,9 @@ class Settings(BaseSettings):
         env_file = ".env"
         extra = "ignore"  # This will ignore extra fields instead of raising validation errors
 
-def get_settings():
+@lru_cache
+def get_settings() -> Settings:
+    # Read .env and validate once per process; every module shares this instance
     return Settings()
 
 settings = get_settings()
@@ -0,0 +1,114 @@
+"""
+Pure ASGI CORS layer
+Header sets are built once from settings; preflights are answered without
+reaching the app, and other responses get the headers added on the way out.
+Origins that aren't configured still get the wildcard headers, the behaviour
+the old force_cors_headers fallback guaranteed, just without credentials.
+"""
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+Headers = List[Tuple[bytes, bytes]]
+
+ALLOW_ORIGIN = b"access-control-allow-origin"
+ALLOW_METHODS = b"access-control-allow-methods"
+ALLOW_HEADERS = b"access-control-allow-headers"
+ALLOW_CREDENTIALS = b"access-control-allow-credentials"
+MAX_AGE = b"access-control-max-age"
+
+ALLOWED_METHODS = b"GET,POST,PUT,PATCH,DELETE,OPTIONS"
+
+# Regex match results per Origin value; browsers send a handful of origins
+ORIGIN_CACHE_SIZE = 1024
+
+
+class CORSLayer:
+    """ASGI middleware replacing CORSMiddleware plus the force_cors_headers fallback"""
+
+    def __init__(
+        self,
+        app,
+        allow_origins: Iterable[str],
+        allow_origin_regex: Optional[str] = None,
+        allow_credentials: bool = False,
+        max_age: int = 600,
+    ):
+        self.app = app
+        allow_origins = list(allow_origins)
+        self.allow_all = "*" in allow_origins
+        self.origins = frozenset(origin.encode("latin-1") for origin in allow_origins if origin != "*")
+        self.origin_regex = re.compile(allow_origin_regex.encode("latin-1")) if allow_origin_regex else None
+        self.allow_credentials = allow_credentials and not self.allow_all
+        self._origin_cache: Dict[bytes, bool] = {}
+
+        max_age_header = (MAX_AGE, str(max_age).encode("latin-1"))
+        self.wildcard_headers: Headers = [
+            (ALLOW_ORIGIN, b"*"),
+            (ALLOW_METHODS, ALLOWED_METHODS),
+            (ALLOW_HEADERS, b"*"),
+        ]
+        self.wildcard_preflight: Headers = self.wildcard_headers + [max_age_header, (b"content-length", b"0")]
+        # Followed by the echoed origin (and requested headers on preflight)
+        self.matched_headers: Headers = [(ALLOW_METHODS, ALLOWED_METHODS), (b"vary", b"Origin")]
+        if self.allow_credentials:
+            self.matched_headers.append((ALLOW_CREDENTIALS, b"true"))
+        self.matched_preflight: Headers = self.matched_headers + [max_age_header, (b"content-length", b"0")]
+
+    def is_allowed(self, origin: bytes) -> bool:
+        allowed = self._origin_cache.get(origin)
+        if allowed is None:
+            allowed = origin in self.origins or bool(self.origin_regex and self.origin_regex.fullmatch(origin))
+            if len(self._origin_cache) >= ORIGIN_CACHE_SIZE:
+                self._origin_cache.clear()
+            self._origin_cache[origin] = allowed
+        return allowed
+
+    def response_headers(self, origin: Optional[bytes]) -> Headers:
+        if origin is None or self.allow_all or not self.is_allowed(origin):
+            return self.wildcard_headers
+        return [(ALLOW_ORIGIN, origin)] + self.matched_headers
+
+    def preflight_headers(self, origin: Optional[bytes], requested_headers: Optional[bytes]) -> Headers:
+        if origin is None or self.allow_all or not self.is_allowed(origin):
+            return self.wildcard_preflight
+        # "*" isn't a wildcard for credentialed requests, so echo what was asked for
+        return [(ALLOW_ORIGIN, origin), (ALLOW_HEADERS, requested_headers or b"*")] + self.matched_preflight
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        origin = None
+        requested_headers = None
+        for name, value in scope["headers"]:
+            if name == b"origin":
+                origin = value
+            elif name == b"access-control-request-headers":
+                requested_headers = value
+
+        if scope["method"] == "OPTIONS":
+            # Every OPTIONS is answered here, as the old fallback did
+            await send({"type": "http.response.start", "status": 204, "headers": self.preflight_headers(origin, requested_headers)})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        cors_headers = self.response_headers(origin)
+        response_started = False
+
+        async def send_with_cors(message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+                message["headers"] = [*message.get("headers", ()), *cors_headers]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_cors)
+        except Exception:
+            # Let the browser see the 500 instead of a CORS error; the
+            # exception still propagates to be logged
+            if not response_started:
+                await send({"type": "http.response.start", "status": 500, "headers": cors_headers})
+                await send({"type": "http.response.body", "body": b"Internal Server Error"})
+            raise
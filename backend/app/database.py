@@ -1,7 +1,11 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from sqlalchemy.orm import sessionmaker
 from app.config import get_settings
+from app.db_pool import PoolMetrics, apply_sqlite_pragmas, instrumented_pool
 
 settings = get_settings()
 database_url = settings.DATABASE_URL
@@ -10,9 +14,40 @@ database_url = settings.DATABASE_URL
 if database_url.startswith("postgres://"):
     database_url = database_url.replace("postgres://", "postgresql://", 1)
 
+is_sqlite = database_url.startswith("sqlite")
+# In-memory SQLite can't be pooled; it keeps its single-connection pool
+pooled = not (is_sqlite and ":memory:" in database_url)
+
+sync_pool_metrics = PoolMetrics("sync")
+async_pool_metrics = PoolMetrics("async")
+
+def pool_args(pool_class, metrics: PoolMetrics) -> dict:
+    if not pooled:
+        return {}
+    return {
+        "poolclass": instrumented_pool(pool_class, metrics),
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+    }
+
+def tune_sqlite(target_engine) -> None:
+    if is_sqlite and pooled:
+        apply_sqlite_pragmas(
+            target_engine,
+            journal_mode=settings.SQLITE_JOURNAL_MODE,
+            synchronous=settings.SQLITE_SYNCHRONOUS,
+            busy_timeout_ms=settings.SQLITE_BUSY_TIMEOUT_MS,
+        )
+
 # SQLite needs connect_args for check_same_thread
-connect_args = {"check_same_thread": False} if "sqlite" in database_url else {}
-engine = create_engine(database_url, connect_args=connect_args, pool_pre_ping=True)
+connect_args = {"check_same_thread": False} if is_sqlite else {}
+engine = create_engine(
+    database_url, connect_args=connect_args, pool_pre_ping=True,
+    **pool_args(QueuePool, sync_pool_metrics)
+)
+tune_sqlite(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
@@ -22,3 +57,45 @@ def get_db():
         yield db
     finally:
         db.close()
+
+# Async drivers for the same database, used by async def routes so queries
+# don't block the event loop. ASYNC_DATABASE_URL overrides the guess.
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+def get_async_database_url(url: str) -> str:
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {backend}; set ASYNC_DATABASE_URL")
+    query = dict(parsed.query)
+    if backend == "postgresql" and "sslmode" in query:
+        # asyncpg spells libpq's sslmode as ssl
+        query["ssl"] = query.pop("sslmode")
+    return parsed.set(drivername=ASYNC_DRIVERS[backend], query=query).render_as_string(hide_password=False)
+
+# Pooled explicitly: aiosqlite would otherwise default to NullPool, a new
+# connection (and thread) per session
+async_engine = create_async_engine(
+    settings.ASYNC_DATABASE_URL or get_async_database_url(database_url),
+    pool_pre_ping=True,
+    **pool_args(AsyncAdaptedQueuePool, async_pool_metrics)
+)
+tune_sqlite(async_engine.sync_engine)
+# Objects stay loaded after commit; async sessions can't lazy-load on attribute access
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def get_pool_stats() -> dict:
+    """Gauges and checkout wait histograms for both engines' pools"""
+    return {
+        "sync": sync_pool_metrics.snapshot(engine.pool),
+        "async": async_pool_metrics.snapshot(async_engine.sync_engine.pool),
+    }
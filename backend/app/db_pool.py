@@ -0,0 +1,105 @@
+"""
+Connection pool tuning and metrics
+Pool classes that time every checkout, plus the SQLite pragmas applied to
+each new connection
+"""
+import bisect
+import threading
+import time
+from typing import Any, Dict, List, Type
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import Pool
+
+# Upper bounds (ms) of the checkout wait histogram buckets
+WAIT_BUCKETS_MS = [1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000]
+
+# Reported key -> QueuePool method
+POOL_GAUGES = {
+    "size": "size",
+    "checked_out": "checkedout",
+    "checked_in": "checkedin",
+    "overflow": "overflow",
+}
+
+
+class PoolMetrics:
+    """Checkout wait-time histogram and timeout count for one pool"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._counts: List[int] = [0] * (len(WAIT_BUCKETS_MS) + 1)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total_ms = 0.0
+        self.wait_max_ms = 0.0
+
+    def observe(self, wait_ms: float) -> None:
+        with self._lock:
+            self._counts[bisect.bisect_left(WAIT_BUCKETS_MS, wait_ms)] += 1
+            self.checkouts += 1
+            self.wait_total_ms += wait_ms
+            self.wait_max_ms = max(self.wait_max_ms, wait_ms)
+
+    def timed_out(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self, pool: Pool) -> Dict[str, Any]:
+        with self._lock:
+            histogram = {f"le_{bound}ms": count for bound, count in zip(WAIT_BUCKETS_MS, self._counts)}
+            histogram["le_inf"] = self._counts[-1]
+            stats = {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_avg_ms": round(self.wait_total_ms / self.checkouts, 3) if self.checkouts else 0.0,
+                "wait_max_ms": round(self.wait_max_ms, 3),
+                "wait_histogram": histogram,
+            }
+        # QueuePool exposes its gauges; other pools (SQLite :memory:) don't
+        for key, gauge in POOL_GAUGES.items():
+            method = getattr(pool, gauge, None)
+            if callable(method):
+                stats[key] = method()
+        stats["pool"] = getattr(pool, "base_name", type(pool).__name__)
+        stats["status"] = pool.status()
+        return stats
+
+
+class _InstrumentedPool:
+    """Mixin timing how long _do_get waits for a connection"""
+
+    metrics: PoolMetrics
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.timed_out()
+            raise
+        self.metrics.observe((time.perf_counter() - start) * 1000)
+        return connection
+
+
+def instrumented_pool(pool_class: Type[Pool], metrics: PoolMetrics) -> Type[Pool]:
+    """pool_class subclass reporting to metrics; survives Pool.recreate() on dispose"""
+    return type(
+        f"Instrumented{pool_class.__name__}",
+        (_InstrumentedPool, pool_class),
+        {"metrics": metrics, "base_name": pool_class.__name__}
+    )
+
+
+def apply_sqlite_pragmas(engine: Engine, journal_mode: str, synchronous: str, busy_timeout_ms: int) -> None:
+    """Set WAL, synchronous and busy_timeout on every new SQLite connection"""
+
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"PRAGMA busy_timeout = {int(busy_timeout_ms)}")
+        cursor.execute(f"PRAGMA journal_mode = {journal_mode}")
+        cursor.execute(f"PRAGMA synchronous = {synchronous}")
+        cursor.close()
@@ -0,0 +1,156 @@
+"""
+Streaming HTML rewriter for the portal proxy
+One regex scan per chunk finds everything that needs changing: X-Frame-Options
+meta tags are dropped, src/href/action attributes are resolved against the
+page URL and a snippet is injected before </body>. Script/style bodies and
+comments are copied through untouched. Only the text from the last '<' of a
+chunk is held back, so memory stays flat however large the page is.
+"""
+import re
+from typing import Dict, Optional
+from urllib.parse import urljoin, urlsplit
+
+# Leftmost of: comment, script/style start tag, meta tag, </body>, URL attribute.
+# Every branch starts at '<' or whitespace so the scan can skip ahead on that
+# character class instead of trying each alternative at every position
+EVENT = re.compile(
+    r"""[<\s](?:"""
+    r"""(?<=<)(!--)"""
+    r"""|(?<=<)((?i:script|style))\b((?:[^>"']|"[^"]*"|'[^']*')*)>"""
+    r"""|(?<=<)((?i:meta)\b(?:[^>"']|"[^"]*"|'[^']*')*>)"""
+    r"""|(?<=<)(/(?i:body)\s*>)"""
+    r"""|(?<=\s)((?i:src|href|action)\s*=\s*)(?:"([^"]*)"|'([^']*)'|([^\s"'>]+))"""
+    r""")"""
+)
+URL_ATTRIBUTE = re.compile(r"""(\s(?:src|href|action)\s*=\s*)(?:"([^"]*)"|'([^']*)'|([^\s"'>]+))""", re.IGNORECASE)
+HAS_SCHEME = re.compile(r"[A-Za-z][A-Za-z0-9+.-]*:")
+FRAME_OPTIONS = re.compile(r"""http-equiv\s*=\s*["']?X-Frame-Options""", re.IGNORECASE)
+RAW_TEXT_END = {
+    "script": re.compile(r"</script[\s/>]", re.IGNORECASE),
+    "style": re.compile(r"</style[\s/>]", re.IGNORECASE),
+}
+
+# Longest end-of-raw-text marker that can be split across chunks ("</script" + 1)
+RAW_TEXT_TAIL = 9
+# Held-back text is processed as is once it grows past this (e.g. a never-closed tag)
+MAX_PENDING = 64 * 1024
+# Resolved URLs per page; navigation links and assets repeat a lot
+URL_CACHE_SIZE = 4096
+
+
+class HTMLRewriter:
+    """Incremental rewriter: feed() text chunks, then close() for the remainder"""
+
+    def __init__(self, page_url: str, inject_before_body_end: str = ""):
+        self.page_url = page_url
+        parts = urlsplit(page_url)
+        self.origin = f"{parts.scheme}://{parts.netloc}"
+        self.inject = inject_before_body_end
+        self._pending = ""
+        self._raw_text_end: Optional[re.Pattern] = None
+        self._resolved: Dict[str, str] = {}
+
+    def feed(self, chunk: str) -> str:
+        data = self._pending + chunk if self._pending else chunk
+        self._pending = ""
+        return self._rewrite(data, final=False)
+
+    def close(self) -> str:
+        data, self._pending = self._pending, ""
+        return self._rewrite(data, final=True) if data else ""
+
+    def _rewrite(self, data: str, final: bool) -> str:
+        out = []
+        pos = 0
+        end = len(data)
+        if not final:
+            # A tag or attribute may continue in the next chunk
+            last_tag = data.rfind("<")
+            if last_tag >= 0 and end - last_tag <= MAX_PENDING:
+                end = last_tag
+
+        while True:
+            if self._raw_text_end is not None:
+                # Inside <script>/<style>: copy through to the closing tag
+                match = self._raw_text_end.search(data, pos)
+                if match is None:
+                    keep = len(data) if final else max(pos, len(data) - RAW_TEXT_TAIL)
+                    out.append(data[pos:keep])
+                    pos = keep
+                    end = keep
+                    break
+                out.append(data[pos:match.start()])
+                pos = match.start()
+                self._raw_text_end = None
+                if end < pos:
+                    end = pos
+
+            match = EVENT.search(data, pos, end)
+            if match is None:
+                out.append(data[pos:end])
+                pos = end
+                break
+            out.append(data[pos:match.start()])
+            pos = match.end()
+
+            if match.group(1):
+                close = data.find("-->", pos)
+                if close < 0:
+                    if final or len(data) - match.start() > MAX_PENDING:
+                        out.append(data[match.start():])
+                        pos = end = len(data)
+                    else:
+                        pos = end = match.start()
+                    break
+                out.append(data[match.start():close + 3])
+                pos = close + 3
+                if end < pos:
+                    end = pos
+            elif match.group(2):
+                attributes = match.group(3)
+                out.append(f"<{match.group(2)}{URL_ATTRIBUTE.sub(self._absolute_url, attributes)}>")
+                if not attributes.rstrip().endswith("/"):
+                    self._raw_text_end = RAW_TEXT_END[match.group(2).lower()]
+            elif match.group(4):
+                if not FRAME_OPTIONS.search(match.group(4)):
+                    out.append(match.group(0))
+            elif match.group(5):
+                if self.inject:
+                    out.append(self.inject)
+                    self.inject = ""
+                out.append(match.group(0))
+            else:
+                out.append(data[match.start()])
+                out.append(self._absolute_url(match, 6))
+
+        self._pending = data[pos:]
+        return "".join(out)
+
+    def _absolute_url(self, match: re.Match, group: int = 1) -> str:
+        prefix, double, single, bare = match.group(group, group + 1, group + 2, group + 3)
+        value = double if double is not None else single if single is not None else bare
+        quote = "'" if single is not None else '"'
+        return f"{prefix}{quote}{self._resolve(value)}{quote}"
+
+    def _resolve(self, value: str) -> str:
+        url = self._resolved.get(value)
+        if url is None:
+            if value.startswith("/") and not value.startswith("//"):
+                url = self.origin + value
+            elif value.startswith("#") or HAS_SCHEME.match(value):
+                url = value
+            else:
+                try:
+                    url = urljoin(self.page_url, value)
+                except ValueError:
+                    # Malformed URL (e.g. a broken IPv6 host), leave it to the browser
+                    url = value
+            if len(self._resolved) < URL_CACHE_SIZE:
+                self._resolved[value] = url
+        return url
+
+
+def rewrite_html(html: str, page_url: str, inject_before_body_end: str = "") -> str:
+    """Rewrite a whole document at once"""
+    rewriter = HTMLRewriter(page_url, inject_before_body_end)
+    return rewriter.feed(html) + rewriter.close()
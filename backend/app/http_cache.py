@@ -0,0 +1,68 @@
+"""
+Pre-serialized JSON responses with strong ETags
+Used by endpoints whose payload only changes when the underlying data does
+"""
+import hashlib
+import json
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+from fastapi import Request, Response
+
+
+class ResponseCache:
+    """Serialized bodies and ETags keyed by endpoint, for one data version"""
+
+    def __init__(self):
+        self._entries: Dict[str, Tuple[bytes, str]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str, build: Callable[[], Any]) -> Tuple[bytes, str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is None:
+                    entry = serialize(build())
+                    self._entries[key] = entry
+        return entry
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries = {}
+
+
+def serialize(payload: Any) -> Tuple[bytes, str]:
+    """Encode payload the same way JSONResponse does and derive a strong ETag"""
+    body = json.dumps(
+        payload,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+    etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+    return body, etag
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        # If-None-Match uses weak comparison
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def cached_json_response(request: Request, cache: ResponseCache, key: str, build: Callable[[], Any]) -> Response:
+    """Serve a cached body, or 304 Not Modified when the client already has it"""
+    body, etag = cache.get(key, build)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
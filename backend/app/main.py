@@ -1,20 +1,49 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
-from fastapi import Request, Response
 import json
-from app.database import engine, Base
-from app.routers import auth, users, services, applications, services_api, whatsapp, documents, services_data, portal_redirect, proxy, grants, admin, automation
+from app.cors import CORSLayer
+from app.database import async_engine, engine
+from app.routers import auth, users, services, applications, services_api, whatsapp, documents, services_data, portal_redirect, proxy, grants, admin, automation, internal
 from app.config import get_settings
+from app.seed_data.service_loader import get_service_loader
+from app.migrations import ensure_schema
+from app.services.grant_views_service import grant_views_service
+from app.services.password_hashing_service import password_hashing_service
+from app.services.http_client_service import http_client_service
+from app.services.proxy_assets_service import proxy_assets_service
+from app.services.rpa_queue_service import rpa_queue_service
 
 settings = get_settings()
 
-# Create database tables (only creates if they don't exist)
-Base.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One version lookup instead of inspecting every table on each boot;
+    # schema changes come from `python -m app.migrations upgrade`
+    ensure_schema(engine, migrate=settings.DB_MIGRATE_ON_STARTUP)
+    # Pick up edits to services_data.json without restarting workers
+    service_loader = get_service_loader()
+    service_loader.start_watching(settings.SERVICES_RELOAD_INTERVAL)
+    # Batch grant view counts instead of a write per detail view
+    grant_views_service.start(engine, settings.GRANT_VIEW_FLUSH_INTERVAL)
+    # Keep-alive connection pool shared by the proxy and WhatsApp calls
+    http_client_service.start()
+    # Minify and fingerprint the scripts injected into proxied pages
+    proxy_assets_service.load()
+    # Portal automation jobs from rpa_submissions, processed off the request path
+    rpa_queue_service.start(engine, settings.RPA_QUEUE_WORKERS, settings.RPA_QUEUE_POLL_INTERVAL)
+    yield
+    rpa_queue_service.stop()
+    await http_client_service.close()
+    password_hashing_service.shutdown()
+    grant_views_service.stop()
+    service_loader.stop_watching()
+    await async_engine.dispose()
 
 app = FastAPI(
     title=settings.APP_NAME,
     description="Unified Portal for Gas, Electricity, Water & Property Services",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 def parse_cors_origins():
@@ -41,44 +70,23 @@ def parse_cors_origins():
 
 cors_origins, allow_credentials, cors_origin_regex = parse_cors_origins()
 
-# CORS middleware
+# Single pure-ASGI layer: answers every OPTIONS itself and adds the
+# Access-Control-* headers (wildcard for unlisted origins) to all responses
 app.add_middleware(
-    CORSMiddleware,
+    CORSLayer,
     allow_origins=cors_origins,
     allow_origin_regex=cors_origin_regex,
     allow_credentials=allow_credentials,
-    allow_methods=["*"],
-    allow_headers=["*"],
 )
 
-# Hard CORS fallback for Render/browser preflight edge cases.
-# This guarantees Access-Control-* headers even when upstream config drifts.
-@app.middleware("http")
-async def force_cors_headers(request: Request, call_next):
-    cors_headers = {
-        "Access-Control-Allow-Origin": "*",
-        "Access-Control-Allow-Methods": "GET,POST,PUT,PATCH,DELETE,OPTIONS",
-        "Access-Control-Allow-Headers": "*",
-    }
-
-    if request.method == "OPTIONS":
-        return Response(status_code=204, headers=cors_headers)
-
-    try:
-        response = await call_next(request)
-    except Exception:
-        response = Response(status_code=500)
-
-    for key, value in cors_headers.items():
-        response.headers[key] = value
-    return response
-
 # Include routers
 app.include_router(auth.router)
 app.include_router(users.router)
 app.include_router(services.router)
-app.include_router(services_api.router)
+# services_data has fixed paths (/data, /stats, /search ...) that the
+# catch-all /{category} route in services_api would otherwise shadow
 app.include_router(services_data.router)
+app.include_router(services_api.router)
 app.include_router(portal_redirect.router)
 app.include_router(applications.router)
 app.include_router(automation.router)  # Automation routes
@@ -87,6 +95,7 @@ app.include_router(whatsapp.router)
 app.include_router(proxy.router)
 app.include_router(grants.router)
 app.include_router(admin.router)  # Admin panel routes
+app.include_router(internal.router)  # Pool metrics
 
 @app.get("/")
 def root():
@@ -0,0 +1,142 @@
+"""
+Versioned schema migrations
+Every vNNNN_<name>.py module in this package is one migration with a
+`description` and an `upgrade(connection)`. Applied versions are recorded in
+the schema_migrations table, so the app only reads one row on boot instead of
+inspecting every table.
+
+    python -m app.migrations upgrade    # apply pending migrations
+    python -m app.migrations status     # list migrations and what's applied
+
+Migrations must be idempotent (checkfirst / IF NOT EXISTS): databases created
+before versioning already have the v0001 tables, and on a fresh database
+v0001 creates the current models, which may include what later versions add.
+"""
+import importlib
+import logging
+import pkgutil
+import re
+from collections import namedtuple
+from typing import Callable, List, Optional
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, func, select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError, IntegrityError
+
+logger = logging.getLogger(__name__)
+
+Migration = namedtuple("Migration", ["version", "name", "description", "upgrade"])
+
+MODULE_NAME = re.compile(r"^v(\d{4})_(\w+)$")
+
+# Arbitrary key for pg_advisory_xact_lock, serializes concurrent upgrades
+PG_LOCK_KEY = 7_204_511
+
+# Kept off Base.metadata so create_all in migrations never touches it
+migrations_table = Table(
+    "schema_migrations",
+    MetaData(),
+    Column("version", Integer, primary_key=True),
+    Column("name", String(100), nullable=False),
+    Column("applied_at", DateTime(timezone=True), server_default=func.now()),
+)
+
+
+def load_migrations() -> List[Migration]:
+    """All migrations in this package, ordered by version"""
+    migrations = []
+    for module_info in pkgutil.iter_modules(__path__):
+        match = MODULE_NAME.match(module_info.name)
+        if not match:
+            continue
+        module = importlib.import_module(f"{__name__}.{module_info.name}")
+        migrations.append(Migration(int(match.group(1)), match.group(2), module.description, module.upgrade))
+    migrations.sort(key=lambda migration: migration.version)
+    versions = [migration.version for migration in migrations]
+    if len(set(versions)) != len(versions):
+        raise RuntimeError(f"Duplicate migration versions: {versions}")
+    return migrations
+
+
+def latest_version() -> int:
+    migrations = load_migrations()
+    return migrations[-1].version if migrations else 0
+
+
+def current_version(engine: Engine) -> int:
+    """Highest applied version, 0 for a database that was never migrated"""
+    try:
+        with engine.connect() as conn:
+            return conn.execute(select(func.max(migrations_table.c.version))).scalar() or 0
+    except DBAPIError:
+        # schema_migrations doesn't exist yet
+        return 0
+
+
+def applied_versions(engine: Engine) -> dict:
+    try:
+        with engine.connect() as conn:
+            rows = conn.execute(select(migrations_table.c.version, migrations_table.c.applied_at)).all()
+    except DBAPIError:
+        return {}
+    return {version: applied_at for version, applied_at in rows}
+
+
+def upgrade(engine: Engine, target: Optional[int] = None, log: Callable[[str], None] = logger.info) -> List[int]:
+    """Apply pending migrations up to target (default: latest), returns the versions applied"""
+    with engine.begin() as conn:
+        migrations_table.create(conn, checkfirst=True)
+
+    applied = []
+    for migration in load_migrations():
+        if target is not None and migration.version > target:
+            break
+        try:
+            with engine.begin() as conn:
+                if conn.dialect.name == "postgresql":
+                    conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": PG_LOCK_KEY})
+                done = conn.execute(
+                    select(migrations_table.c.version).where(migrations_table.c.version == migration.version)
+                ).first()
+                if done:
+                    continue
+                log(f"Applying migration {migration.version:04d} {migration.name}: {migration.description}")
+                migration.upgrade(conn)
+                conn.execute(migrations_table.insert().values(version=migration.version, name=migration.name))
+        except IntegrityError:
+            # Another process recorded this version first (SQLite has no advisory locks)
+            continue
+        applied.append(migration.version)
+    return applied
+
+
+def ensure_schema(engine: Engine, migrate: bool) -> int:
+    """
+    Startup check: one query for the applied version. Runs pending migrations
+    if migrate is set, otherwise only warns. Returns the version in use.
+    """
+    version = current_version(engine)
+    latest = latest_version()
+    if version >= latest:
+        return version
+    if migrate:
+        upgrade(engine)
+        return latest
+    logger.warning(
+        f"Database schema is at version {version}, code expects {latest}; "
+        f"run `python -m app.migrations upgrade`"
+    )
+    return version
+
+
+def status(engine: Engine) -> List[dict]:
+    applied = applied_versions(engine)
+    return [
+        {
+            "version": migration.version,
+            "name": migration.name,
+            "description": migration.description,
+            "applied_at": applied.get(migration.version),
+        }
+        for migration in load_migrations()
+    ]
@@ -0,0 +1,39 @@
+"""
+Schema migration command
+
+    python -m app.migrations upgrade [--to VERSION]
+    python -m app.migrations status
+"""
+import argparse
+import logging
+import sys
+
+from app.database import engine
+from app.migrations import current_version, latest_version, status, upgrade
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.migrations", description="Database schema migrations")
+    commands = parser.add_subparsers(dest="command", required=True)
+    upgrade_parser = commands.add_parser("upgrade", help="apply pending migrations")
+    upgrade_parser.add_argument("--to", type=int, dest="target", help="stop after this version")
+    commands.add_parser("status", help="show applied and pending migrations")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    if args.command == "upgrade":
+        applied = upgrade(engine, target=args.target, log=print)
+        print(f"[OK] Schema at version {current_version(engine)} ({len(applied)} applied)")
+        return 0
+
+    for migration in status(engine):
+        applied_at = migration["applied_at"]
+        state = f"applied {applied_at:%Y-%m-%d %H:%M}" if applied_at else "pending"
+        print(f"{migration['version']:04d} {migration['name']:<30} {state:<24} {migration['description']}")
+    print(f"Current version {current_version(engine)}, latest {latest_version()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,11 @@
+"""Every table defined by the models when versioned migrations were introduced"""
+from sqlalchemy.engine import Connection
+
+description = "Create application tables"
+
+
+def upgrade(connection: Connection) -> None:
+    from app.database import Base
+    import app.models  # noqa: F401 - registers every table (grants, security, demo) on Base.metadata
+
+    Base.metadata.create_all(bind=connection, checkfirst=True)
@@ -0,0 +1,22 @@
+"""Full-text index for grant search (FTS5 table + triggers, or tsvector GIN)"""
+import logging
+
+from sqlalchemy.engine import Connection
+
+from app.services.grant_search_service import grant_search_service
+
+logger = logging.getLogger(__name__)
+
+description = "Create grant full-text search index"
+
+
+def upgrade(connection: Connection) -> None:
+    # Optional: without it search falls back to ILIKE, so a SQLite build
+    # lacking FTS5 shouldn't block every later migration
+    savepoint = connection.begin_nested()
+    try:
+        grant_search_service.create_index(connection)
+        savepoint.commit()
+    except Exception as e:
+        savepoint.rollback()
+        logger.warning(f"Grant full-text search unavailable, using ILIKE: {e}")
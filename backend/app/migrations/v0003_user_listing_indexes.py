@@ -0,0 +1,23 @@
+"""Composite (user_id, created_at) indexes behind the per-user listing queries"""
+from sqlalchemy.engine import Connection
+
+description = "Add user_id/created_at indexes for per-user listings"
+
+INDEXES = [
+    "ix_documents_user_id_created_at",
+    "ix_applications_user_id_created_at",
+    "ix_grant_applications_user_id_created_at",
+    "ix_electricity_accounts_user_id_created_at",
+    "ix_gas_accounts_user_id_created_at",
+    "ix_water_accounts_user_id_created_at",
+    "ix_property_accounts_user_id_created_at",
+]
+
+
+def upgrade(connection: Connection) -> None:
+    from app.database import Base
+    import app.models  # noqa: F401
+
+    indexes = {index.name: index for table in Base.metadata.tables.values() for index in table.indexes}
+    for name in INDEXES:
+        indexes[name].create(bind=connection, checkfirst=True)
@@ -0,0 +1,79 @@
+"""RPA job queue columns on rpa_submissions, and application_id made optional"""
+from sqlalchemy import (
+    JSON, Column, DateTime, Enum, ForeignKey, Index, Integer, MetaData, String, Table, Text, func, inspect,
+)
+from sqlalchemy.engine import Connection
+
+description = "Add RPA job queue columns and claim index"
+
+QUEUE_COLUMNS = ["next_attempt_at", "locked_by", "locked_at", "job_token"]
+
+# rpa_submissions as of this version, frozen here so later model changes
+# don't alter what this migration builds
+metadata = MetaData()
+Table("applications", metadata, Column("id", Integer, primary_key=True))
+rpa_submissions = Table(
+    "rpa_submissions",
+    metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("application_id", Integer, ForeignKey("applications.id"), nullable=True),
+    Column("target_website", String(255)),
+    Column("target_url", String(500)),
+    Column("status", Enum("QUEUED", "PROCESSING", "SUCCESS", "FAILED", "RETRY", name="rpasubmissionstatus")),
+    Column("submission_data", JSON),
+    Column("response_data", JSON),
+    Column("confirmation_number", String(100)),
+    Column("error_message", Text),
+    Column("retry_count", Integer),
+    Column("max_retries", Integer),
+    Column("next_attempt_at", DateTime(timezone=True)),
+    Column("locked_by", String(100)),
+    Column("locked_at", DateTime(timezone=True)),
+    Column("job_token", String(64), unique=True, index=True),
+    Column("started_at", DateTime(timezone=True)),
+    Column("completed_at", DateTime(timezone=True)),
+    Column("created_at", DateTime(timezone=True), server_default=func.now()),
+    Index("ix_rpa_submissions_status_next_attempt_at", "status", "next_attempt_at"),
+)
+
+
+def rebuild_sqlite_table(connection: Connection, table) -> None:
+    """SQLite can't drop NOT NULL in place: copy the rows into a fresh table"""
+    old_columns = [column["name"] for column in inspect(connection).get_columns(table.name)]
+    for index in inspect(connection).get_indexes(table.name):
+        connection.exec_driver_sql(f'DROP INDEX "{index["name"]}"')
+    connection.exec_driver_sql(f'ALTER TABLE "{table.name}" RENAME TO "{table.name}_old"')
+    table.create(bind=connection)
+    columns = ", ".join(f'"{name}"' for name in old_columns)
+    connection.exec_driver_sql(f'INSERT INTO "{table.name}" ({columns}) SELECT {columns} FROM "{table.name}_old"')
+    connection.exec_driver_sql(f'DROP TABLE "{table.name}_old"')
+
+
+def upgrade(connection: Connection) -> None:
+    table = rpa_submissions
+    existing = {column["name"]: column for column in inspect(connection).get_columns(table.name)}
+    missing = [name for name in QUEUE_COLUMNS if name not in existing]
+
+    if connection.dialect.name == "sqlite":
+        if missing or not existing["application_id"]["nullable"]:
+            # SQLite DDL is transactional, but pysqlite only opens a transaction
+            # for DML. Open one explicitly so a failure partway through the
+            # rebuild rolls back to the original table with this migration
+            # still pending; the runner's commit ends it.
+            dbapi_connection = connection.connection.dbapi_connection
+            if not dbapi_connection.in_transaction:
+                connection.exec_driver_sql("BEGIN")
+            rebuild_sqlite_table(connection, table)
+    else:
+        for name in missing:
+            column_type = table.c[name].type.compile(dialect=connection.dialect)
+            connection.exec_driver_sql(f"ALTER TABLE {table.name} ADD COLUMN {name} {column_type}")
+        if not existing["application_id"]["nullable"]:
+            connection.exec_driver_sql(f"ALTER TABLE {table.name} ALTER COLUMN application_id DROP NOT NULL")
+
+    # Rows queued before the worker existed are due straight away
+    connection.execute(
+        table.update().where(table.c.next_attempt_at.is_(None)).values(next_attempt_at=table.c.created_at)
+    )
+    for index in table.indexes:
+        index.create(bind=connection, checkfirst=True)
@@ -0,0 +1,18 @@
+"""Composite (priority, status, id) index behind the keyset-paginated grant listing"""
+from sqlalchemy.engine import Connection
+
+description = "Add priority/status/id index for grant keyset pagination"
+
+INDEXES = [
+    "ix_grants_priority_status_id",
+]
+
+
+def upgrade(connection: Connection) -> None:
+    from app.database import Base
+    import app.models  # noqa: F401
+
+    # A name can have one variant per dialect (ddl_if); create() skips the others
+    for index in Base.metadata.tables["grants"].indexes:
+        if index.name in INDEXES:
+            index.create(bind=connection, checkfirst=True)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON, Enum, Text
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON, Enum, Text, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
@@ -96,6 +96,11 @@ class Document(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     user = relationship("User", back_populates="documents")
+    
+    __table_args__ = (
+        # Per-user listings filter on user_id and sort newest first
+        Index("ix_documents_user_id_created_at", user_id, created_at),
+    )
 
 class ElectricityAccount(Base):
     __tablename__ = "electricity_accounts"
@@ -111,6 +116,10 @@ class ElectricityAccount(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     user = relationship("User", back_populates="electricity_accounts")
+    
+    __table_args__ = (
+        Index("ix_electricity_accounts_user_id_created_at", user_id, created_at),
+    )
 
 
 class GasAccount(Base):
@@ -126,6 +135,10 @@ class GasAccount(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     user = relationship("User", back_populates="gas_accounts")
+    
+    __table_args__ = (
+        Index("ix_gas_accounts_user_id_created_at", user_id, created_at),
+    )
 
 class WaterAccount(Base):
     __tablename__ = "water_accounts"
@@ -141,6 +154,10 @@ class WaterAccount(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     user = relationship("User", back_populates="water_accounts")
+    
+    __table_args__ = (
+        Index("ix_water_accounts_user_id_created_at", user_id, created_at),
+    )
 
 class PropertyAccount(Base):
     __tablename__ = "property_accounts"
@@ -159,6 +176,10 @@ class PropertyAccount(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     user = relationship("User", back_populates="property_accounts")
+    
+    __table_args__ = (
+        Index("ix_property_accounts_user_id_created_at", user_id, created_at),
+    )
 
 class Application(Base):
     __tablename__ = "applications"
@@ -176,6 +197,10 @@ class Application(Base):
     
     user = relationship("User", back_populates="applications")
     rpa_submissions = relationship("RPASubmission", back_populates="application")
+    
+    __table_args__ = (
+        Index("ix_applications_user_id_created_at", user_id, created_at),
+    )
 
 class RPASubmissionStatus(str, enum.Enum):
     QUEUED = "queued"
@@ -188,7 +213,8 @@ class RPASubmission(Base):
     __tablename__ = "rpa_submissions"
     
     id = Column(Integer, primary_key=True, index=True)
-    application_id = Column(Integer, ForeignKey("applications.id"), nullable=False)
+    # Unset for jobs submitted straight to /api/automation
+    application_id = Column(Integer, ForeignKey("applications.id"), nullable=True)
     target_website = Column(String(255))  # torrent-power, adani-gas, etc.
     target_url = Column(String(500))
     status = Column(Enum(RPASubmissionStatus), default=RPASubmissionStatus.QUEUED)
@@ -198,11 +224,20 @@ class RPASubmission(Base):
     error_message = Column(Text)
     retry_count = Column(Integer, default=0)
     max_retries = Column(Integer, default=3)
+    next_attempt_at = Column(DateTime(timezone=True))  # queued/retry jobs wait until then
+    locked_by = Column(String(100))  # worker that claimed the job
+    locked_at = Column(DateTime(timezone=True))
+    # Unguessable handle for polling jobs that aren't tied to an application
+    job_token = Column(String(64), unique=True, index=True)
     started_at = Column(DateTime(timezone=True))
     completed_at = Column(DateTime(timezone=True))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     application = relationship("Application", back_populates="rpa_submissions")
+    
+    __table_args__ = (
+        Index("ix_rpa_submissions_status_next_attempt_at", status, next_attempt_at),
+    )
 
 # Demo Government Website Data
 class DemoTorrentApplication(Base):
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON, Enum, Text, Float, Boolean, Date
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON, Enum, Text, Float, Boolean, Date, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
@@ -87,6 +87,20 @@ class Grant(Base):
     
     # Relationships
     applications = relationship("GrantApplication", back_populates="grant", foreign_keys="GrantApplication.grant_id")
+    
+    __table_args__ = (
+        # Matches GRANT_LISTING_ORDER so keyset pagination is an index range scan.
+        # SQLite sorts NULL lowest and rejects NULLS in CREATE INDEX, so its plain
+        # index already has that order; PostgreSQL needs it spelled out
+        Index("ix_grants_priority_status_id", priority.desc(), status, id).ddl_if(dialect="sqlite"),
+        Index(
+            "ix_grants_priority_status_id", priority.desc().nulls_last(), status.nulls_first(), id
+        ).ddl_if(callable_=lambda ddl, target, bind, dialect, **kw: dialect.name != "sqlite"),
+    )
+
+# Grant listing order, featured first. NULLs get a fixed place (no priority
+# last, no status first) that listing cursors rely on
+GRANT_LISTING_ORDER = (Grant.priority.desc().nulls_last(), Grant.status.nulls_first(), Grant.id)
 
 class GrantApplicationStatus(str, enum.Enum):
     DRAFT = "draft"
@@ -141,6 +155,11 @@ class GrantApplication(Base):
     
     # Relationships - lazy loading to avoid circular imports
     grant = relationship("Grant", back_populates="applications", foreign_keys=[grant_id])
+    
+    __table_args__ = (
+        # My applications: filter on user_id, newest first
+        Index("ix_grant_applications_user_id_created_at", user_id, created_at),
+    )
 
 class GrantFavorite(Base):
     """User's saved/favorited grants"""
@@ -1,4 +1,9 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
+from app.auth import auth_cache, get_current_admin
+from app.models import User
+from app.seed_data.service_loader import get_service_loader
+from app.services.password_hashing_service import password_hashing_service
+from app.services.proxy_cache_service import proxy_cache_service
 
 router = APIRouter(
     prefix="/admin",
@@ -9,3 +14,39 @@ router = APIRouter(
 @router.get("/")
 async def admin_root():
     return {"message": "Admin Panel API"}
+
+@router.post("/services/reload")
+def reload_services_catalog(
+    force: bool = False,
+    current_user: User = Depends(get_current_admin)
+):
+    """Re-read services_data.json and swap in the new catalog"""
+    loader = get_service_loader()
+    reloaded = loader.reload(force=force)
+    return {
+        "reloaded": reloaded,
+        "version": loader.version,
+        "total_suppliers": len(loader.catalog.by_id)
+    }
+
+@router.get("/auth-cache")
+def get_auth_cache_stats(current_user: User = Depends(get_current_admin)):
+    """Hit/miss counters for the token and user caches behind get_current_user"""
+    return auth_cache.stats()
+
+@router.get("/password-hashing")
+def get_password_hashing_stats(current_user: User = Depends(get_current_admin)):
+    """Queue depth, wait times and rejections for the bcrypt pool"""
+    return password_hashing_service.stats()
+
+# async: the cache's memory LRU and in-flight map are only touched on the event loop
+@router.get("/proxy-cache")
+async def get_proxy_cache_stats(current_user: User = Depends(get_current_admin)):
+    """Size, lookups and HIT/STALE/MISS counts for the proxied page cache"""
+    return proxy_cache_service.stats()
+
+@router.delete("/proxy-cache")
+async def clear_proxy_cache(current_user: User = Depends(get_current_admin)):
+    """Drop every cached proxy page, in memory and on disk"""
+    await proxy_cache_service.clear()
+    return proxy_cache_service.stats()
@@ -6,7 +6,8 @@ from app.database import get_db
 from app.models import User, Application, ApplicationStatus, ServiceType
 from app.schemas import ApplicationCreate, ApplicationResponse
 from app.auth import get_current_user
-from app.services.direct_automation_service import direct_automation_service
+from app.routers.automation import job_response
+from app.services.rpa_queue_service import rpa_queue_service
 
 router = APIRouter(prefix="/api/applications", tags=["Applications"])
 
@@ -70,13 +71,13 @@ def submit_application(
     
     return {"message": "Application submitted", "status": application.status}
 
-@router.post("/{application_id}/autofill-external")
+@router.post("/{application_id}/autofill-external", status_code=202)
 def autofill_external_form(
     application_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Trigger automation to fill external website form"""
+    """Queue automation to fill the external website form; poll the returned job"""
     application = db.query(Application).filter(
         Application.id == application_id,
         Application.user_id == current_user.id
@@ -85,30 +86,31 @@ def autofill_external_form(
         raise HTTPException(status_code=404, detail="Application not found")
     
     # Prepare data for automation
-    form_data = application.form_data or {}
-    form_data.update({
+    form_data = {
+        **(application.form_data or {}),
         "email": current_user.email,
         "mobile": current_user.mobile,
         "full_name": current_user.full_name
-    })
+    }
     
-    # Call appropriate automation service based on service type
+    # Pick the provider automation based on service type
     if application.service_type == ServiceType.ELECTRICITY:
         if application.application_type == "name_change":
-            result = direct_automation_service.submit_torrent_power_name_change(form_data)
+            target_website = "torrent-power"
         else:
-            result = {"success": False, "message": "Application type not supported for automation"}
+            raise HTTPException(status_code=400, detail="Application type not supported for automation")
     
     elif application.service_type == ServiceType.GAS:
         if application.application_type == "name_change":
-            result = direct_automation_service.submit_gujarat_gas_name_change(form_data)
+            target_website = "gujarat-gas"
         else:
-            result = {"success": False, "message": "Application type not supported for automation"}
+            raise HTTPException(status_code=400, detail="Application type not supported for automation")
     
     else:
-        result = {"success": False, "message": "Service type not supported for automation yet"}
+        raise HTTPException(status_code=400, detail="Service type not supported for automation yet")
     
-    return result
+    job = rpa_queue_service.enqueue(db, target_website, form_data, application_id=application.id)
+    return job_response(job)
 
 @router.get("/prefill/{service_type}/{application_type}")
 def get_prefill_data(
@@ -1,19 +1,27 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Request
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import or_, select
 from datetime import timedelta
-from app.database import get_db
+from app.database import get_async_db
 from app.models import User
 from app.schemas import UserCreate, UserResponse, Token
-from app.auth import get_password_hash, verify_password, create_access_token, get_current_user
+from app.auth import create_access_token, get_current_user_async, password_needs_rehash
 from app.config import get_settings
+from app.services.password_hashing_service import password_hashing_service, PasswordHashingBusy
 
 router = APIRouter(prefix="/api/auth", tags=["Authentication"])
 settings = get_settings()
 
+def hashing_busy_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many sign-in requests, please retry shortly",
+        headers={"Retry-After": "1"},
+    )
+
 @router.post("/register", response_model=UserResponse)
-async def register(request: Request, db: Session = Depends(get_db)):
+async def register(request: Request, db: AsyncSession = Depends(get_async_db)):
     try:
         # Handle both JSON and form data
         content_type = request.headers.get("content-type", "")
@@ -50,24 +58,28 @@ async def register(request: Request, db: Session = Depends(get_db)):
             raise HTTPException(status_code=400, detail="Mobile number must be 10 digits")
         
         # Check if email exists
-        if db.query(User).filter(User.email == email).first():
+        if (await db.execute(select(User.id).where(User.email == email))).first():
             raise HTTPException(status_code=400, detail="Email already registered")
         
         # Check if mobile exists
-        if db.query(User).filter(User.mobile == mobile).first():
+        if (await db.execute(select(User.id).where(User.mobile == mobile))).first():
             raise HTTPException(status_code=400, detail="Mobile number already registered")
         
         # Create user
+        try:
+            hashed_password = await password_hashing_service.hash(password)
+        except PasswordHashingBusy:
+            raise hashing_busy_exception()
         user = User(
             email=email,
             mobile=mobile,
-            hashed_password=get_password_hash(password),
+            hashed_password=hashed_password,
             full_name=full_name,
             city=city if city else None
         )
         db.add(user)
-        db.commit()
-        db.refresh(user)
+        await db.commit()
+        await db.refresh(user)
         return user
         
     except HTTPException:
@@ -76,7 +88,7 @@ async def register(request: Request, db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/login", response_model=Token)
-async def login(request: Request, db: Session = Depends(get_db)):
+async def login(request: Request, db: AsyncSession = Depends(get_async_db)):
     try:
         # Handle both JSON and form data
         content_type = request.headers.get("content-type", "")
@@ -93,14 +105,28 @@ async def login(request: Request, db: Session = Depends(get_db)):
         if not email or not password:
             raise HTTPException(status_code=422, detail="Email and password required")
         
-        user = db.query(User).filter(or_(User.email == email, User.mobile == email)).first()
-        if not user or not verify_password(password, user.hashed_password):
+        result = await db.execute(select(User).where(or_(User.email == email, User.mobile == email)))
+        user = result.scalars().first()
+        try:
+            verified = user is not None and await password_hashing_service.verify(password, user.hashed_password)
+        except PasswordHashingBusy:
+            raise hashing_busy_exception()
+        if not verified:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Incorrect email or password",
                 headers={"WWW-Authenticate": "Bearer"},
             )
         
+        # Upgrade hashes made with fewer rounds while we have the plain password
+        if password_needs_rehash(user.hashed_password):
+            try:
+                user.hashed_password = await password_hashing_service.hash(password)
+                await db.commit()
+            except PasswordHashingBusy:
+                # Not worth failing the login over - upgrade on a later one
+                pass
+        
         access_token = create_access_token(
             data={"sub": str(user.id)},
             expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -113,5 +139,5 @@ async def login(request: Request, db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/me", response_model=UserResponse)
-def get_me(current_user: User = Depends(get_current_user)):
+async def get_me(current_user: User = Depends(get_current_user_async)):
     return current_user
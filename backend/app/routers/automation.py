@@ -1,11 +1,16 @@
 """
 Automation API Router
-Handles direct automation requests for utility providers
+Queues automation requests for utility providers; workers in
+rpa_queue_service submit them and the job endpoint reports the outcome
 """
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel, EmailStr
+from sqlalchemy.orm import Session
 from typing import Optional
-from app.services.direct_automation_service import direct_automation_service
+from app.auth import get_current_user
+from app.database import get_db
+from app.models import Application, RPASubmission, User
+from app.services.rpa_queue_service import rpa_queue_service
 
 router = APIRouter(prefix="/api/automation", tags=["Automation"])
 
@@ -31,10 +36,36 @@ class WaterNameChangeRequest(BaseModel):
     mobile: str
     aadhaarNumber: Optional[str] = None
 
-@router.post("/torrent-power/name-change")
-async def automate_torrent_power_name_change(request: TorrentPowerNameChangeRequest):
+def job_status_url(job: RPASubmission) -> str:
+    """Application jobs are polled by their owner; anonymous ones only by token"""
+    if job.application_id is not None:
+        return f"{router.prefix}/jobs/{job.id}"
+    return f"{router.prefix}/jobs/token/{job.job_token}"
+
+def job_response(job: RPASubmission) -> dict:
+    """Job status; never includes the submitted form"""
+    return {
+        "job_id": job.id,
+        "status": job.status.value,
+        "target_website": job.target_website,
+        "application_id": job.application_id,
+        "retry_count": job.retry_count,
+        "max_retries": job.max_retries,
+        "next_attempt_at": job.next_attempt_at,
+        "confirmation_number": job.confirmation_number,
+        "error_message": job.error_message,
+        "result": job.response_data,
+        "created_at": job.created_at,
+        "completed_at": job.completed_at,
+        "status_url": job_status_url(job),
+        # Anonymous jobs are polled at /jobs/token/{job_token}
+        "job_token": job.job_token if job.application_id is None else None,
+    }
+
+@router.post("/torrent-power/name-change", status_code=202)
+def automate_torrent_power_name_change(request: TorrentPowerNameChangeRequest, db: Session = Depends(get_db)):
     """
-    Automate Torrent Power name change application submission
+    Queue a Torrent Power name change application submission
     """
     # Validate email confirmation
     if request.email != request.confirmEmail:
@@ -49,18 +80,13 @@ async def automate_torrent_power_name_change(request: TorrentPowerNameChangeRequ
         "email": request.email
     }
     
-    # Call automation service
-    result = direct_automation_service.submit_torrent_power_name_change(form_data)
-    
-    if not result.get("success"):
-        raise HTTPException(status_code=400, detail=result.get("message", "Automation failed"))
-    
-    return result
+    job = rpa_queue_service.enqueue(db, "torrent-power", form_data)
+    return job_response(job)
 
-@router.post("/gujarat-gas/name-change")
-async def automate_gujarat_gas_name_change(request: GujaratGasNameChangeRequest):
+@router.post("/gujarat-gas/name-change", status_code=202)
+def automate_gujarat_gas_name_change(request: GujaratGasNameChangeRequest, db: Session = Depends(get_db)):
     """
-    Automate Gujarat Gas name change application submission
+    Queue a Gujarat Gas name change application submission
     """
     form_data = {
         "currentName": request.currentName,
@@ -70,17 +96,13 @@ async def automate_gujarat_gas_name_change(request: GujaratGasNameChangeRequest)
         "aadhaarNumber": request.aadhaarNumber
     }
     
-    result = direct_automation_service.submit_gujarat_gas_name_change(form_data)
-    
-    if not result.get("success"):
-        raise HTTPException(status_code=400, detail=result.get("message", "Automation failed"))
-    
-    return result
+    job = rpa_queue_service.enqueue(db, "gujarat-gas", form_data)
+    return job_response(job)
 
-@router.post("/water/name-change")
-async def automate_water_name_change(request: WaterNameChangeRequest):
+@router.post("/water/name-change", status_code=202)
+def automate_water_name_change(request: WaterNameChangeRequest, db: Session = Depends(get_db)):
     """
-    Automate Water Department name change application submission
+    Queue a Water Department name change application submission
     """
     form_data = {
         "currentName": request.currentName,
@@ -90,12 +112,39 @@ async def automate_water_name_change(request: WaterNameChangeRequest):
         "aadhaarNumber": request.aadhaarNumber
     }
     
-    result = direct_automation_service.submit_water_name_change(form_data)
-    
-    if not result.get("success"):
-        raise HTTPException(status_code=400, detail=result.get("message", "Automation failed"))
-    
-    return result
+    job = rpa_queue_service.enqueue(db, "water", form_data)
+    return job_response(job)
+
+@router.get("/jobs/token/{job_token}")
+def get_automation_job_by_token(job_token: str, db: Session = Depends(get_db)):
+    """
+    Status of a queued automation job that isn't tied to an application,
+    by the token from its status_url
+    """
+    job = db.query(RPASubmission).filter(
+        RPASubmission.job_token == job_token,
+        RPASubmission.application_id.is_(None)
+    ).first()
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_response(job)
+
+@router.get("/jobs/{job_id}")
+def get_automation_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Status of an automation job for one of the current user's applications
+    """
+    job = db.query(RPASubmission).join(Application).filter(
+        RPASubmission.id == job_id,
+        Application.user_id == current_user.id
+    ).first()
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_response(job)
 
 @router.get("/health")
 async def automation_health_check():
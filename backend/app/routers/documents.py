@@ -2,13 +2,14 @@
 Documents Router - Upload and Storage
 """
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 import os
 from datetime import datetime
 
-from app.database import get_db
-from app.auth import get_current_user
+from app.database import get_async_db
+from app.auth import get_current_user_async
 from app.models import User, Document
 
 router = APIRouter(prefix="/api/documents", tags=["Documents"])
@@ -21,8 +22,8 @@ os.makedirs(UPLOAD_DIR, exist_ok=True)
 async def upload_document(
     file: UploadFile = File(...),
     document_type: str = Form(...),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Upload document and extract data using OCR
@@ -60,8 +61,8 @@ async def upload_document(
             extracted_data=extracted_data
         )
         db.add(document)
-        db.commit()
-        db.refresh(document)
+        await db.commit()
+        await db.refresh(document)
         
         return {
             "success": True,
@@ -76,27 +77,32 @@ async def upload_document(
 
 @router.get("/")
 async def get_user_documents(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get all documents for current user"""
-    documents = db.query(Document).filter(
-        Document.user_id == current_user.id
-    ).order_by(Document.created_at.desc()).all()
+    result = await db.execute(
+        select(Document).where(
+            Document.user_id == current_user.id
+        ).order_by(Document.created_at.desc())
+    )
     
-    return documents
+    return result.scalars().all()
 
 @router.get("/{document_id}")
 async def get_document(
     document_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get specific document"""
-    document = db.query(Document).filter(
-        Document.id == document_id,
-        Document.user_id == current_user.id
-    ).first()
+    result = await db.execute(
+        select(Document).where(
+            Document.id == document_id,
+            Document.user_id == current_user.id
+        )
+    )
+    document = result.scalars().first()
     
     if not document:
         raise HTTPException(status_code=404, detail="Document not found")
@@ -106,18 +112,21 @@ async def get_document(
 @router.get("/autofill/{document_type}")
 async def get_autofill_data(
     document_type: str,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get auto-fill data from user's uploaded documents
     Returns merged data from all relevant documents
     """
     # Get user's documents of this type
-    documents = db.query(Document).filter(
-        Document.user_id == current_user.id,
-        Document.document_type == document_type
-    ).order_by(Document.created_at.desc()).limit(1).all()
+    result = await db.execute(
+        select(Document).where(
+            Document.user_id == current_user.id,
+            Document.document_type == document_type
+        ).order_by(Document.created_at.desc()).limit(1)
+    )
+    documents = result.scalars().all()
     
     if not documents:
         return {"data": {}}
@@ -128,16 +137,19 @@ async def get_autofill_data(
 @router.get("/{document_id}/download")
 async def download_document(
     document_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Download document file"""
     from fastapi.responses import FileResponse
     
-    document = db.query(Document).filter(
-        Document.id == document_id,
-        Document.user_id == current_user.id
-    ).first()
+    result = await db.execute(
+        select(Document).where(
+            Document.id == document_id,
+            Document.user_id == current_user.id
+        )
+    )
+    document = result.scalars().first()
     
     if not document:
         raise HTTPException(status_code=404, detail="Document not found")
@@ -154,14 +166,17 @@ async def download_document(
 @router.delete("/{document_id}")
 async def delete_document(
     document_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete document"""
-    document = db.query(Document).filter(
-        Document.id == document_id,
-        Document.user_id == current_user.id
-    ).first()
+    result = await db.execute(
+        select(Document).where(
+            Document.id == document_id,
+            Document.user_id == current_user.id
+        )
+    )
+    document = result.scalars().first()
     
     if not document:
         raise HTTPException(status_code=404, detail="Document not found")
@@ -171,7 +186,7 @@ async def delete_document(
         os.remove(document.filepath)
     
     # Delete from database
-    db.delete(document)
-    db.commit()
+    await db.delete(document)
+    await db.commit()
     
     return {"success": True, "message": "Document deleted successfully"}
@@ -3,11 +3,17 @@ from sqlalchemy.orm import Session
 from sqlalchemy import and_, or_
 from typing import List, Optional
 from datetime import datetime, date
+import base64
+import json
 
 from app.database import get_db
-from app.models_grants import Grant, GrantApplication, GrantFavorite, GrantStatus, GrantCategory, Ministry, GrantLevel, GrantApplicationStatus
+from app.models_grants import GRANT_LISTING_ORDER, Grant, GrantApplication, GrantFavorite, GrantStatus, GrantCategory, Ministry, GrantLevel, GrantApplicationStatus
 from app.models import User
 from app.auth import get_current_user
+from app.services.grant_search_service import grant_search_service
+from app.services.grant_facets_service import grant_facets_service
+from app.services.grant_views_service import grant_views_service
+from app.services.grant_eligibility_service import grant_eligibility_service, evaluate, ELIGIBLE_SCORE
 from pydantic import BaseModel
 
 router = APIRouter(prefix="/api/grants", tags=["grants"])
@@ -65,30 +71,42 @@ class EligibilityCheckResponse(BaseModel):
     missing_criteria: List[str]
     recommendation: str
 
+class BatchEligibilityRequest(BaseModel):
+    business_type: Optional[str] = None
+    category: Optional[str] = None
+    sector: Optional[str] = None
+    turnover: Optional[float] = None
+    registration: Optional[str] = None
+    include_ineligible: bool = False
+
+class GrantEligibilityResult(BaseModel):
+    grant_id: int
+    grant_name: str
+    grant_amount: Optional[str]
+    score: float
+    eligible: bool
+    matching_criteria: List[str]
+    missing_criteria: List[str]
+
 class GrantApplicationRequest(BaseModel):
     grant_id: int
     form_data: dict
     uploaded_documents: List[str]
 
-@router.get("/", response_model=List[GrantResponse])
-def get_grants(
+class GrantPageResponse(BaseModel):
+    items: List[GrantResponse]
+    next_cursor: Optional[str] = None
+
+def filter_grants(
+    query,
     category: Optional[str] = None,
     ministry: Optional[str] = None,
     level: Optional[str] = None,
     status: Optional[str] = None,
     min_amount: Optional[float] = None,
-    max_amount: Optional[float] = None,
-    search: Optional[str] = None,
-    skip: int = 0,
-    limit: int = 50,
-    db: Session = Depends(get_db)
+    max_amount: Optional[float] = None
 ):
-    """
-    Get all grants with optional filtering
-    """
-    query = db.query(Grant)
-    
-    # Apply filters
+    """Apply the optional listing filters; unknown enum values are ignored"""
     if category:
         try:
             query = query.filter(Grant.category == GrantCategory(category))
@@ -119,24 +137,103 @@ def get_grants(
     if max_amount is not None:
         query = query.filter(Grant.min_amount <= max_amount)
     
-    if search:
-        search_term = f"%{search}%"
-        query = query.filter(
-            or_(
-                Grant.name.ilike(search_term),
-                Grant.description.ilike(search_term),
-                Grant.eligibility_summary.ilike(search_term)
-            )
+    return query
+
+def encode_grant_cursor(grant: Grant) -> str:
+    """Opaque cursor for GRANT_LISTING_ORDER; NULL priority/status stay null"""
+    key = [grant.priority, grant.status.name if grant.status else None, grant.id]
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode().rstrip("=")
+
+def decode_grant_cursor(cursor: str):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        priority, status_name, grant_id = json.loads(base64.urlsafe_b64decode(padded))
+        return (
+            None if priority is None else int(priority),
+            None if status_name is None else GrantStatus[status_name],
+            int(grant_id),
         )
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def after_grant_cursor(priority: Optional[int], grant_status: Optional[GrantStatus], grant_id: int):
+    """Rows past the cursor in GRANT_LISTING_ORDER (priority desc nulls last, status nulls first, id)"""
+    if grant_status is None:
+        after_status = or_(Grant.status.isnot(None), and_(Grant.status.is_(None), Grant.id > grant_id))
+    else:
+        after_status = or_(Grant.status > grant_status, and_(Grant.status == grant_status, Grant.id > grant_id))
+    if priority is None:
+        return and_(Grant.priority.is_(None), after_status)
+    return or_(
+        Grant.priority < priority,
+        Grant.priority.is_(None),
+        and_(Grant.priority == priority, after_status),
+    )
+
+@router.get("/", response_model=List[GrantResponse])
+def get_grants(
+    category: Optional[str] = None,
+    ministry: Optional[str] = None,
+    level: Optional[str] = None,
+    status: Optional[str] = None,
+    min_amount: Optional[float] = None,
+    max_amount: Optional[float] = None,
+    search: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 50,
+    db: Session = Depends(get_db)
+):
+    """
+    Get all grants with optional filtering
+    """
+    query = filter_grants(db.query(Grant), category, ministry, level, status, min_amount, max_amount)
+    
+    if search:
+        # Full-text match, ranked by relevance ahead of priority
+        query = grant_search_service.apply(query, db, search)
     
     # Order by priority and status
-    query = query.order_by(Grant.priority.desc(), Grant.status)
+    query = query.order_by(*GRANT_LISTING_ORDER)
     
     # Pagination
     grants = query.offset(skip).limit(limit).all()
     
     return grants
 
+@router.get("/scroll", response_model=GrantPageResponse)
+def scroll_grants(
+    category: Optional[str] = None,
+    ministry: Optional[str] = None,
+    level: Optional[str] = None,
+    status: Optional[str] = None,
+    min_amount: Optional[float] = None,
+    max_amount: Optional[float] = None,
+    search: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    db: Session = Depends(get_db)
+):
+    """
+    Keyset-paginated grant listing. Pass back next_cursor to get the next
+    page; deep pages cost the same as the first one.
+    """
+    query = filter_grants(db.query(Grant), category, ministry, level, status, min_amount, max_amount)
+    
+    if search:
+        # Keep the stable listing order so the cursor stays valid
+        query = grant_search_service.apply(query, db, search, ranked=False)
+    
+    if cursor:
+        query = query.filter(after_grant_cursor(*decode_grant_cursor(cursor)))
+    
+    query = query.order_by(*GRANT_LISTING_ORDER)
+    
+    # One extra row tells us whether there is a next page
+    grants = query.limit(limit + 1).all()
+    next_cursor = encode_grant_cursor(grants[limit - 1]) if len(grants) > limit else None
+    
+    return GrantPageResponse(items=grants[:limit], next_cursor=next_cursor)
+
 @router.get("/{grant_id}", response_model=GrantDetailResponse)
 def get_grant_detail(
     grant_id: int,
@@ -150,27 +247,26 @@ def get_grant_detail(
     if not grant:
         raise HTTPException(status_code=404, detail="Grant not found")
     
-    # Increment view count
-    grant.view_count += 1
-    db.commit()
+    # Count the view in the write-behind buffer; this request stays read-only
+    grant_views_service.record_view(grant_id)
     
-    return grant
+    response = GrantDetailResponse.model_validate(grant)
+    response.view_count = (grant.view_count or 0) + grant_views_service.pending_views(grant_id)
+    return response
 
 @router.get("/categories/list")
 def get_categories(db: Session = Depends(get_db)):
     """
     Get all grant categories with counts
     """
-    categories = []
-    for category in GrantCategory:
-        count = db.query(Grant).filter(Grant.category == category).count()
-        categories.append({
-            "value": category.value,
-            "name": category.name,
-            "count": count
-        })
-    
-    return categories
+    return grant_facets_service.get_facets(db)["category"]
+
+@router.get("/facets/list")
+def get_facets(db: Session = Depends(get_db)):
+    """
+    Get category, ministry, level and status counts for the filter sidebar
+    """
+    return grant_facets_service.get_facets(db)
 
 @router.post("/check-eligibility", response_model=EligibilityCheckResponse)
 def check_eligibility(
@@ -188,47 +284,11 @@ def check_eligibility(
         raise HTTPException(status_code=404, detail="Grant not found")
     
     # Mock AI eligibility check
-    matching_criteria = []
-    missing_criteria = []
-    score = 0
-    
     criteria = grant.eligibility_criteria or {}
-    
-    # Check business type
-    if "business_type" in criteria:
-        required_types = criteria["business_type"]
-        if request.business_type and request.business_type in required_types:
-            matching_criteria.append(f"Business type: {request.business_type}")
-            score += 30
-        else:
-            missing_criteria.append(f"Business type must be one of: {', '.join(required_types)}")
-    
-    # Check category (SC/ST/Women)
-    if "category" in criteria or "owner" in criteria:
-        if request.category:
-            matching_criteria.append(f"Category: {request.category}")
-            score += 25
-        else:
-            missing_criteria.append("Category/ownership requirement not met")
-    
-    # Check sector
-    if "sector" in criteria:
-        if request.sector:
-            matching_criteria.append(f"Sector: {request.sector}")
-            score += 20
-        else:
-            missing_criteria.append(f"Sector requirement: {criteria['sector']}")
-    
-    # Check registration
-    if "registration" in criteria:
-        if request.registration:
-            matching_criteria.append(f"Registration: {request.registration}")
-            score += 25
-        else:
-            missing_criteria.append(f"Registration required: {criteria['registration']}")
+    score, matching_criteria, missing_criteria = evaluate(criteria, request)
     
     # Determine eligibility
-    eligible = score >= 50
+    eligible = score >= ELIGIBLE_SCORE
     
     # Generate recommendation
     if eligible:
@@ -244,6 +304,18 @@ def check_eligibility(
         recommendation=recommendation
     )
 
+@router.post("/eligible", response_model=List[GrantEligibilityResult])
+def find_eligible_grants(
+    request: BatchEligibilityRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Score one business profile against every open grant, best match first
+    """
+    min_score = 1 if request.include_ineligible else ELIGIBLE_SCORE
+    return grant_eligibility_service.score_all(db, request, min_score)
+
 @router.post("/apply")
 def apply_for_grant(
     request: GrantApplicationRequest,
@@ -312,24 +384,33 @@ def get_my_applications(
     """
     Get current user's grant applications
     """
-    applications = db.query(GrantApplication).filter(
+    # One query: join the grant and project only the columns we return
+    applications = db.query(
+        GrantApplication.id,
+        GrantApplication.application_number,
+        GrantApplication.status,
+        GrantApplication.submitted_at,
+        GrantApplication.timeline,
+        Grant.name.label("grant_name"),
+        Grant.amount_display.label("grant_amount")
+    ).outerjoin(
+        Grant, Grant.id == GrantApplication.grant_id
+    ).filter(
         GrantApplication.user_id == current_user.id
     ).order_by(GrantApplication.created_at.desc()).all()
     
-    result = []
-    for app in applications:
-        grant = db.query(Grant).filter(Grant.id == app.grant_id).first()
-        result.append({
+    return [
+        {
             "id": app.id,
             "application_number": app.application_number,
-            "grant_name": grant.name if grant else "Unknown",
-            "grant_amount": grant.amount_display if grant else None,
+            "grant_name": app.grant_name if app.grant_name is not None else "Unknown",
+            "grant_amount": app.grant_amount,
             "status": app.status.value,
             "submitted_at": app.submitted_at,
             "timeline": app.timeline
-        })
-    
-    return result
+        }
+        for app in applications
+    ]
 
 @router.post("/favorites/{grant_id}")
 def add_to_favorites(
@@ -0,0 +1,27 @@
+"""
+Internal Router - Runtime metrics for sizing and monitoring workers, admins only
+"""
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from app.auth import get_current_admin
+from app.database import get_db, get_pool_stats
+from app.services.http_client_service import http_client_service
+from app.services.rpa_queue_service import rpa_queue_service
+
+router = APIRouter(prefix="/api/internal", tags=["Internal"], dependencies=[Depends(get_current_admin)])
+
+@router.get("/db-pool")
+def get_db_pool_stats():
+    """Connection pool gauges and checkout wait histograms for this worker"""
+    return get_pool_stats()
+
+@router.get("/upstreams")
+def get_upstream_stats():
+    """Per-host latency, error rate and circuit state of outbound HTTP calls from this worker"""
+    return http_client_service.stats()
+
+@router.get("/rpa-queue")
+def get_rpa_queue_stats(db: Session = Depends(get_db)):
+    """RPA jobs by status across all workers, and what this process has run"""
+    return rpa_queue_service.stats(db)
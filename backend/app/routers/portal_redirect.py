@@ -2,16 +2,17 @@
 Simple Portal Redirection API
 Redirects users to official government and private portals
 """
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel
 from typing import Dict, Any, List, Optional
-import json
-import os
 import logging
+from app.http_cache import cached_json_response
+from app.seed_data.service_loader import get_service_loader, ServiceCatalog
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/portal", tags=["portal-redirect"])
+loader = get_service_loader()
 
 class PortalRedirectRequest(BaseModel):
     supplier_id: str
@@ -28,57 +29,21 @@ class PortalRedirectResponse(BaseModel):
     user_guidance: List[str]
     automation_available: bool = False
 
-def load_services_data() -> Dict[str, Any]:
-    """Load services data from JSON file"""
-    try:
-        # Try multiple possible paths
-        possible_paths = [
-            os.path.join(os.path.dirname(__file__), "../data/services_data.json"),
-            "/app/app/data/services_data.json",
-            "/app/data/services_data.json",
-            "backend/app/data/services_data.json"
-        ]
-        
-        for services_file in possible_paths:
-            if os.path.exists(services_file):
-                with open(services_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                logger.info(f"Services data loaded from: {services_file}")
-                return data
-        
-        logger.error("Services data file not found in any expected location")
-        return {}
-        
-    except Exception as e:
-        logger.error(f"Error loading services data: {e}")
-        return {}
-
 @router.post("/redirect", response_model=PortalRedirectResponse)
 async def get_portal_redirect(request: PortalRedirectRequest):
     """Get portal redirection information for a supplier"""
     try:
-        # Load services data
-        services_data = load_services_data()
-        
         # Find supplier across all categories
-        supplier = None
-        category = None
-        
-        for cat, suppliers in services_data.items():
-            for s in suppliers:
-                if s.get('id') == request.supplier_id:
-                    supplier = s
-                    category = cat
-                    break
-            if supplier:
-                break
+        found = loader.find_supplier(request.supplier_id)
         
-        if not supplier:
+        if not found:
             raise HTTPException(
                 status_code=404, 
                 detail=f"Supplier '{request.supplier_id}' not found"
             )
         
+        category, supplier = found
+        
         # Get appropriate URL based on service type
         service_url = None
         if request.service_type == "name_change":
@@ -205,30 +170,37 @@ def generate_instructions(supplier: Dict[str, Any], service_type: str) -> List[s
     
     return instructions
 
+def build_suppliers_list(catalog: ServiceCatalog) -> Dict[str, Any]:
+    services_data = catalog.services
+    suppliers = []
+    
+    for category, supplier_list in services_data.items():
+        for supplier in supplier_list:
+            suppliers.append({
+                "id": supplier.get('id'),
+                "name": supplier.get('name'),
+                "category": category,
+                "type": supplier.get('type'),
+                "portal_url": supplier.get('portal_url'),
+                "online_available": supplier.get('online_available', False),
+                "automation_type": supplier.get('automation_type', 'manual_only')
+            })
+    
+    return {
+        "suppliers": suppliers,
+        "total_count": len(suppliers),
+        "categories": list(services_data.keys())
+    }
+
 @router.get("/suppliers")
-async def get_all_suppliers():
+async def get_all_suppliers(request: Request):
     """Get list of all suppliers with portal information"""
     try:
-        services_data = load_services_data()
-        suppliers = []
-        
-        for category, supplier_list in services_data.items():
-            for supplier in supplier_list:
-                suppliers.append({
-                    "id": supplier.get('id'),
-                    "name": supplier.get('name'),
-                    "category": category,
-                    "type": supplier.get('type'),
-                    "portal_url": supplier.get('portal_url'),
-                    "online_available": supplier.get('online_available', False),
-                    "automation_type": supplier.get('automation_type', 'manual_only')
-                })
-        
-        return {
-            "suppliers": suppliers,
-            "total_count": len(suppliers),
-            "categories": list(services_data.keys())
-        }
+        catalog = loader.catalog
+        return cached_json_response(
+            request, catalog.responses, "portal-suppliers",
+            lambda: build_suppliers_list(catalog)
+        )
         
     except Exception as e:
         logger.error(f"Error getting suppliers: {e}")
@@ -238,24 +210,13 @@ async def get_all_suppliers():
 async def get_supplier_portal_info(supplier_id: str):
     """Get detailed portal information for a specific supplier"""
     try:
-        services_data = load_services_data()
-        
-        # Find supplier
-        supplier = None
-        category = None
+        found = loader.find_supplier(supplier_id)
         
-        for cat, suppliers in services_data.items():
-            for s in suppliers:
-                if s.get('id') == supplier_id:
-                    supplier = s
-                    category = cat
-                    break
-            if supplier:
-                break
-        
-        if not supplier:
+        if not found:
             raise HTTPException(status_code=404, detail="Supplier not found")
         
+        category, supplier = found
+        
         return {
             "supplier_id": supplier_id,
             "name": supplier.get('name'),
@@ -3,295 +3,227 @@ Proxy router to bypass X-Frame-Options restrictions
 Allows loading external websites in iframe
 """
 
+import asyncio
+import math
+from contextlib import AsyncExitStack
+from typing import Callable, Optional
+
 from fastapi import APIRouter, Request, HTTPException
-from fastapi.responses import HTMLResponse
-import httpx
-import re
+from fastapi.responses import Response, StreamingResponse
+from starlette.background import BackgroundTask
 from urllib.parse import urljoin, urlparse
 
+from app.html_rewriter import HTMLRewriter
+from app.http_cache import etag_matches
+from app.services.http_client_service import UpstreamUnavailable, http_client_service
+from app.services.proxy_assets_service import proxy_assets_service
+from app.services.proxy_cache_service import CachedPage, proxy_cache_service
+
 router = APIRouter(prefix="/api/proxy", tags=["Proxy"])
 
+TORRENT_POWER_URL = "https://connect.torrentpower.com/tplcp/application/namechangerequest"
+
+UPSTREAM_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+# app/static/proxy/ai-form-fill.js settings, sent as JSON next to the script tag
+AI_FORM_CONFIG = {
+    "storageKey": "aiFormData",
+    "typingDelay": 100,
+    "stepDelay": 1000,
+    "autoStartDelay": 2000,
+}
+
+# Asset URLs change with their content, so browsers can keep them forever
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+
+def unavailable(e: UpstreamUnavailable) -> HTTPException:
+    """503 for a portal the HTTP client is refusing to call right now"""
+    return HTTPException(
+        status_code=503,
+        detail=f"Upstream unavailable: {e.reason}",
+        headers={"Retry-After": str(math.ceil(e.retry_after))},
+    )
+
+
+async def open_upstream(url: str, page: Optional[CachedPage] = None):
+    """
+    Start a GET for url, conditional when a cached page is given. Returns the
+    response (200, or 304 for a conditional request) and the stack that closes it.
+    """
+    headers = {**UPSTREAM_HEADERS, **proxy_cache_service.conditional_headers(page)}
+    stack = AsyncExitStack()
+    response = await stack.enter_async_context(http_client_service.stream("GET", url, headers=headers))
+    if response.status_code != 200 and not (page is not None and response.status_code == 304):
+        await stack.aclose()
+        raise HTTPException(status_code=response.status_code, detail="Failed to fetch website")
+    return response, stack
+
+
+def stream_page(url: str, inject: str, response, stack: AsyncExitStack, cache_status: str,
+                on_complete: Optional[Callable[[Optional[bytes]], None]] = None) -> StreamingResponse:
+    """
+    Relay an open 200 response through HTMLRewriter chunk by chunk. on_complete
+    gets the whole rewritten body once upstream is done, or None if the
+    transfer was cut short or the page is too big to keep.
+    """
+    rewriter = HTMLRewriter(url, inject)
+    completed = False
+
+    def complete(body: Optional[bytes]):
+        nonlocal completed
+        if on_complete is not None and not completed:
+            completed = True
+            on_complete(body)
+
+    async def body():
+        kept = [] if on_complete is not None else None
+        size = 0
+        async for chunk in response.aiter_text():
+            rewritten = rewriter.feed(chunk).encode()
+            if kept is not None:
+                size += len(rewritten)
+                if size <= proxy_cache_service.max_entry_bytes:
+                    kept.append(rewritten)
+                else:
+                    kept = None
+            if rewritten:
+                yield rewritten
+        tail = rewriter.close().encode()
+        complete(b"".join(kept) + tail if kept is not None else None)
+        yield tail
+
+    async def cleanup():
+        await stack.aclose()
+        complete(None)
+
+    proxy_cache_service.record(cache_status)
+    # cleanup runs once the response is finished or the client went away
+    return StreamingResponse(
+        body(), media_type="text/html", headers={"X-Proxy-Cache": cache_status}, background=BackgroundTask(cleanup)
+    )
+
+
+def cached_response(page: CachedPage, cache_status: str) -> Response:
+    proxy_cache_service.record(cache_status)
+    return Response(content=page.body, media_type="text/html", headers={"X-Proxy-Cache": cache_status})
+
+
+async def refresh_page(url: str, inject: str, page: CachedPage, heuristic: bool) -> Optional[CachedPage]:
+    """Revalidate or refetch a stale page in the background"""
+    response, stack = await open_upstream(url, page)
+    async with stack:
+        if response.status_code == 304:
+            return proxy_cache_service.revalidated(page, response.headers, heuristic)
+        rewriter = HTMLRewriter(url, inject)
+        parts = [rewriter.feed(chunk) async for chunk in response.aiter_text()]
+        parts.append(rewriter.close())
+        return proxy_cache_service.make_page("".join(parts).encode(), response.headers, heuristic)
+
+
+async def proxy_page(url: str, variant: str, inject: str = "", heuristic: bool = False) -> Response:
+    """
+    url fetched and rewritten, through proxy_cache_service. variant keeps
+    differently rewritten copies of one URL apart. Fresh pages are served
+    from cache; stale ones too while a background refresh runs. Past that
+    the page is revalidated, and concurrent misses wait for one fetch.
+    heuristic gives pages without freshness headers the default TTL; only
+    for known portals, arbitrary URLs are revalidated every time instead.
+    """
+    if not proxy_cache_service.enabled:
+        response, stack = await open_upstream(url)
+        return stream_page(url, inject, response, stack, "BYPASS")
+
+    key = f"{variant} {url}"
+    page = await proxy_cache_service.get(key)
+    if page is not None:
+        if page.is_fresh():
+            return cached_response(page, "HIT")
+        if page.is_servable_stale():
+            proxy_cache_service.revalidate_in_background(key, lambda: refresh_page(url, inject, page, heuristic))
+            return cached_response(page, "STALE")
+
+    leader, flight = proxy_cache_service.claim(key)
+    if not leader:
+        try:
+            shared = await asyncio.wait_for(asyncio.shield(flight), http_client_service.read_timeout)
+        except asyncio.TimeoutError:
+            shared = None
+        if shared is not None:
+            return cached_response(shared, "COLLAPSED")
+        # That fetch produced nothing cacheable, go upstream without caching
+        response, stack = await open_upstream(url)
+        return stream_page(url, inject, response, stack, "BYPASS")
+
+    try:
+        response, stack = await open_upstream(url, page)
+        if response.status_code == 304:
+            await stack.aclose()
+            page = proxy_cache_service.revalidated(page, response.headers, heuristic)
+            proxy_cache_service.finish(key, page)
+            return cached_response(page, "REVALIDATED")
+    except UpstreamUnavailable:
+        proxy_cache_service.finish(key, None)
+        if page is None:
+            raise
+        # An old copy beats a 503 while the portal's circuit is open
+        return cached_response(page, "STALE")
+    except BaseException:
+        proxy_cache_service.finish(key, None)
+        raise
+
+    def store(body: Optional[bytes]):
+        fetched = proxy_cache_service.make_page(body, response.headers, heuristic) if body is not None else None
+        proxy_cache_service.finish(key, fetched)
+
+    return stream_page(url, inject, response, stack, "MISS", on_complete=store)
+
 @router.get("/torrent-power")
 async def proxy_torrent_power():
     """
     Proxy Torrent Power website to bypass X-Frame-Options
     """
-    
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(
-                "https://connect.torrentpower.com/tplcp/application/namechangerequest",
-                headers={
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-                }
-            )
-            
-            if response.status_code == 200:
-                html_content = response.text
-                
-                # Remove X-Frame-Options restrictions
-                html_content = re.sub(r'<meta[^>]*http-equiv=["\']X-Frame-Options["\'][^>]*>', '', html_content, flags=re.IGNORECASE)
-                
-                # Inject our AI form automation script
-                ai_script = """
-                <script>
-                // AI Form Automation Script
-                console.log('🤖 AI Form Automation loaded in proxy');
-                
-                // Listen for form data from parent window
-                window.addEventListener('message', function(event) {
-                    if (event.data.type === 'FILL_FORM') {
-                        console.log('📝 Received form data:', event.data.data);
-                        fillFormWithAnimation(event.data.data);
-                    }
-                });
-                
-                // Enhanced form filling with visible animations
-                async function fillFormWithAnimation(userData) {
-                    try {
-                        console.log('🤖 Starting visible form filling...');
-                        
-                        let currentStep = 0;
-                        const totalSteps = 6;
-                        
-                        // Show progress indicator
-                        function showProgress(step, message) {
-                            const existing = document.querySelector('.ai-progress-indicator');
-                            if (existing) existing.remove();
-                            
-                            const progressDiv = document.createElement('div');
-                            progressDiv.className = 'ai-progress-indicator';
-                            progressDiv.innerHTML = `
-                                <div style="position: fixed; top: 20px; left: 20px; background: #3B82F6; color: white; padding: 15px 25px; border-radius: 12px; box-shadow: 0 8px 25px rgba(0,0,0,0.2); z-index: 10000; font-family: Arial, sans-serif; min-width: 300px;">
-                                    <div style="display: flex; align-items: center; gap: 12px; margin-bottom: 8px;">
-                                        <div style="width: 24px; height: 24px; border: 3px solid #60A5FA; border-top: 3px solid white; border-radius: 50%; animation: spin 1s linear infinite;"></div>
-                                        <div style="font-weight: bold; font-size: 16px;">🤖 AI Auto-Filling Form</div>
-                                    </div>
-                                    <div style="font-size: 14px; margin-bottom: 10px;">Step ${step}/${totalSteps}: ${message}</div>
-                                    <div style="background: rgba(255,255,255,0.2); height: 6px; border-radius: 3px; overflow: hidden;">
-                                        <div style="background: white; height: 100%; width: ${(step/totalSteps)*100}%; transition: width 0.5s ease; border-radius: 3px;"></div>
-                                    </div>
-                                </div>
-                                <style>
-                                    @keyframes spin {
-                                        0% { transform: rotate(0deg); }
-                                        100% { transform: rotate(360deg); }
-                                    }
-                                </style>
-                            `;
-                            document.body.appendChild(progressDiv);
-                        }
-                        
-                        // Animated field filling
-                        function fillFieldWithAnimation(field, value, fieldName) {
-                            return new Promise((resolve) => {
-                                if (!field || !value) {
-                                    resolve();
-                                    return;
-                                }
-                                
-                                // Highlight field
-                                field.style.border = '3px solid #3B82F6';
-                                field.style.boxShadow = '0 0 15px rgba(59, 130, 246, 0.5)';
-                                field.style.backgroundColor = '#EBF8FF';
-                                
-                                // Clear and focus
-                                field.value = '';
-                                field.focus();
-                                
-                                // Type animation
-                                let i = 0;
-                                const typeInterval = setInterval(() => {
-                                    if (i < value.length) {
-                                        field.value += value[i];
-                                        field.dispatchEvent(new Event('input', { bubbles: true }));
-                                        i++;
-                                    } else {
-                                        clearInterval(typeInterval);
-                                        
-                                        // Final events
-                                        field.dispatchEvent(new Event('change', { bubbles: true }));
-                                        field.dispatchEvent(new Event('blur', { bubbles: true }));
-                                        
-                                        // Success styling
-                                        field.style.border = '3px solid #10B981';
-                                        field.style.boxShadow = '0 0 15px rgba(16, 185, 129, 0.5)';
-                                        field.style.backgroundColor = '#ECFDF5';
-                                        
-                                        console.log(`✅ ${fieldName} filled with: ${value}`);
-                                        
-                                        setTimeout(() => {
-                                            field.style.border = '';
-                                            field.style.boxShadow = '';
-                                            field.style.backgroundColor = '';
-                                            resolve();
-                                        }, 800);
-                                    }
-                                }, 100);
-                            });
-                        }
-                        
-                        // Find field helper
-                        function findField(selectors) {
-                            for (const selector of selectors) {
-                                const field = document.querySelector(selector);
-                                if (field) return field;
-                            }
-                            return null;
-                        }
-                        
-                        // Start automation
-                        currentStep = 1;
-                        showProgress(currentStep, 'Filling Service Number...');
-                        const serviceField = findField(['input[name*="service"]', 'input[name*="connection"]', 'input[name*="customer"]']);
-                        await fillFieldWithAnimation(serviceField, userData.connection_id, 'Service Number');
-                        await new Promise(resolve => setTimeout(resolve, 1000));
-                        
-                        currentStep = 2;
-                        showProgress(currentStep, 'Filling Mobile Number...');
-                        const mobileField = findField(['input[name*="mobile"]', 'input[type="tel"]']);
-                        await fillFieldWithAnimation(mobileField, userData.mobile, 'Mobile Number');
-                        await new Promise(resolve => setTimeout(resolve, 1000));
-                        
-                        currentStep = 3;
-                        showProgress(currentStep, 'Filling Email...');
-                        const emailField = findField(['input[type="email"]', 'input[name*="email"]']);
-                        await fillFieldWithAnimation(emailField, userData.email, 'Email');
-                        await new Promise(resolve => setTimeout(resolve, 1000));
-                        
-                        currentStep = 4;
-                        showProgress(currentStep, 'Confirming Email...');
-                        const confirmEmailField = findField(['input[name*="confirm"]', 'input[name*="verify"]']);
-                        await fillFieldWithAnimation(confirmEmailField, userData.email, 'Confirm Email');
-                        await new Promise(resolve => setTimeout(resolve, 1000));
-                        
-                        currentStep = 5;
-                        showProgress(currentStep, 'Generating Captcha...');
-                        // Try to click regenerate captcha button
-                        const regenerateBtn = document.querySelector('a[onclick*="regenerate"], button[onclick*="regenerate"], .regenerate');
-                        if (regenerateBtn) {
-                            regenerateBtn.click();
-                        }
-                        await new Promise(resolve => setTimeout(resolve, 1000));
-                        
-                        currentStep = 6;
-                        showProgress(currentStep, 'Securing form...');
-                        
-                        // Disable submit button
-                        const submitButtons = document.querySelectorAll('input[type="submit"], button[type="submit"], input[value*="Submit"]');
-                        submitButtons.forEach(btn => {
-                            btn.disabled = true;
-                            btn.style.opacity = '0.5';
-                            btn.style.cursor = 'not-allowed';
-                            btn.title = 'Form filled by AI - Please review before submitting manually';
-                        });
-                        
-                        // Show completion
-                        setTimeout(() => {
-                            const existing = document.querySelector('.ai-progress-indicator');
-                            if (existing) existing.remove();
-                            
-                            const completionDiv = document.createElement('div');
-                            completionDiv.innerHTML = `
-                                <div style="position: fixed; top: 20px; left: 20px; background: #10B981; color: white; padding: 20px 30px; border-radius: 12px; box-shadow: 0 8px 25px rgba(0,0,0,0.2); z-index: 10000; font-family: Arial, sans-serif; min-width: 350px;">
-                                    <div style="display: flex; align-items: center; gap: 12px; margin-bottom: 10px;">
-                                        <span style="font-size: 24px;">🎉</span>
-                                        <div>
-                                            <div style="font-weight: bold; font-size: 18px; margin-bottom: 4px;">Form Filled Successfully!</div>
-                                            <div style="font-size: 14px; opacity: 0.9;">Please enter captcha and review before submitting</div>
-                                        </div>
-                                    </div>
-                                    <div style="background: rgba(255,255,255,0.2); padding: 12px; border-radius: 8px; margin-top: 12px;">
-                                        <div style="font-size: 13px; font-weight: bold; margin-bottom: 6px;">⚠️ Next Steps:</div>
-                                        <div style="font-size: 12px; line-height: 1.4;">
-                                            1. Enter the captcha code<br>
-                                            2. Review all filled information<br>
-                                            3. Click Submit to complete
-                                        </div>
-                                    </div>
-                                </div>
-                            `;
-                            document.body.appendChild(completionDiv);
-                            
-                            setTimeout(() => {
-                                if (completionDiv.parentNode) {
-                                    completionDiv.parentNode.removeChild(completionDiv);
-                                }
-                            }, 10000);
-                        }, 1000);
-                        
-                    } catch (error) {
-                        console.error('❌ Form filling error:', error);
-                    }
-                }
-                
-                // Auto-start if data is available
-                const storedData = localStorage.getItem('aiFormData');
-                if (storedData) {
-                    try {
-                        const userData = JSON.parse(storedData);
-                        setTimeout(() => {
-                            fillFormWithAnimation(userData);
-                            localStorage.removeItem('aiFormData');
-                        }, 2000);
-                    } catch (e) {
-                        console.error('Error parsing stored data:', e);
-                    }
-                }
-                </script>
-                """
-                
-                # Inject script before closing body tag
-                html_content = html_content.replace('</body>', ai_script + '</body>')
-                
-                # Fix relative URLs to absolute URLs
-                base_url = "https://connect.torrentpower.com"
-                html_content = re.sub(r'src="(?!http)', f'src="{base_url}', html_content)
-                html_content = re.sub(r'href="(?!http)', f'href="{base_url}', html_content)
-                html_content = re.sub(r'action="(?!http)', f'action="{base_url}', html_content)
-                
-                return HTMLResponse(content=html_content)
-            else:
-                raise HTTPException(status_code=response.status_code, detail="Failed to fetch website")
-                
+        # Drops X-Frame-Options meta tags, makes src/href/action absolute and
+        # injects the AI form automation script before </body>
+        asset = proxy_assets_service.asset("ai-form-fill")
+        inject = proxy_assets_service.script_tag(asset.name, AI_FORM_CONFIG)
+        return await proxy_page(TORRENT_POWER_URL, f"torrent-power {asset.version}", inject=inject, heuristic=True)
+    except UpstreamUnavailable as e:
+        raise unavailable(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Proxy error: {str(e)}")
 
+@router.get("/assets/{filename}")
+async def proxy_asset(filename: str, request: Request):
+    """
+    Injected scripts, minified once per process. Older versions, referenced
+    by pages cached before a deploy, get the current file uncached
+    """
+    asset = proxy_assets_service.find(filename)
+    if asset is None:
+        raise HTTPException(status_code=404, detail="Asset not found")
+    headers = {"ETag": asset.etag, "Cache-Control": IMMUTABLE if filename == asset.filename else "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), asset.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=asset.body, media_type="application/javascript", headers=headers)
+
 @router.get("/website")
 async def proxy_website(url: str):
     """
     Generic website proxy
     """
-    
     try:
         # Validate URL
         parsed_url = urlparse(url)
         if not parsed_url.scheme or not parsed_url.netloc:
             raise HTTPException(status_code=400, detail="Invalid URL")
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(
-                url,
-                headers={
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-                }
-            )
-            
-            if response.status_code == 200:
-                html_content = response.text
-                
-                # Remove X-Frame-Options restrictions
-                html_content = re.sub(r'<meta[^>]*http-equiv=["\']X-Frame-Options["\'][^>]*>', '', html_content, flags=re.IGNORECASE)
-                
-                # Fix relative URLs
-                base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
-                html_content = re.sub(r'src="(?!http)', f'src="{base_url}', html_content)
-                html_content = re.sub(r'href="(?!http)', f'href="{base_url}', html_content)
-                html_content = re.sub(r'action="(?!http)', f'action="{base_url}', html_content)
-                
-                return HTMLResponse(content=html_content)
-            else:
-                raise HTTPException(status_code=response.status_code, detail="Failed to fetch website")
-                
+        # Drops X-Frame-Options meta tags and makes src/href/action absolute
+        return await proxy_page(url, "website")
+    except UpstreamUnavailable as e:
+        raise unavailable(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Proxy error: {str(e)}")
\ No newline at end of file
@@ -2,7 +2,8 @@
 Services API Router
 Provides endpoints for all services data
 """
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
+from app.http_cache import cached_json_response
 from app.seed_data.service_loader import get_service_loader
 from typing import List, Dict, Any
 
@@ -16,18 +17,25 @@ def get_categories():
         "categories": ["gas", "electricity", "water", "property"]
     }
 
-@router.get("/{category}")
-def get_services_by_category(category: str):
+# Not /{category}: services.router is included first and answers
+# GET /api/services/{gas,electricity,water,property} with the user's accounts
+@router.get("/catalog/{category}")
+def get_services_by_category(category: str, request: Request):
     """Get all services in a category"""
     if category not in ["gas", "electricity", "water", "property"]:
         raise HTTPException(status_code=400, detail="Invalid category")
     
-    services = loader.get_services_by_category(category)
-    return {
-        "category": category,
-        "count": len(services),
-        "services": services
-    }
+    catalog = loader.catalog
+    
+    def build():
+        services = catalog.services.get(category, [])
+        return {
+            "category": category,
+            "count": len(services),
+            "services": services
+        }
+    
+    return cached_json_response(request, catalog.responses, f"category:{category}", build)
 
 @router.get("/{category}/online")
 def get_online_services(category: str):
@@ -84,24 +92,8 @@ def get_service_names(category: str):
         "names": names
     }
 
-@router.get("/search/{query}")
-def search_services(query: str):
-    """Search services across all categories"""
-    results = {}
-    query_lower = query.lower()
-    
-    for category in ["gas", "electricity", "water", "property"]:
-        services = loader.get_services_by_category(category)
-        matching = [s for s in services if query_lower in s['name'].lower()]
-        if matching:
-            results[category] = matching
-    
-    return {
-        "query": query,
-        "results": results
-    }
-
 @router.get("/")
-def get_all_services():
+def get_all_services(request: Request):
     """Get all services"""
-    return loader.get_all_services()
+    catalog = loader.catalog
+    return cached_json_response(request, catalog.responses, "all", lambda: catalog.services)
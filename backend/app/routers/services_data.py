@@ -2,47 +2,23 @@
 Services Data API Router
 Provides access to supplier information and portal URLs
 """
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Request
 from typing import Dict, Any, List, Optional
-import json
-import os
 import logging
+from app.http_cache import cached_json_response
+from app.seed_data.service_loader import get_service_loader, ServiceCatalog
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/services", tags=["services-data"])
-
-def load_services_data() -> Dict[str, Any]:
-    """Load services data from JSON file"""
-    try:
-        # Try multiple possible paths
-        possible_paths = [
-            os.path.join(os.path.dirname(__file__), "../data/services_data.json"),
-            "/app/app/data/services_data.json",
-            "/app/data/services_data.json",
-            "backend/app/data/services_data.json"
-        ]
-        
-        for services_file in possible_paths:
-            if os.path.exists(services_file):
-                with open(services_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                logger.info(f"Services data loaded from: {services_file}")
-                return data
-        
-        logger.error("Services data file not found in any expected location")
-        return {}
-        
-    except Exception as e:
-        logger.error(f"Error loading services data: {e}")
-        return {}
+loader = get_service_loader()
 
 @router.get("/data")
-async def get_all_services_data():
+async def get_all_services_data(request: Request):
     """Get all services data"""
     try:
-        data = load_services_data()
-        return data
+        catalog = loader.catalog
+        return cached_json_response(request, catalog.responses, "data", lambda: catalog.services)
     except Exception as e:
         logger.error(f"Error getting services data: {e}")
         raise HTTPException(status_code=500, detail="Failed to load services data")
@@ -51,18 +27,15 @@ async def get_all_services_data():
 async def get_supplier_info(supplier_id: str):
     """Get information for a specific supplier"""
     try:
-        data = load_services_data()
-        
-        # Search across all categories
-        for category, suppliers in data.items():
-            for supplier in suppliers:
-                if supplier.get('id') == supplier_id:
-                    return {
-                        "supplier": supplier,
-                        "category": category
-                    }
+        found = loader.find_supplier(supplier_id)
+        if not found:
+            raise HTTPException(status_code=404, detail=f"Supplier '{supplier_id}' not found")
         
-        raise HTTPException(status_code=404, detail=f"Supplier '{supplier_id}' not found")
+        category, supplier = found
+        return {
+            "supplier": supplier,
+            "category": category
+        }
         
     except HTTPException:
         raise
@@ -74,7 +47,7 @@ async def get_supplier_info(supplier_id: str):
 async def get_suppliers_by_category(category: str):
     """Get all suppliers in a specific category"""
     try:
-        data = load_services_data()
+        data = loader.get_all_services()
         
         if category not in data:
             raise HTTPException(status_code=404, detail=f"Category '{category}' not found")
@@ -91,30 +64,27 @@ async def get_suppliers_by_category(category: str):
         logger.error(f"Error getting category data: {e}")
         raise HTTPException(status_code=500, detail="Failed to get category data")
 
+def build_automation_capable(catalog: ServiceCatalog) -> Dict[str, Any]:
+    automation_suppliers = catalog.automation_capable
+    return {
+        "automation_capable_suppliers": automation_suppliers,
+        "count": len(automation_suppliers),
+        "categories": {
+            "direct_form": len([s for s in automation_suppliers if s.get('automation_type') == 'direct_form']),
+            "login_assisted": len([s for s in automation_suppliers if s.get('automation_type') == 'login_assisted']),
+            "total": len(automation_suppliers)
+        }
+    }
+
 @router.get("/automation-capable")
-async def get_automation_capable_suppliers():
+async def get_automation_capable_suppliers(request: Request):
     """Get suppliers that support automation"""
     try:
-        data = load_services_data()
-        automation_suppliers = []
-        
-        for category, suppliers in data.items():
-            for supplier in suppliers:
-                if supplier.get('rpa_enabled') or supplier.get('automation_type') in ['direct_form', 'login_assisted']:
-                    automation_suppliers.append({
-                        **supplier,
-                        "category": category
-                    })
-        
-        return {
-            "automation_capable_suppliers": automation_suppliers,
-            "count": len(automation_suppliers),
-            "categories": {
-                "direct_form": len([s for s in automation_suppliers if s.get('automation_type') == 'direct_form']),
-                "login_assisted": len([s for s in automation_suppliers if s.get('automation_type') == 'login_assisted']),
-                "total": len(automation_suppliers)
-            }
-        }
+        catalog = loader.catalog
+        return cached_json_response(
+            request, catalog.responses, "automation-capable",
+            lambda: build_automation_capable(catalog)
+        )
         
     except Exception as e:
         logger.error(f"Error getting automation capable suppliers: {e}")
@@ -124,23 +94,12 @@ async def get_automation_capable_suppliers():
 async def get_supplier_portal_urls(supplier_id: str):
     """Get all portal URLs for a specific supplier"""
     try:
-        data = load_services_data()
-        
-        # Find supplier
-        supplier = None
-        category = None
-        for cat, suppliers in data.items():
-            for s in suppliers:
-                if s.get('id') == supplier_id:
-                    supplier = s
-                    category = cat
-                    break
-            if supplier:
-                break
-        
-        if not supplier:
+        found = loader.find_supplier(supplier_id)
+        if not found:
             raise HTTPException(status_code=404, detail=f"Supplier '{supplier_id}' not found")
         
+        category, supplier = found
+        
         urls = {
             "supplier_id": supplier_id,
             "supplier_name": supplier.get('name'),
@@ -163,24 +122,13 @@ async def get_supplier_portal_urls(supplier_id: str):
         raise HTTPException(status_code=500, detail="Failed to get portal URLs")
 
 @router.get("/search")
-async def search_suppliers(q: str):
-    """Search suppliers by name or ID"""
+async def search_suppliers(q: str, limit: int = Query(50, ge=1, le=100)):
+    """Search suppliers by name, ID or facility text (prefix and typo tolerant)"""
     try:
-        data = load_services_data()
-        results = []
-        
-        query = q.lower()
-        
-        for category, suppliers in data.items():
-            for supplier in suppliers:
-                name = supplier.get('name', '').lower()
-                supplier_id = supplier.get('id', '').lower()
-                
-                if query in name or query in supplier_id:
-                    results.append({
-                        **supplier,
-                        "category": category
-                    })
+        results = [
+            {**supplier, "category": category, "score": score}
+            for score, category, supplier in loader.search(q, limit)
+        ]
         
         return {
             "query": q,
@@ -192,57 +140,62 @@ async def search_suppliers(q: str):
         logger.error(f"Error searching suppliers: {e}")
         raise HTTPException(status_code=500, detail="Failed to search suppliers")
 
+def build_services_statistics(data: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Any]:
+    stats = {
+        "total_suppliers": 0,
+        "by_category": {},
+        "automation_stats": {
+            "direct_form": 0,
+            "login_assisted": 0,
+            "manual_only": 0,
+            "total_automated": 0
+        },
+        "online_availability": {
+            "online_available": 0,
+            "offline_only": 0
+        },
+        "portal_types": {
+            "government": 0,
+            "private": 0
+        }
+    }
+    
+    for category, suppliers in data.items():
+        stats["by_category"][category] = len(suppliers)
+        stats["total_suppliers"] += len(suppliers)
+        
+        for supplier in suppliers:
+            # Automation stats
+            automation_type = supplier.get('automation_type', 'manual_only')
+            if automation_type in stats["automation_stats"]:
+                stats["automation_stats"][automation_type] += 1
+            
+            if automation_type in ['direct_form', 'login_assisted']:
+                stats["automation_stats"]["total_automated"] += 1
+            
+            # Online availability
+            if supplier.get('online_available'):
+                stats["online_availability"]["online_available"] += 1
+            else:
+                stats["online_availability"]["offline_only"] += 1
+            
+            # Portal types
+            portal_type = supplier.get('type', 'government')
+            if portal_type in stats["portal_types"]:
+                stats["portal_types"][portal_type] += 1
+    
+    return stats
+
 @router.get("/stats")
-async def get_services_statistics():
+async def get_services_statistics(request: Request):
     """Get statistics about services and automation capabilities"""
     try:
-        data = load_services_data()
-        
-        stats = {
-            "total_suppliers": 0,
-            "by_category": {},
-            "automation_stats": {
-                "direct_form": 0,
-                "login_assisted": 0,
-                "manual_only": 0,
-                "total_automated": 0
-            },
-            "online_availability": {
-                "online_available": 0,
-                "offline_only": 0
-            },
-            "portal_types": {
-                "government": 0,
-                "private": 0
-            }
-        }
-        
-        for category, suppliers in data.items():
-            stats["by_category"][category] = len(suppliers)
-            stats["total_suppliers"] += len(suppliers)
-            
-            for supplier in suppliers:
-                # Automation stats
-                automation_type = supplier.get('automation_type', 'manual_only')
-                if automation_type in stats["automation_stats"]:
-                    stats["automation_stats"][automation_type] += 1
-                
-                if automation_type in ['direct_form', 'login_assisted']:
-                    stats["automation_stats"]["total_automated"] += 1
-                
-                # Online availability
-                if supplier.get('online_available'):
-                    stats["online_availability"]["online_available"] += 1
-                else:
-                    stats["online_availability"]["offline_only"] += 1
-                
-                # Portal types
-                portal_type = supplier.get('type', 'government')
-                if portal_type in stats["portal_types"]:
-                    stats["portal_types"][portal_type] += 1
-        
-        return stats
+        catalog = loader.catalog
+        return cached_json_response(
+            request, catalog.responses, "stats",
+            lambda: build_services_statistics(catalog.services)
+        )
         
     except Exception as e:
         logger.error(f"Error getting statistics: {e}")
-        raise HTTPException(status_code=500, detail="Failed to get statistics")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Failed to get statistics")
@@ -1,10 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List
-from app.database import get_db
+from app.database import get_async_db, get_db
 from app.models import User, Document, DocumentType
 from app.schemas import UserResponse, UserUpdate, DocumentResponse, AutoFillData
-from app.auth import get_current_user
+from app.auth import get_current_user, get_current_user_async
 import uuid
 
 router = APIRouter(prefix="/api/users", tags=["Users"])
@@ -26,8 +28,8 @@ def update_profile(
 async def upload_document(
     doc_type: DocumentType,
     file: UploadFile = File(...),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
 ):
     import os
     import shutil
@@ -60,8 +62,8 @@ async def upload_document(
         extracted_data=extracted_data
     )
     db.add(document)
-    db.commit()
-    db.refresh(document)
+    await db.commit()
+    await db.refresh(document)
     
     # Update user profile with extracted data
     if doc_type == DocumentType.AADHAAR and extracted_data:
@@ -77,7 +79,7 @@ async def upload_document(
             current_user.pincode = extracted_data["pincode"]
         if extracted_data.get("gender"):
             current_user.gender = extracted_data["gender"]
-        db.commit()
+        await db.commit()
     
     elif doc_type == DocumentType.PAN and extracted_data:
         if extracted_data.get("pan_number"):
@@ -86,7 +88,7 @@ async def upload_document(
             current_user.full_name = extracted_data["full_name"]
         if extracted_data.get("date_of_birth") and not current_user.date_of_birth:
             current_user.date_of_birth = extracted_data["date_of_birth"]
-        db.commit()
+        await db.commit()
     
     return document
 
@@ -100,17 +102,20 @@ def get_documents(
 @router.get("/documents/{document_id}/download")
 async def download_document(
     document_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
 ):
     """Download document file"""
     from fastapi.responses import FileResponse
     import os
     
-    document = db.query(Document).filter(
-        Document.id == document_id,
-        Document.user_id == current_user.id
-    ).first()
+    result = await db.execute(
+        select(Document).where(
+            Document.id == document_id,
+            Document.user_id == current_user.id
+        )
+    )
+    document = result.scalars().first()
     
     if not document:
         raise HTTPException(status_code=404, detail="Document not found")
@@ -11,15 +11,15 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from sqlalchemy.orm import Session
 from app.database import engine, SessionLocal
-from app.models import Base
+from app.migrations import upgrade
 from app.seed_data.seed_grants import seed_grants
 
 def seed_database():
     """Seed the database with initial services data"""
     
-    # Create all tables
-    print("Creating database tables...")
-    Base.metadata.create_all(bind=engine)
+    # Create or upgrade tables
+    print("Applying database migrations...")
+    upgrade(engine, log=print)
     print("[OK] Tables created successfully")
     
     # Seed government grants
@@ -1,63 +1,197 @@
 """
 Service Data Loader
-Loads all services from JSON file
+Loads all services from JSON file once and keeps an indexed, in-memory catalog
+shared by every services router
 """
+import hashlib
 import json
+import logging
 import os
-from typing import Dict, List, Any
+import threading
+from typing import Dict, List, Any, Optional, Tuple
+from app.http_cache import ResponseCache
+from app.seed_data.service_search import ServiceSearchIndex
+
+logger = logging.getLogger(__name__)
+
+CATEGORIES = ["gas", "electricity", "water", "property"]
+
+# Boolean supplier fields indexed per category as (category, flag)
+INDEXED_FLAGS = ["online_available", "rpa_enabled", "api_available"]
+
+# Automation types the portal can drive directly
+AUTOMATION_TYPES = ["direct_form", "login_assisted"]
+
+
+class ServiceCatalog:
+    """Immutable snapshot of the services data plus its lookup indexes"""
+
+    def __init__(self, services: Dict[str, List[Dict[str, Any]]]):
+        self.services = services
+        self.by_id: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+        self.by_category_id: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self.by_category_name: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self.by_flag: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+        self.automation_capable: List[Dict[str, Any]] = []
+        # Serialized bodies for endpoints that only change with the catalog
+        self.responses = ResponseCache()
+        self.search_index = ServiceSearchIndex(services)
+
+        for category, suppliers in services.items():
+            for flag in INDEXED_FLAGS:
+                self.by_flag[(category, flag)] = []
+
+            for supplier in suppliers:
+                supplier_id = supplier.get('id')
+                if supplier_id:
+                    # First occurrence wins, matching the old linear scan
+                    self.by_id.setdefault(supplier_id, (category, supplier))
+                    self.by_category_id.setdefault((category, supplier_id), supplier)
+
+                name = supplier.get('name')
+                if name:
+                    self.by_category_name.setdefault((category, name.lower()), supplier)
+
+                for flag in INDEXED_FLAGS:
+                    if supplier.get(flag, False):
+                        self.by_flag[(category, flag)].append(supplier)
+
+                if supplier.get('rpa_enabled') or supplier.get('automation_type') in AUTOMATION_TYPES:
+                    self.automation_capable.append({**supplier, "category": category})
+
 
 class ServiceLoader:
-    def __init__(self):
-        self.data_file = os.path.join(os.path.dirname(__file__), 'services_data.json')
-        self.services = self._load_services()
-    
-    def _load_services(self) -> Dict[str, List[Dict[str, Any]]]:
-        """Load services from JSON file"""
+    def __init__(self, data_file: Optional[str] = None):
+        self.data_file = data_file or os.path.join(os.path.dirname(__file__), 'services_data.json')
+        self.version: Optional[str] = None
+        self._mtime: Optional[float] = None
+        self._reload_lock = threading.Lock()
+        self._watcher: Optional[threading.Thread] = None
+        self._stop_watching = threading.Event()
+        self.catalog = ServiceCatalog({})
+        self.reload(force=True)
+
+    @property
+    def services(self) -> Dict[str, List[Dict[str, Any]]]:
+        return self.catalog.services
+
+    def _get_mtime(self) -> Optional[float]:
         try:
-            with open(self.data_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except Exception as e:
-            print(f"Error loading services: {e}")
-            return {}
-    
+            return os.stat(self.data_file).st_mtime
+        except OSError:
+            return None
+
+    def reload(self, force: bool = False) -> bool:
+        """
+        Re-read the JSON file and swap in a freshly indexed catalog.
+
+        The new catalog is fully built before it replaces the current one, so
+        readers always see either the old or the new snapshot. Returns True if
+        the catalog was replaced.
+        """
+        with self._reload_lock:
+            mtime = self._get_mtime()
+            try:
+                with open(self.data_file, 'rb') as f:
+                    raw = f.read()
+            except Exception as e:
+                logger.error(f"Error loading services: {e}")
+                return False
+
+            version = hashlib.sha256(raw).hexdigest()
+            if not force and version == self.version:
+                # Touched but unchanged - remember the mtime so we stop re-reading
+                self._mtime = mtime
+                return False
+
+            try:
+                services = json.loads(raw.decode('utf-8'))
+                catalog = ServiceCatalog(services)
+            except Exception as e:
+                # Keep serving the last good catalog
+                logger.error(f"Error loading services: {e}")
+                self._mtime = mtime
+                return False
+
+            self.catalog = catalog
+            self.version = version
+            self._mtime = mtime
+            logger.info(f"Services data loaded from: {self.data_file} (version {version[:12]})")
+            return True
+
+    def check_for_changes(self) -> bool:
+        """Reload if the data file's mtime moved since the last load"""
+        mtime = self._get_mtime()
+        if mtime is None or mtime == self._mtime:
+            return False
+        return self.reload()
+
+    def start_watching(self, interval: float) -> None:
+        """Poll the data file in a background thread and reload on change"""
+        if interval <= 0 or (self._watcher and self._watcher.is_alive()):
+            return
+        self._stop_watching.clear()
+
+        def watch():
+            while not self._stop_watching.wait(interval):
+                try:
+                    self.check_for_changes()
+                except Exception as e:
+                    logger.error(f"Services data watcher error: {e}")
+
+        self._watcher = threading.Thread(target=watch, name="services-data-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self) -> None:
+        self._stop_watching.set()
+        if self._watcher:
+            self._watcher.join(timeout=1)
+            self._watcher = None
+
     def get_all_services(self) -> Dict[str, List[Dict[str, Any]]]:
         """Get all services"""
-        return self.services
-    
+        return self.catalog.services
+
+    def get_categories(self) -> List[str]:
+        """Get categories present in the loaded data"""
+        return list(self.catalog.services.keys())
+
     def get_services_by_category(self, category: str) -> List[Dict[str, Any]]:
         """Get services by category (gas, electricity, water, property)"""
-        return self.services.get(category, [])
-    
+        return self.catalog.services.get(category, [])
+
     def get_service_by_id(self, category: str, service_id: str) -> Dict[str, Any]:
         """Get specific service by ID"""
-        services = self.services.get(category, [])
-        for service in services:
-            if service['id'] == service_id:
-                return service
-        return {}
-    
+        return self.catalog.by_category_id.get((category, service_id), {})
+
+    def find_supplier(self, supplier_id: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """Find a supplier in any category, returns (category, supplier) or None"""
+        return self.catalog.by_id.get(supplier_id)
+
     def get_online_services(self, category: str) -> List[Dict[str, Any]]:
         """Get only online available services"""
-        services = self.services.get(category, [])
-        return [s for s in services if s.get('online_available', False)]
-    
+        return self.catalog.by_flag.get((category, 'online_available'), [])
+
     def get_rpa_enabled_services(self, category: str) -> List[Dict[str, Any]]:
         """Get only RPA enabled services"""
-        services = self.services.get(category, [])
-        return [s for s in services if s.get('rpa_enabled', False)]
-    
+        return self.catalog.by_flag.get((category, 'rpa_enabled'), [])
+
+    def get_automation_capable_suppliers(self) -> List[Dict[str, Any]]:
+        """Get suppliers (with their category) that support automation"""
+        return self.catalog.automation_capable
+
     def get_service_names(self, category: str) -> List[str]:
         """Get list of service names for a category"""
-        services = self.services.get(category, [])
+        services = self.catalog.services.get(category, [])
         return [s['name'] for s in services]
-    
+
     def get_service_by_name(self, category: str, name: str) -> Dict[str, Any]:
         """Get service by name"""
-        services = self.services.get(category, [])
-        for service in services:
-            if service['name'].lower() == name.lower():
-                return service
-        return {}
+        return self.catalog.by_category_name.get((category, name.lower()), {})
+
+    def search(self, query: str, limit: int = 50) -> List[Tuple[float, str, Dict[str, Any]]]:
+        """Ranked prefix/fuzzy search across all categories"""
+        return self.catalog.search_index.search(query, limit)
 
 # Global instance
 _loader = None
@@ -72,17 +206,17 @@ def get_service_loader() -> ServiceLoader:
 # Test
 if __name__ == "__main__":
     loader = get_service_loader()
-    
+
     print("All Gas Services:")
     for service in loader.get_services_by_category('gas'):
         print(f"  - {service['name']} ({service['type']})")
-    
+
     print("\nOnline Electricity Services:")
     for service in loader.get_online_services('electricity'):
         print(f"  - {service['name']}")
-    
+
     print("\nRPA Enabled Services:")
-    for category in ['gas', 'electricity', 'water', 'property']:
+    for category in CATEGORIES:
         rpa_services = loader.get_rpa_enabled_services(category)
         if rpa_services:
             print(f"\n{category.upper()}:")
@@ -0,0 +1,138 @@
+"""
+Service Search Index
+Token, prefix and trigram inverted index over supplier names, ids and facility
+text, built once per catalog load
+"""
+import re
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, List, Any, Set, Tuple
+
+# Field weights - a hit in the supplier name beats a hit in facility notes
+SEARCH_FIELDS = [
+    ("name", 3.0),
+    ("id", 2.0),
+    ("name_change_facility", 1.0),
+    ("address_change_facility", 1.0),
+]
+
+# Match quality multipliers per match kind
+EXACT_MATCH = 1.0
+PREFIX_MATCH = 0.8
+SKELETON_MATCH = 0.6
+FUZZY_MATCH = 0.6
+
+# Minimum Dice similarity on trigrams for a fuzzy hit
+FUZZY_THRESHOLD = 0.45
+
+TOKEN_RE = re.compile(r"[^\w]+|_", re.UNICODE)
+VOWELS = set("aeiouy")
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in TOKEN_RE.split(text.lower()) if t]
+
+
+def trigrams(token: str) -> Set[str]:
+    padded = f" {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def skeleton(token: str) -> str:
+    """
+    Consonant skeleton of a token, so transliteration variants that differ
+    only in vowels or doubled letters (gujrat/gujarat, amdavad/amdaavad)
+    share a key
+    """
+    out = []
+    for i, ch in enumerate(token):
+        if i > 0 and ch in VOWELS:
+            continue
+        if out and out[-1] == ch:
+            continue
+        out.append(ch)
+    return "".join(out)
+
+
+class ServiceSearchIndex:
+    """Ranked prefix and fuzzy search over the suppliers of one catalog"""
+
+    def __init__(self, services: Dict[str, List[Dict[str, Any]]]):
+        self.docs: List[Tuple[str, Dict[str, Any]]] = []
+        # token -> {doc index: best field weight}
+        self.postings: Dict[str, Dict[int, float]] = defaultdict(dict)
+        self.trigram_index: Dict[str, Set[str]] = defaultdict(set)
+        self.skeleton_index: Dict[str, Set[str]] = defaultdict(set)
+        self.trigram_counts: Dict[str, int] = {}
+
+        for category, suppliers in services.items():
+            for supplier in suppliers:
+                doc = len(self.docs)
+                self.docs.append((category, supplier))
+                for field, weight in SEARCH_FIELDS:
+                    value = supplier.get(field)
+                    if not isinstance(value, str):
+                        continue
+                    for token in tokenize(value):
+                        if weight > self.postings[token].get(doc, 0):
+                            self.postings[token][doc] = weight
+
+        for token in self.postings:
+            grams = trigrams(token)
+            self.trigram_counts[token] = len(grams)
+            for gram in grams:
+                self.trigram_index[gram].add(token)
+            self.skeleton_index[skeleton(token)].add(token)
+
+        self.postings = dict(self.postings)
+        self.vocabulary = sorted(self.postings)
+
+    def _expand(self, query_token: str) -> Dict[str, float]:
+        """Vocabulary tokens matching one query token, with match quality"""
+        matches: Dict[str, float] = {}
+
+        if query_token in self.postings:
+            matches[query_token] = EXACT_MATCH
+
+        i = bisect_left(self.vocabulary, query_token)
+        while i < len(self.vocabulary) and self.vocabulary[i].startswith(query_token):
+            matches.setdefault(self.vocabulary[i], PREFIX_MATCH)
+            i += 1
+
+        # Typos and transliterations only make sense past a couple of letters
+        if len(query_token) < 3:
+            return matches
+
+        for token in self.skeleton_index.get(skeleton(query_token), ()):
+            matches.setdefault(token, SKELETON_MATCH)
+
+        query_grams = trigrams(query_token)
+        shared: Dict[str, int] = defaultdict(int)
+        for gram in query_grams:
+            for token in self.trigram_index.get(gram, ()):
+                shared[token] += 1
+        for token, common in shared.items():
+            if token in matches:
+                continue
+            similarity = 2 * common / (len(query_grams) + self.trigram_counts[token])
+            if similarity >= FUZZY_THRESHOLD:
+                matches[token] = FUZZY_MATCH * similarity
+
+        return matches
+
+    def search(self, query: str, limit: int = 50) -> List[Tuple[float, str, Dict[str, Any]]]:
+        """Return (score, category, supplier) tuples, best match first"""
+        scores: Dict[int, float] = defaultdict(float)
+
+        for query_token in tokenize(query):
+            best: Dict[int, float] = {}
+            for token, quality in self._expand(query_token).items():
+                for doc, weight in self.postings[token].items():
+                    score = quality * weight
+                    if score > best.get(doc, 0):
+                        best[doc] = score
+            for doc, score in best.items():
+                scores[doc] += score
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+        return [(round(score, 3), *self.docs[doc]) for doc, score in ranked]
@@ -40,7 +40,8 @@ class DirectAutomationService:
             if missing_fields:
                 return {
                     "success": False,
-                    "message": f"Missing required fields: {', '.join(missing_fields)}"
+                    "message": f"Missing required fields: {', '.join(missing_fields)}",
+                    "retryable": False
                 }
             
             # Simulate automation process
@@ -98,7 +99,8 @@ class DirectAutomationService:
             if missing_fields:
                 return {
                     "success": False,
-                    "message": f"Missing required fields: {', '.join(missing_fields)}"
+                    "message": f"Missing required fields: {', '.join(missing_fields)}",
+                    "retryable": False
                 }
             
             application_number = self._generate_application_number("GG")
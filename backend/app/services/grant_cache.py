@@ -0,0 +1,47 @@
+"""
+Grant cache invalidation
+Lets per-process caches derived from the grants table drop themselves when a
+commit inserts, deletes or changes the grant columns they depend on
+"""
+from typing import Callable, Iterable
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+
+from app.models_grants import Grant
+
+
+def invalidate_on_grant_write(name: str, columns: Iterable[str], invalidate: Callable[[], None]) -> None:
+    """
+    Call invalidate() after any commit that inserted or deleted a grant, or
+    updated one of columns. Updates to other columns (view/application
+    counters) are ignored.
+    """
+    columns = tuple(columns)
+    # Session.info key marking that this session's commit affects the cache
+    dirty_key = f"grant_cache_dirty:{name}"
+
+    def mark_dirty(target):
+        session = object_session(target)
+        if session is not None:
+            session.info[dirty_key] = True
+
+    @event.listens_for(Grant, "after_insert")
+    @event.listens_for(Grant, "after_delete")
+    def added_or_removed(mapper, connection, target):
+        mark_dirty(target)
+
+    @event.listens_for(Grant, "after_update")
+    def updated(mapper, connection, target):
+        state = inspect(target)
+        if any(state.attrs[column].history.has_changes() for column in columns):
+            mark_dirty(target)
+
+    @event.listens_for(Session, "after_commit")
+    def after_commit(session):
+        if session.info.pop(dirty_key, False):
+            invalidate()
+
+    @event.listens_for(Session, "after_rollback")
+    def after_rollback(session):
+        session.info.pop(dirty_key, None)
@@ -0,0 +1,230 @@
+"""
+Grant Eligibility Service
+Scores a business profile against grant eligibility criteria. Open grants are
+precompiled into per-criterion bitsets so one profile can be scored against
+every grant at once.
+"""
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.models_grants import Grant, GrantStatus
+from app.services.grant_cache import invalidate_on_grant_write
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Points per satisfied criterion; a grant is a match at ELIGIBLE_SCORE
+WEIGHTS = {
+    "business_type": 30,
+    "category": 25,
+    "sector": 20,
+    "registration": 25,
+}
+ELIGIBLE_SCORE = 50
+
+
+def matching_label(name: str, profile) -> str:
+    """How a satisfied criterion is shown to the applicant"""
+    if name == "business_type":
+        return f"Business type: {profile.business_type}"
+    if name == "category":
+        return f"Category: {profile.category}"
+    if name == "sector":
+        return f"Sector: {profile.sector}"
+    return f"Registration: {profile.registration}"
+
+
+def missing_label(name: str, criteria: Dict[str, Any]) -> str:
+    """How an unmet criterion is shown to the applicant"""
+    if name == "business_type":
+        return f"Business type must be one of: {', '.join(criteria['business_type'])}"
+    if name == "category":
+        return "Category/ownership requirement not met"
+    if name == "sector":
+        return f"Sector requirement: {criteria['sector']}"
+    return f"Registration required: {criteria['registration']}"
+
+
+def evaluate(criteria: Dict[str, Any], profile) -> Tuple[int, List[str], List[str]]:
+    """Score one grant's criteria, returns (score, matching, missing) descriptions"""
+    matching_criteria = []
+    missing_criteria = []
+    score = 0
+
+    # Check business type
+    if "business_type" in criteria:
+        required_types = criteria["business_type"]
+        if profile.business_type and profile.business_type in required_types:
+            matching_criteria.append(matching_label("business_type", profile))
+            score += WEIGHTS["business_type"]
+        else:
+            missing_criteria.append(missing_label("business_type", criteria))
+
+    # Check category (SC/ST/Women)
+    if "category" in criteria or "owner" in criteria:
+        if profile.category:
+            matching_criteria.append(matching_label("category", profile))
+            score += WEIGHTS["category"]
+        else:
+            missing_criteria.append(missing_label("category", criteria))
+
+    # Check sector
+    if "sector" in criteria:
+        if profile.sector:
+            matching_criteria.append(matching_label("sector", profile))
+            score += WEIGHTS["sector"]
+        else:
+            missing_criteria.append(missing_label("sector", criteria))
+
+    # Check registration
+    if "registration" in criteria:
+        if profile.registration:
+            matching_criteria.append(matching_label("registration", profile))
+            score += WEIGHTS["registration"]
+        else:
+            missing_criteria.append(missing_label("registration", criteria))
+
+    return score, matching_criteria, missing_criteria
+
+
+class CompiledEligibility:
+    """
+    Open grants as column arrays plus one bitset per criterion, bit i standing
+    for grants[i]. Every grant that satisfies the same set of criteria gets the
+    same score, so a profile is scored per criteria combination with integer
+    ANDs, and only combinations at or above min_score are expanded to rows.
+    """
+
+    def __init__(self, grants: List[Tuple[int, str, Optional[str], Optional[int], Optional[dict]]]):
+        self.ids: List[int] = []
+        self.names: List[str] = []
+        self.amounts: List[Optional[str]] = []
+        self.priorities: List[int] = []
+        self.required: List[Tuple[str, ...]] = []
+        self.criteria: List[Dict[str, Any]] = []
+        # business type value -> grants that list it
+        self.business_type_bits: Dict[str, int] = {}
+        # criterion -> grants that have that requirement
+        self.requires: Dict[str, int] = {name: 0 for name in WEIGHTS}
+
+        for i, (grant_id, name, amount_display, priority, criteria) in enumerate(grants):
+            bit = 1 << i
+            criteria = criteria or {}
+            self.ids.append(grant_id)
+            self.names.append(name)
+            self.amounts.append(amount_display)
+            self.priorities.append(priority or 0)
+            self.criteria.append(criteria)
+
+            if "business_type" in criteria:
+                self.requires["business_type"] |= bit
+                required_types = criteria["business_type"]
+                if isinstance(required_types, str):
+                    required_types = [required_types]
+                for business_type in required_types:
+                    self.business_type_bits[business_type] = self.business_type_bits.get(business_type, 0) | bit
+            if "category" in criteria or "owner" in criteria:
+                self.requires["category"] |= bit
+            if "sector" in criteria:
+                self.requires["sector"] |= bit
+            if "registration" in criteria:
+                self.requires["registration"] |= bit
+
+            self.required.append(tuple(name for name in WEIGHTS if self.requires[name] & bit))
+
+    def score(self, profile, min_score: int = 1) -> List[Dict[str, Any]]:
+        """Open grants scoring at least min_score for the profile, best first"""
+        satisfied = [
+            (name, bits) for name, bits in (
+                ("business_type", self.business_type_bits.get(profile.business_type, 0) if profile.business_type else 0),
+                ("category", self.requires["category"] if profile.category else 0),
+                ("sector", self.requires["sector"] if profile.sector else 0),
+                ("registration", self.requires["registration"] if profile.registration else 0),
+            ) if bits
+        ]
+
+        results = []
+        for combo in range(1, 1 << len(satisfied)):
+            matched = [name for j, (name, _) in enumerate(satisfied) if combo >> j & 1]
+            score = sum(WEIGHTS[name] for name in matched)
+            if score < min_score:
+                continue
+
+            # Grants satisfying exactly this combination of criteria
+            mask = -1
+            for j, (_, bits) in enumerate(satisfied):
+                mask = mask & bits if combo >> j & 1 else mask & ~bits
+            if mask <= 0:
+                continue
+
+            eligible = score >= ELIGIBLE_SCORE
+            matching = [matching_label(name, profile) for name in matched]
+            flags = bin(mask)[:1:-1]
+            i = flags.find("1")
+            while i != -1:
+                results.append((-score, -self.priorities[i], self.ids[i], {
+                    "grant_id": self.ids[i],
+                    "grant_name": self.names[i],
+                    "grant_amount": self.amounts[i],
+                    "score": score,
+                    "eligible": eligible,
+                    "matching_criteria": matching,
+                    "missing_criteria": [
+                        missing_label(name, self.criteria[i]) for name in self.required[i] if name not in matched
+                    ],
+                }))
+                i = flags.find("1", i + 1)
+
+        # Highest score first, featured grants first among equals
+        results.sort(key=lambda r: r[:3])
+        return [r[3] for r in results]
+
+
+class GrantEligibilityService:
+    """Keeps the compiled open grants per process, rebuilt after grant writes"""
+
+    def __init__(self, ttl: float):
+        self.logger = logger
+        self.ttl = ttl
+        self._compiled: Optional[CompiledEligibility] = None
+        self._expires_at = 0.0
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._compiled = None
+
+    def get_compiled(self, db: Session) -> CompiledEligibility:
+        compiled = self._compiled
+        if compiled is not None and time.monotonic() < self._expires_at:
+            return compiled
+
+        generation = self._generation
+        grants = db.query(
+            Grant.id, Grant.name, Grant.amount_display, Grant.priority, Grant.eligibility_criteria
+        ).filter(Grant.status == GrantStatus.OPEN).order_by(Grant.id).all()
+        compiled = CompiledEligibility([tuple(row) for row in grants])
+        with self._lock:
+            if generation == self._generation:
+                self._compiled = compiled
+                self._expires_at = time.monotonic() + self.ttl
+        return compiled
+
+    def score_all(self, db: Session, profile, min_score: int = 1) -> List[Dict[str, Any]]:
+        return self.get_compiled(db).score(profile, min_score)
+
+
+# Global service instance
+grant_eligibility_service = GrantEligibilityService(ttl=settings.GRANT_ELIGIBILITY_CACHE_TTL)
+invalidate_on_grant_write(
+    "eligibility",
+    ["status", "eligibility_criteria", "name", "amount_display", "priority"],
+    grant_eligibility_service.invalidate
+)
@@ -0,0 +1,84 @@
+"""
+Grant Facets Service
+Category, ministry, level and status counts for the grants filter sidebar,
+computed with one GROUP BY and cached until grants are written
+"""
+import logging
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.models_grants import Grant, GrantCategory, Ministry, GrantLevel, GrantStatus
+from app.services.grant_cache import invalidate_on_grant_write
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+FACETS = {
+    "category": GrantCategory,
+    "ministry": Ministry,
+    "level": GrantLevel,
+    "status": GrantStatus,
+}
+
+
+class GrantFacetsService:
+    """Caches facet counts per process, dropped on grant writes or after a TTL"""
+
+    def __init__(self, ttl: float):
+        self.logger = logger
+        self.ttl = ttl
+        self._facets: Optional[Dict[str, Any]] = None
+        self._expires_at = 0.0
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._facets = None
+
+    def get_facets(self, db: Session) -> Dict[str, Any]:
+        facets = self._facets
+        if facets is not None and time.monotonic() < self._expires_at:
+            return facets
+
+        generation = self._generation
+        facets = self._compute(db)
+        with self._lock:
+            # A write committed while we were counting - serve it, don't cache it
+            if generation == self._generation:
+                self._facets = facets
+                self._expires_at = time.monotonic() + self.ttl
+        return facets
+
+    def _compute(self, db: Session) -> Dict[str, Any]:
+        columns = [getattr(Grant, name) for name in FACETS]
+        rows = db.query(*columns, func.count(Grant.id)).group_by(*columns).all()
+
+        counts = {name: Counter() for name in FACETS}
+        total = 0
+        for row in rows:
+            count = row[-1]
+            total += count
+            for name, value in zip(FACETS, row[:-1]):
+                if value is not None:
+                    counts[name][value] += count
+
+        facets: Dict[str, Any] = {"total": total}
+        for name, enum_type in FACETS.items():
+            facets[name] = [
+                {"value": member.value, "name": member.name, "count": counts[name].get(member, 0)}
+                for member in enum_type
+            ]
+        return facets
+
+
+# Global service instance
+grant_facets_service = GrantFacetsService(ttl=settings.GRANT_FACETS_CACHE_TTL)
+invalidate_on_grant_write("facets", FACETS, grant_facets_service.invalidate)
@@ -0,0 +1,169 @@
+"""
+Grant Search Service
+Full-text search over grants: SQLite FTS5 or PostgreSQL tsvector + GIN,
+falling back to ILIKE when neither is set up
+"""
+import logging
+import re
+from typing import Optional
+from sqlalchemy import text, or_, func, literal_column, Integer, Float
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session, Query
+
+from app.models_grants import Grant
+
+logger = logging.getLogger(__name__)
+
+FTS_TABLE = "grants_fts"
+PG_INDEX = "ix_grants_search_vector"
+
+# Columns covered by the index, in FTS5 column order
+SEARCH_COLUMNS = ["name", "name_hindi", "description", "tags", "eligibility_summary"]
+
+# bm25 column weights, same order as SEARCH_COLUMNS
+FTS5_WEIGHTS = "10.0, 10.0, 2.0, 5.0, 3.0"
+
+# Must be identical in the index and in queries so PostgreSQL uses the index
+PG_SEARCH_VECTOR = (
+    "(setweight(to_tsvector('simple', coalesce(name, '') || ' ' || coalesce(name_hindi, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(tags::text, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(eligibility_summary, '') || ' ' || coalesce(description, '')), 'C'))"
+)
+
+_columns = ", ".join(SEARCH_COLUMNS)
+_new_values = ", ".join(f"new.{c}" for c in SEARCH_COLUMNS)
+_old_values = ", ".join(f"old.{c}" for c in SEARCH_COLUMNS)
+
+SQLITE_DDL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        {_columns},
+        content='grants', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON grants BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, {_columns}) VALUES (new.id, {_new_values});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON grants BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {_columns}) VALUES ('delete', old.id, {_old_values});
+    END""",
+    # Only fires for indexed columns, so view/application counters don't touch the index
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF {_columns} ON grants BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {_columns}) VALUES ('delete', old.id, {_old_values});
+        INSERT INTO {FTS_TABLE}(rowid, {_columns}) VALUES (new.id, {_new_values});
+    END""",
+]
+
+POSTGRES_DDL = [
+    f"CREATE INDEX IF NOT EXISTS {PG_INDEX} ON grants USING GIN ({PG_SEARCH_VECTOR})",
+]
+
+# Characters with meaning in to_tsquery syntax
+TSQUERY_SPECIAL = re.compile(r"[&|!():*<>'\"\\]")
+
+
+class GrantSearchService:
+    """Builds the full-text index and applies search filters to grant queries"""
+
+    def __init__(self):
+        self.logger = logger
+        self._available: Optional[bool] = None
+
+    def setup(self, engine: Engine) -> bool:
+        """Create the search index for the engine's dialect (idempotent)"""
+        try:
+            with engine.begin() as conn:
+                self._available = self.create_index(conn)
+        except Exception as e:
+            self.logger.warning(f"Grant full-text search unavailable, using ILIKE: {e}")
+            self._available = False
+        return self._available
+
+    def create_index(self, conn: Connection) -> bool:
+        """Create the index on an open connection, False if the dialect has no full-text support"""
+        dialect = conn.dialect.name
+        if dialect == "sqlite":
+            exists = conn.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                {"name": FTS_TABLE}
+            ).first()
+            for statement in SQLITE_DDL:
+                conn.execute(text(statement))
+            if not exists:
+                # Index rows that were there before the FTS table
+                conn.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+            return True
+        if dialect == "postgresql":
+            for statement in POSTGRES_DDL:
+                conn.execute(text(statement))
+            return True
+        return False
+
+    def is_available(self, db: Session) -> bool:
+        if self._available is None:
+            dialect = db.get_bind().dialect.name
+            try:
+                if dialect == "sqlite":
+                    found = db.execute(
+                        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                        {"name": FTS_TABLE}
+                    ).first()
+                elif dialect == "postgresql":
+                    found = db.execute(
+                        text("SELECT 1 FROM pg_indexes WHERE indexname = :name"),
+                        {"name": PG_INDEX}
+                    ).first()
+                else:
+                    found = None
+                self._available = found is not None
+            except Exception:
+                self._available = False
+        return self._available
+
+    @staticmethod
+    def _fts5_query(search: str) -> str:
+        # Every word as a quoted prefix term, implicitly ANDed
+        terms = [word.replace('"', '""') for word in search.split()]
+        return " ".join(f'"{term}"*' for term in terms if term)
+
+    @staticmethod
+    def _tsquery(search: str) -> str:
+        words = TSQUERY_SPECIAL.sub(" ", search).split()
+        return " & ".join(f"'{word}':*" for word in words)
+
+    def apply(self, query: Query, db: Session, search: str, ranked: bool = True) -> Query:
+        """Filter a Grant query by search text, ordered by relevance unless ranked is False"""
+        if not self.is_available(db):
+            search_term = f"%{search}%"
+            return query.filter(
+                or_(
+                    Grant.name.ilike(search_term),
+                    Grant.description.ilike(search_term),
+                    Grant.eligibility_summary.ilike(search_term)
+                )
+            )
+
+        dialect = db.get_bind().dialect.name
+
+        if dialect == "sqlite":
+            match = self._fts5_query(search)
+            if not match:
+                return query
+            matches = text(
+                f"SELECT rowid AS grant_id, bm25({FTS_TABLE}, {FTS5_WEIGHTS}) AS rank "
+                f"FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :match"
+            ).bindparams(match=match).columns(grant_id=Integer, rank=Float).subquery("grant_matches")
+            query = query.join(matches, matches.c.grant_id == Grant.id)
+            # bm25 is lower-is-better
+            return query.order_by(matches.c.rank) if ranked else query
+
+        tsquery_text = self._tsquery(search)
+        if not tsquery_text:
+            return query
+        tsquery = func.to_tsquery("simple", tsquery_text)
+        vector = literal_column(PG_SEARCH_VECTOR)
+        query = query.filter(vector.op("@@")(tsquery))
+        return query.order_by(func.ts_rank(vector, tsquery).desc()) if ranked else query
+
+
+# Global service instance
+grant_search_service = GrantSearchService()
@@ -0,0 +1,96 @@
+"""
+Grant Views Service
+Buffers grant detail views in memory and flushes them in batches with
+UPDATE ... SET view_count = view_count + n, so viewing a grant is a pure read
+"""
+import logging
+import threading
+from typing import Dict, Optional
+
+from sqlalchemy import bindparam, update
+from sqlalchemy.engine import Engine
+
+from app.models_grants import Grant
+
+logger = logging.getLogger(__name__)
+
+_increment = (
+    update(Grant.__table__)
+    .where(Grant.__table__.c.id == bindparam("grant_id"))
+    .values(view_count=Grant.__table__.c.view_count + bindparam("views"))
+)
+
+
+class GrantViewsService:
+    """Per-process view counter buffer with a background flusher"""
+
+    def __init__(self):
+        self.logger = logger
+        self._pending: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._engine: Optional[Engine] = None
+        self._interval = 0.0
+        self._flusher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def record_view(self, grant_id: int) -> None:
+        with self._lock:
+            self._pending[grant_id] = self._pending.get(grant_id, 0) + 1
+        if self._interval <= 0 and self._engine is not None:
+            # No staleness allowed - write through
+            self.flush()
+
+    def pending_views(self, grant_id: int) -> int:
+        """Views recorded by this process that are not in the database yet"""
+        return self._pending.get(grant_id, 0)
+
+    def flush(self) -> int:
+        """Write buffered views to the database, returns the number of grants updated"""
+        if self._engine is None:
+            return 0
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return 0
+            try:
+                with self._engine.begin() as conn:
+                    conn.execute(
+                        _increment,
+                        [{"grant_id": grant_id, "views": views} for grant_id, views in pending.items()]
+                    )
+            except Exception as e:
+                self.logger.error(f"Failed to flush grant views, will retry: {e}")
+                with self._lock:
+                    for grant_id, views in pending.items():
+                        self._pending[grant_id] = self._pending.get(grant_id, 0) + views
+                return 0
+            return len(pending)
+
+    def start(self, engine: Engine, interval: float) -> None:
+        """Flush every interval seconds (<= 0 writes each view through)"""
+        self._engine = engine
+        self._interval = interval
+        if interval <= 0 or (self._flusher and self._flusher.is_alive()):
+            return
+        self._stop.clear()
+
+        def run():
+            while not self._stop.wait(interval):
+                self.flush()
+
+        self._flusher = threading.Thread(target=run, name="grant-views-flusher", daemon=True)
+        self._flusher.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._flusher:
+            self._flusher.join(timeout=5)
+            self._flusher = None
+        # Don't lose the tail on shutdown
+        self.flush()
+
+
+# Global service instance
+grant_views_service = GrantViewsService()
@@ -0,0 +1,314 @@
+"""
+HTTP Client Service
+One httpx.AsyncClient per worker for every outbound call (portal proxy,
+WhatsApp API), so connections are kept alive and reused instead of paying
+DNS + TCP + TLS setup on each request.
+
+Each upstream host also gets its own guard: a cap on concurrent requests
+with a bounded wait for a slot, a read timeout that adapts to the host's
+recent latency, and a circuit breaker that fails fast after repeated
+failures. One slow government portal then costs a few quick 503s instead
+of every worker's time.
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from importlib.util import find_spec
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, Optional
+from urllib.parse import urlsplit
+
+from app.config import get_settings
+
+if TYPE_CHECKING:
+    import httpx
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Response latencies (and timeouts) kept per host for the adaptive timeout and stats
+LATENCY_WINDOW = 100
+# Samples needed before the adaptive timeout replaces the configured one
+MIN_LATENCY_SAMPLES = 10
+
+
+class UpstreamUnavailable(Exception):
+    """Raised without contacting the host (circuit open or no free slot); callers should answer 503"""
+
+    def __init__(self, host: str, reason: str, retry_after: float):
+        super().__init__(f"{host}: {reason}")
+        self.host = host
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class HostState:
+    """Concurrency slot, latency window and circuit breaker for one upstream host"""
+
+    def __init__(self, max_concurrency: int):
+        self.slot = asyncio.Semaphore(max_concurrency)
+        self.in_flight = 0
+        self.waiting = 0
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.requests = 0
+        self.failures = 0
+        self.rejected = 0
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial_in_flight = False
+
+    def latency_quantile(self, q: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[int(q * (len(ordered) - 1))]
+
+
+class HTTPClientService:
+    """Application-lifetime httpx client with per-host limits, timeouts and circuit breakers"""
+
+    def __init__(
+        self,
+        max_connections: int,
+        max_keepalive: int,
+        max_per_host: int,
+        keepalive_expiry: float,
+        connect_timeout: float,
+        read_timeout: float,
+        http2: bool,
+        host_queue_timeout: float,
+        min_read_timeout: float,
+        timeout_multiplier: float,
+        breaker_failures: int,
+        breaker_cooldown: float,
+    ):
+        self.logger = logger
+        self.max_connections = max_connections
+        self.max_keepalive = max_keepalive
+        self.max_per_host = max(1, max_per_host)
+        self.keepalive_expiry = keepalive_expiry
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        # h2 is optional; without it everything goes over HTTP/1.1
+        self.http2 = http2 and find_spec("h2") is not None
+        self.host_queue_timeout = host_queue_timeout
+        self.min_read_timeout = min(min_read_timeout, read_timeout)
+        self.timeout_multiplier = timeout_multiplier
+        self.breaker_failures = max(1, breaker_failures)
+        self.breaker_cooldown = breaker_cooldown
+        self._client: Optional["httpx.AsyncClient"] = None
+        self._hosts: Dict[str, HostState] = {}
+
+    def start(self) -> "httpx.AsyncClient":
+        """Create the client; called from the app lifespan, or lazily on first use"""
+        if self._client is None:
+            import httpx  # deferred, keeps httpx out of the import-time path
+
+            self._client = httpx.AsyncClient(
+                http2=self.http2,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive,
+                    keepalive_expiry=self.keepalive_expiry,
+                ),
+                timeout=httpx.Timeout(self.read_timeout, connect=self.connect_timeout),
+            )
+            # Semaphores belong to the loop that uses them, start fresh with the client
+            self._hosts = {}
+            self.logger.info(
+                f"HTTP client started (http2={self.http2}, max_connections={self.max_connections}, "
+                f"max_per_host={self.max_per_host})"
+            )
+        return self._client
+
+    @property
+    def client(self) -> "httpx.AsyncClient":
+        return self._client or self.start()
+
+    def read_timeout_for(self, state: HostState) -> float:
+        """p95 latency x multiplier, within [min_read_timeout, read_timeout]"""
+        if len(state.latencies) < MIN_LATENCY_SAMPLES:
+            return self.read_timeout
+        adaptive = state.latency_quantile(0.95) * self.timeout_multiplier
+        return min(self.read_timeout, max(self.min_read_timeout, adaptive))
+
+    @asynccontextmanager
+    async def guard(self, url: str) -> AsyncIterator[HostState]:
+        """
+        Admit one request to url's host: checks the circuit breaker, then waits
+        up to host_queue_timeout for one of its max_per_host slots. The caller
+        reports the outcome with record().
+        """
+        host = urlsplit(url).netloc.lower()
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = HostState(self.max_per_host)
+
+        trial = False
+        if state.opened_at is not None:
+            remaining = state.opened_at + self.breaker_cooldown - time.monotonic()
+            if remaining > 0 or state.trial_in_flight:
+                state.rejected += 1
+                raise UpstreamUnavailable(host, "circuit open", max(1.0, remaining))
+            # Half-open: let a single request through to probe the host
+            trial = state.trial_in_flight = True
+
+        state.waiting += 1
+        try:
+            await asyncio.wait_for(state.slot.acquire(), self.host_queue_timeout)
+        except asyncio.TimeoutError:
+            state.rejected += 1
+            if trial:
+                state.trial_in_flight = False
+            raise UpstreamUnavailable(host, f"{self.max_per_host} requests already in flight", 1.0)
+        finally:
+            state.waiting -= 1
+
+        state.in_flight += 1
+        try:
+            yield state
+        finally:
+            state.in_flight -= 1
+            state.slot.release()
+            if trial:
+                state.trial_in_flight = False
+
+    def record(self, state: HostState, latency: Optional[float], failed: bool) -> None:
+        state.requests += 1
+        if latency is not None:
+            state.latencies.append(latency)
+        if not failed:
+            state.consecutive_failures = 0
+            if state.opened_at is not None:
+                state.opened_at = None
+                self.logger.info("Upstream circuit closed after a successful probe")
+            return
+        state.failures += 1
+        state.consecutive_failures += 1
+        if state.opened_at is not None or state.consecutive_failures >= self.breaker_failures:
+            # Trips (or re-trips after a failed probe) for another cooldown
+            now = time.monotonic()
+            if state.opened_at is None or now - state.opened_at >= self.breaker_cooldown:
+                self.logger.warning(
+                    f"Upstream circuit open for {self.breaker_cooldown:.0f}s after "
+                    f"{state.consecutive_failures} consecutive failures"
+                )
+            state.opened_at = now
+
+    def _timeout(self, state: HostState, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        if "timeout" not in kwargs:
+            import httpx
+
+            kwargs["timeout"] = httpx.Timeout(self.read_timeout_for(state), connect=self.connect_timeout)
+        return kwargs
+
+    @staticmethod
+    def _timed_out(error: Exception, start: float) -> Optional[float]:
+        """
+        A timeout counts as a latency sample, so a host that slowed down
+        widens its own adaptive timeout instead of timing out for good
+        """
+        import httpx
+
+        return time.perf_counter() - start if isinstance(error, httpx.TimeoutException) else None
+
+    async def request(self, method: str, url: str, **kwargs: Any) -> "httpx.Response":
+        """client.request() under the host's guard; the body is read before the slot is released"""
+        import httpx
+
+        async with self.guard(url) as state:
+            start = time.perf_counter()
+            try:
+                response = await self.client.request(method, url, **self._timeout(state, kwargs))
+            except httpx.TransportError as e:
+                self.record(state, self._timed_out(e, start), failed=True)
+                raise
+            self.record(state, time.perf_counter() - start, failed=response.status_code >= 500)
+            return response
+
+    @asynccontextmanager
+    async def stream(self, method: str, url: str, **kwargs: Any) -> AsyncIterator["httpx.Response"]:
+        """
+        client.stream() holding the host's slot until the response is closed.
+        Latency is time to response headers; a transport error while the body
+        is read still counts as a failure.
+        """
+        import httpx
+
+        async with self.guard(url) as state:
+            start = time.perf_counter()
+            latency = None
+            failed = False
+            try:
+                async with self.client.stream(method, url, **self._timeout(state, kwargs)) as response:
+                    latency = time.perf_counter() - start
+                    failed = response.status_code >= 500
+                    yield response
+            except httpx.TransportError as e:
+                failed = True
+                if latency is None:
+                    latency = self._timed_out(e, start)
+                raise
+            finally:
+                if latency is not None or failed:
+                    self.record(state, latency, failed)
+
+    def host_stats(self) -> Dict[str, Dict[str, Any]]:
+        now = time.monotonic()
+        hosts = {}
+        for host, state in self._hosts.items():
+            p50 = state.latency_quantile(0.5)
+            p95 = state.latency_quantile(0.95)
+            if state.opened_at is None:
+                circuit = "closed"
+            elif now - state.opened_at < self.breaker_cooldown:
+                circuit = "open"
+            else:
+                circuit = "half-open"
+            hosts[host] = {
+                "circuit": circuit,
+                "in_flight": state.in_flight,
+                "waiting": state.waiting,
+                "requests": state.requests,
+                "failures": state.failures,
+                "error_rate": round(state.failures / state.requests, 4) if state.requests else 0.0,
+                "consecutive_failures": state.consecutive_failures,
+                "rejected": state.rejected,
+                "latency_p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+                "latency_p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+                "read_timeout": round(self.read_timeout_for(state), 2),
+            }
+        return hosts
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "started": self._client is not None,
+            "http2": self.http2,
+            "max_connections": self.max_connections,
+            "max_keepalive": self.max_keepalive,
+            "max_per_host": self.max_per_host,
+            "hosts": self.host_stats(),
+        }
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+# Global service instance
+http_client_service = HTTPClientService(
+    max_connections=settings.HTTP_CLIENT_MAX_CONNECTIONS,
+    max_keepalive=settings.HTTP_CLIENT_MAX_KEEPALIVE,
+    max_per_host=settings.HTTP_CLIENT_MAX_PER_HOST,
+    keepalive_expiry=settings.HTTP_CLIENT_KEEPALIVE_EXPIRY,
+    connect_timeout=settings.HTTP_CLIENT_CONNECT_TIMEOUT,
+    read_timeout=settings.HTTP_CLIENT_READ_TIMEOUT,
+    http2=settings.HTTP_CLIENT_HTTP2,
+    host_queue_timeout=settings.HTTP_CLIENT_HOST_QUEUE_TIMEOUT,
+    min_read_timeout=settings.HTTP_CLIENT_MIN_READ_TIMEOUT,
+    timeout_multiplier=settings.HTTP_CLIENT_TIMEOUT_MULTIPLIER,
+    breaker_failures=settings.HTTP_CLIENT_BREAKER_FAILURES,
+    breaker_cooldown=settings.HTTP_CLIENT_BREAKER_COOLDOWN,
+)
@@ -0,0 +1,121 @@
+"""
+Password Hashing Service
+Runs bcrypt off the event loop in a small dedicated thread pool with a bounded
+queue, so a login burst degrades into 503s instead of stalling the worker
+"""
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from app.auth import get_password_hash, verify_password
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class PasswordHashingBusy(Exception):
+    """Raised when the hashing queue is full; callers should answer 503"""
+
+
+class PasswordHashingService:
+    """bcrypt executor with admission control and queue metrics"""
+
+    def __init__(self, workers: int, max_queue: int):
+        self.logger = logger
+        self.workers = max(1, workers)
+        self.max_queue = max(0, max_queue)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        # Jobs admitted and not finished yet (queued + running)
+        self._in_flight = 0
+        self._running = 0
+        self.peak_in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self._wait_total = 0.0
+        self.max_wait = 0.0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.workers, thread_name_prefix="password-hash"
+                    )
+        return self._executor
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run fn(*args) in the pool, raises PasswordHashingBusy if the queue is full"""
+        with self._lock:
+            if self._in_flight >= self.workers + self.max_queue:
+                self.rejected += 1
+                raise PasswordHashingBusy(
+                    f"{self._in_flight} password hashes in flight (limit {self.workers + self.max_queue})"
+                )
+            self._in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self._in_flight)
+        submitted = time.perf_counter()
+
+        def job():
+            waited = time.perf_counter() - submitted
+            with self._lock:
+                self._running += 1
+                self._wait_total += waited
+                self.max_wait = max(self.max_wait, waited)
+            try:
+                return fn(*args)
+            finally:
+                # Counted here rather than in the awaiting coroutine, so a
+                # cancelled request still holds its slot until the hash is done
+                with self._lock:
+                    self._running -= 1
+                    self._in_flight -= 1
+                    self.completed += 1
+
+        queued = False
+        try:
+            future = asyncio.get_running_loop().run_in_executor(self._get_executor(), job)
+            queued = True
+        finally:
+            if not queued:
+                # Submission failed (e.g. the executor is shut down), job() never
+                # runs to release the slot
+                with self._lock:
+                    self._in_flight -= 1
+        return await future
+
+    async def hash(self, password: str) -> str:
+        return await self.run(get_password_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self.run(verify_password, plain_password, hashed_password)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "running": self._running,
+                "queued": self._in_flight - self._running,
+                "peak_in_flight": self.peak_in_flight,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "avg_wait_ms": round(self._wait_total / self.completed * 1000, 2) if self.completed else 0.0,
+                "max_wait_ms": round(self.max_wait * 1000, 2),
+            }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+# Global service instance
+password_hashing_service = PasswordHashingService(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE
+)
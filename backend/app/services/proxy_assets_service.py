@@ -0,0 +1,85 @@
+"""
+Proxy Assets Service
+Scripts injected into proxied pages live in app/static/proxy as plain .js
+files. They are minified and content-hashed once, then served from versioned
+URLs that browsers may cache forever, so a proxied page only carries a
+<script src> tag and a small JSON config block.
+"""
+import hashlib
+import json
+import logging
+import os
+from collections import namedtuple
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+ASSET_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "static", "proxy")
+ASSET_ROUTE = "/api/proxy/assets"
+
+Asset = namedtuple("Asset", ["name", "version", "filename", "body", "etag"])
+
+
+def minify_js(source: str) -> str:
+    """
+    Line-level minification: drops indentation, blank lines and whole-line //
+    comments. Newlines are kept so automatic semicolon insertion is unaffected;
+    lines inside template literals only lose their indentation.
+    """
+    lines = []
+    for line in source.splitlines():
+        line = line.strip()
+        if line and not line.startswith("//"):
+            lines.append(line)
+    return "\n".join(lines)
+
+
+class ProxyAssetsService:
+    """Minified, versioned copies of the injected scripts"""
+
+    def __init__(self, directory: str = ASSET_DIR):
+        self.logger = logger
+        self.directory = directory
+        self._assets: Dict[str, Asset] = {}
+
+    def load(self) -> None:
+        """(Re)build every asset in the directory"""
+        assets = {}
+        for filename in sorted(os.listdir(self.directory)):
+            name, extension = os.path.splitext(filename)
+            if extension != ".js":
+                continue
+            with open(os.path.join(self.directory, filename), encoding="utf-8") as f:
+                source = f.read()
+            body = minify_js(source).encode("utf-8")
+            version = hashlib.sha256(body).hexdigest()[:12]
+            assets[name] = Asset(name, version, f"{name}.{version}.js", body, f'"{version}"')
+            self.logger.info(f"Proxy asset {name}: {len(source)} -> {len(body)} bytes, version {version}")
+        self._assets = assets
+
+    def asset(self, name: str) -> Asset:
+        if not self._assets:
+            self.load()
+        return self._assets[name]
+
+    def find(self, filename: str) -> Optional[Asset]:
+        """Asset for a requested file name, current version or not"""
+        name = filename.split(".", 1)[0]
+        try:
+            return self.asset(name)
+        except KeyError:
+            return None
+
+    def script_tag(self, name: str, config: Optional[Dict[str, Any]] = None) -> str:
+        """<script src> for the asset, preceded by its JSON config when given"""
+        asset = self.asset(name)
+        tag = f'<script src="{ASSET_ROUTE}/{asset.filename}"></script>'
+        if config:
+            # "</" can't appear inside a script element
+            data = json.dumps(config, separators=(",", ":")).replace("</", "<\\/")
+            tag = f'<script type="application/json" id="{name}-config">{data}</script>' + tag
+        return tag
+
+
+# Global service instance
+proxy_assets_service = ProxyAssetsService()
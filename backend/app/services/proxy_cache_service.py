@@ -0,0 +1,406 @@
+"""
+Proxy Cache Service
+Rewritten proxy pages in a byte-bounded in-memory LRU backed by a directory
+on disk, so they survive restarts and are shared by workers. Freshness
+follows the upstream Cache-Control / Expires headers. Expired pages are
+revalidated with their ETag / Last-Modified, served stale while a
+background refresh runs, and concurrent misses for one URL share a single
+upstream fetch.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Mapping, Optional, Set, Tuple
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Workers share the disk directory but each keeps its own index of it; this
+# often (seconds) a write re-reads the directory to see the others' files
+DISK_RESCAN_INTERVAL = 5.0
+
+
+def parse_cache_control(value: str) -> Dict[str, Optional[str]]:
+    directives = {}
+    for part in value.split(","):
+        name, _, argument = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = argument.strip().strip('"') or None
+    return directives
+
+
+def parse_seconds(value: Optional[str]) -> Optional[float]:
+    try:
+        return max(0.0, float(value)) if value is not None else None
+    except ValueError:
+        return None
+
+
+def parse_http_date(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+class CachedPage:
+    """One rewritten page plus what is needed to judge and revalidate it"""
+
+    __slots__ = ("body", "etag", "last_modified", "stored_at", "max_age", "stale_while_revalidate")
+
+    def __init__(
+        self,
+        body: bytes,
+        etag: Optional[str],
+        last_modified: Optional[str],
+        stored_at: float,
+        max_age: float,
+        stale_while_revalidate: float,
+    ):
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.stored_at = stored_at
+        self.max_age = max_age
+        self.stale_while_revalidate = stale_while_revalidate
+
+    def age(self) -> float:
+        return time.time() - self.stored_at
+
+    def is_fresh(self) -> bool:
+        return self.age() < self.max_age
+
+    def is_servable_stale(self) -> bool:
+        return self.age() < self.max_age + self.stale_while_revalidate
+
+    def metadata(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__ if name != "body"}
+
+
+class ProxyCacheService:
+    """Memory + disk LRU of proxied pages with HTTP revalidation and request collapsing"""
+
+    def __init__(
+        self,
+        enabled: bool,
+        directory: str,
+        memory_max_bytes: int,
+        disk_max_bytes: int,
+        max_entry_bytes: int,
+        default_ttl: float,
+        stale_while_revalidate: float,
+    ):
+        self.logger = logger
+        self.enabled = enabled
+        self.directory = directory
+        self.memory_max_bytes = memory_max_bytes
+        self.disk_max_bytes = disk_max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self.default_ttl = default_ttl
+        self.stale_while_revalidate = stale_while_revalidate
+
+        self._memory: "OrderedDict[str, CachedPage]" = OrderedDict()
+        self._memory_bytes = 0
+        # file stem -> bytes on disk, least recently used first; built on first disk access
+        self._disk: Optional["OrderedDict[str, int]"] = None
+        self._disk_bytes = 0
+        self._disk_scanned_at = 0.0
+        self._disk_lock = threading.Lock()
+        self._flights: Dict[str, asyncio.Future] = {}
+        self._background: Set[asyncio.Task] = set()
+
+        # Where get() found pages, and how proxy responses were answered (HIT, STALE, ...)
+        self.lookups = {"memory": 0, "disk": 0, "miss": 0}
+        self.responses: Dict[str, int] = {}
+        self.background_refreshes = 0
+        self.background_failures = 0
+
+    # Freshness
+
+    def make_page(self, body: bytes, headers: Mapping[str, str], heuristic: bool = False) -> Optional[CachedPage]:
+        """
+        A page for a 200 response, or None if the upstream forbids storing it or
+        it is too big. heuristic applies the default TTL and stale window to
+        responses that don't state their freshness; without it they are only
+        kept for revalidation.
+        """
+        if len(body) > self.max_entry_bytes:
+            return None
+        policy = self._policy(headers, heuristic)
+        if policy is None:
+            return None
+        max_age, stale_while_revalidate, stored_at = policy
+        return CachedPage(
+            body, headers.get("etag"), headers.get("last-modified"), stored_at, max_age, stale_while_revalidate
+        )
+
+    def revalidated(self, page: CachedPage, headers: Mapping[str, str], heuristic: bool = False) -> CachedPage:
+        """page after a 304: same body, freshness and validators from the new headers"""
+        policy = self._policy(headers, heuristic) or (0.0, 0.0, time.time())
+        max_age, stale_while_revalidate, stored_at = policy
+        return CachedPage(
+            page.body,
+            headers.get("etag") or page.etag,
+            headers.get("last-modified") or page.last_modified,
+            stored_at,
+            max_age,
+            stale_while_revalidate,
+        )
+
+    def _policy(self, headers: Mapping[str, str], heuristic: bool) -> Optional[Tuple[float, float, float]]:
+        """(max_age, stale_while_revalidate, stored_at) as a shared cache would see them"""
+        directives = parse_cache_control(headers.get("cache-control", ""))
+        if "no-store" in directives or "private" in directives or headers.get("vary", "").strip() == "*":
+            return None
+        if "set-cookie" in headers:
+            # A session cookie for one visitor must never be replayed to another
+            return None
+
+        now = time.time()
+        max_age = parse_seconds(directives.get("s-maxage")) if "s-maxage" in directives else None
+        if max_age is None and "max-age" in directives:
+            max_age = parse_seconds(directives.get("max-age"))
+        if max_age is None and "expires" in headers:
+            expires = parse_http_date(headers.get("expires"))
+            date = parse_http_date(headers.get("date")) or now
+            max_age = max(0.0, expires - date) if expires is not None else 0.0
+        if max_age is None:
+            max_age = self.default_ttl if heuristic else 0.0
+        if "no-cache" in directives:
+            max_age = 0.0
+
+        if "no-cache" in directives or "must-revalidate" in directives or "proxy-revalidate" in directives:
+            stale_while_revalidate = 0.0
+        else:
+            stale_while_revalidate = parse_seconds(directives.get("stale-while-revalidate"))
+            if stale_while_revalidate is None:
+                stale_while_revalidate = self.stale_while_revalidate if heuristic else 0.0
+
+        has_validators = "etag" in headers or "last-modified" in headers
+        if max_age <= 0 and stale_while_revalidate <= 0 and not has_validators:
+            # Could never be served from cache
+            return None
+        age = parse_seconds(headers.get("age")) or 0.0
+        return max_age, stale_while_revalidate, now - age
+
+    @staticmethod
+    def conditional_headers(page: Optional[CachedPage]) -> Dict[str, str]:
+        headers = {}
+        if page is not None:
+            if page.etag:
+                headers["If-None-Match"] = page.etag
+            if page.last_modified:
+                headers["If-Modified-Since"] = page.last_modified
+        return headers
+
+    # Storage
+
+    async def get(self, key: str) -> Optional[CachedPage]:
+        if not self.enabled:
+            return None
+        page = self._memory.get(key)
+        if page is not None:
+            self._memory.move_to_end(key)
+            self.lookups["memory"] += 1
+            return page
+        page = await asyncio.to_thread(self._read, key)
+        if page is None:
+            self.lookups["miss"] += 1
+            return None
+        self.lookups["disk"] += 1
+        self._remember(key, page)
+        return page
+
+    def put(self, key: str, page: CachedPage) -> None:
+        if not self.enabled:
+            return
+        self._remember(key, page)
+        self._spawn(asyncio.to_thread(self._write, key, page))
+
+    def _remember(self, key: str, page: CachedPage) -> None:
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= len(previous.body)
+        self._memory[key] = page
+        self._memory_bytes += len(page.body)
+        while self._memory_bytes > self.memory_max_bytes and self._memory:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted.body)
+
+    @staticmethod
+    def _stem(key: str) -> str:
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    def _load_disk_index(self, rescan: bool = False) -> "OrderedDict[str, int]":
+        if self._disk is None or rescan:
+            os.makedirs(self.directory, exist_ok=True)
+            files = []
+            for entry in os.scandir(self.directory):
+                if entry.name.endswith(".body"):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        # Evicted by another worker mid-scan
+                        continue
+                    files.append((stat.st_mtime, entry.name[:-5], stat.st_size))
+            self._disk = OrderedDict((stem, size) for _, stem, size in sorted(files))
+            self._disk_bytes = sum(self._disk.values())
+            self._disk_scanned_at = time.monotonic()
+        return self._disk
+
+    def _read(self, key: str) -> Optional[CachedPage]:
+        stem = self._stem(key)
+        path = os.path.join(self.directory, stem)
+        with self._disk_lock:
+            index = self._load_disk_index()
+            try:
+                with open(path + ".json") as f:
+                    metadata = json.load(f)
+                with open(path + ".body", "rb") as f:
+                    body = f.read()
+                os.utime(path + ".body")
+            except (OSError, ValueError):
+                return None
+            if stem in index:
+                index.move_to_end(stem)
+            else:
+                # Written by another worker
+                index[stem] = len(body)
+                self._disk_bytes += len(body)
+        try:
+            return CachedPage(body, **metadata)
+        except TypeError:
+            # Written by an incompatible version
+            return None
+
+    def _write(self, key: str, page: CachedPage) -> None:
+        stem = self._stem(key)
+        path = os.path.join(self.directory, stem)
+        try:
+            with self._disk_lock:
+                index = self._load_disk_index()
+                # Body first: a reader only trusts a body that has metadata next to it
+                for suffix, data in ((".body", page.body), (".json", json.dumps(page.metadata()).encode())):
+                    tmp = f"{path}{suffix}.{os.getpid()}.tmp"
+                    with open(tmp, "wb") as f:
+                        f.write(data)
+                    os.replace(tmp, path + suffix)
+                self._disk_bytes += len(page.body) - index.pop(stem, 0)
+                index[stem] = len(page.body)
+                if (
+                    self._disk_bytes > self.disk_max_bytes
+                    or time.monotonic() - self._disk_scanned_at > DISK_RESCAN_INTERVAL
+                ):
+                    # Count what every worker has written before deciding what to evict
+                    index = self._load_disk_index(rescan=True)
+                while self._disk_bytes > self.disk_max_bytes and len(index) > 1:
+                    evicted, size = index.popitem(last=False)
+                    self._disk_bytes -= size
+                    for suffix in (".body", ".json"):
+                        try:
+                            os.unlink(os.path.join(self.directory, evicted + suffix))
+                        except FileNotFoundError:
+                            pass
+        except OSError as e:
+            self.logger.warning(f"Failed to write proxy cache entry: {e}")
+
+    async def clear(self) -> None:
+        """Drop every entry; call on the event loop, which owns the memory LRU"""
+        self._memory.clear()
+        self._memory_bytes = 0
+        await asyncio.to_thread(self._clear_disk)
+
+    def _clear_disk(self) -> None:
+        with self._disk_lock:
+            index = self._load_disk_index()
+            for stem in index:
+                for suffix in (".body", ".json"):
+                    try:
+                        os.unlink(os.path.join(self.directory, stem + suffix))
+                    except FileNotFoundError:
+                        pass
+            index.clear()
+            self._disk_bytes = 0
+
+    # Request collapsing
+
+    def claim(self, key: str) -> Tuple[bool, asyncio.Future]:
+        """(True, flight) for the caller that should fetch key, (False, flight) for everyone else"""
+        flight = self._flights.get(key)
+        if flight is not None and not flight.done():
+            return False, flight
+        flight = asyncio.get_running_loop().create_future()
+        self._flights[key] = flight
+        return True, flight
+
+    def finish(self, key: str, page: Optional[CachedPage]) -> None:
+        """End the fetch for key: store page (if any) and hand it to collapsed callers; safe to call twice"""
+        flight = self._flights.pop(key, None)
+        if flight is None or flight.done():
+            return
+        if page is not None:
+            self.put(key, page)
+        flight.set_result(page)
+
+    def revalidate_in_background(self, key: str, refresh: Callable[[], Awaitable[Optional[CachedPage]]]) -> None:
+        """Run refresh() unless a fetch for key is already under way"""
+        leader, _ = self.claim(key)
+        if not leader:
+            return
+
+        async def run():
+            page = None
+            try:
+                page = await refresh()
+                self.background_refreshes += 1
+            except Exception as e:
+                self.background_failures += 1
+                self.logger.warning(f"Background refresh of {key} failed, keeping the stale copy: {e}")
+            finally:
+                self.finish(key, page)
+
+        self._spawn(run())
+
+    def _spawn(self, coroutine) -> None:
+        task = asyncio.get_running_loop().create_task(coroutine)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    def record(self, outcome: str) -> None:
+        self.responses[outcome] = self.responses.get(outcome, 0) + 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._memory_bytes,
+            "disk_entries": len(self._disk) if self._disk is not None else None,
+            "disk_bytes": self._disk_bytes if self._disk is not None else None,
+            "lookups": dict(self.lookups),
+            "responses": dict(self.responses),
+            "background_refreshes": self.background_refreshes,
+            "background_failures": self.background_failures,
+            "in_flight": len(self._flights),
+        }
+
+
+# Global service instance
+proxy_cache_service = ProxyCacheService(
+    enabled=settings.PROXY_CACHE_ENABLED,
+    directory=settings.PROXY_CACHE_DIR,
+    memory_max_bytes=settings.PROXY_CACHE_MEMORY_MAX_BYTES,
+    disk_max_bytes=settings.PROXY_CACHE_DISK_MAX_BYTES,
+    max_entry_bytes=settings.PROXY_CACHE_MAX_ENTRY_BYTES,
+    default_ttl=settings.PROXY_CACHE_DEFAULT_TTL,
+    stale_while_revalidate=settings.PROXY_CACHE_STALE_WHILE_REVALIDATE,
+)
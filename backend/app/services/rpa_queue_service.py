@@ -0,0 +1,275 @@
+"""
+RPA Queue Service
+Portal automation runs as jobs in the rpa_submissions table instead of inside
+the request. API handlers enqueue a row and return its id; worker threads
+claim due jobs, run direct_automation_service and record the outcome, retrying
+failures with exponential backoff. The table is the queue, so jobs survive
+restarts and any number of worker processes can share it.
+"""
+import logging
+import os
+import random
+import secrets
+import socket
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.config import get_settings
+from app.models import Application, RPASubmission, RPASubmissionStatus
+from app.services.direct_automation_service import direct_automation_service
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# target_website -> automation run for a job of that target
+AUTOMATIONS: Dict[str, Callable[[Dict[str, Any]], Dict[str, Any]]] = {
+    "torrent-power": direct_automation_service.submit_torrent_power_name_change,
+    "gujarat-gas": direct_automation_service.submit_gujarat_gas_name_change,
+    "water": direct_automation_service.submit_water_name_change,
+}
+
+PENDING = (RPASubmissionStatus.QUEUED, RPASubmissionStatus.RETRY)
+# Claim candidates fetched per query; losing all of them to other workers just means another round
+CLAIM_BATCH = 5
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class RPAQueueService:
+    """Database-backed job queue with a pool of worker threads"""
+
+    def __init__(self, base_delay: float, max_delay: float, max_retries: int, job_timeout: float):
+        self.logger = logger
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_retries = max_retries
+        self.job_timeout = job_timeout
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._sessions: Optional[sessionmaker] = None
+        self._workers: List[threading.Thread] = []
+        self._stop = threading.Event()
+        # Set on enqueue so an idle worker in this process starts at once
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self.succeeded = 0
+        self.retried = 0
+        self.failed = 0
+
+    def enqueue(
+        self,
+        db: Session,
+        target_website: str,
+        submission_data: Dict[str, Any],
+        application_id: Optional[int] = None,
+        target_url: Optional[str] = None,
+    ) -> RPASubmission:
+        """Store a job for target_website and commit it; a worker picks it up"""
+        if target_website not in AUTOMATIONS:
+            raise ValueError(f"No automation for {target_website}")
+        job = RPASubmission(
+            application_id=application_id,
+            target_website=target_website,
+            target_url=target_url,
+            status=RPASubmissionStatus.QUEUED,
+            submission_data=submission_data,
+            retry_count=0,
+            max_retries=self.max_retries,
+            next_attempt_at=utcnow(),
+            job_token=secrets.token_urlsafe(24),
+        )
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+        self._wake.set()
+        return job
+
+    def backoff(self, retry_count: int) -> float:
+        """Seconds before retry number retry_count + 1, jittered so failed batches spread out"""
+        delay = min(self.max_delay, self.base_delay * (2 ** retry_count))
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def claim(self, db: Session) -> Optional[RPASubmission]:
+        """
+        Take the next due job, or one whose worker has gone silent. PostgreSQL
+        skips rows other workers hold locked; the conditional UPDATE is what
+        makes the claim safe on SQLite, where FOR UPDATE is a no-op.
+
+        A reclaim counts as an attempt: a job that hangs or kills its worker
+        on every run fails once its retries are used up. Returns with no
+        transaction open, so none is held while the automation runs.
+        """
+        now = utcnow()
+        due = or_(
+            and_(RPASubmission.status.in_(PENDING), RPASubmission.next_attempt_at <= now),
+            and_(
+                RPASubmission.status == RPASubmissionStatus.PROCESSING,
+                RPASubmission.locked_at < now - timedelta(seconds=self.job_timeout),
+            ),
+        )
+        candidates = db.execute(
+            select(RPASubmission.id, RPASubmission.status, RPASubmission.retry_count, RPASubmission.max_retries)
+            .where(due)
+            .order_by(RPASubmission.next_attempt_at, RPASubmission.id)
+            .limit(CLAIM_BATCH)
+            .with_for_update(skip_locked=True)
+        ).all()
+        for job_id, status, retry_count, max_retries in candidates:
+            retry_count, max_retries = retry_count or 0, max_retries or 0
+            reclaim = status == RPASubmissionStatus.PROCESSING
+            if reclaim and retry_count >= max_retries:
+                values = dict(
+                    status=RPASubmissionStatus.FAILED,
+                    locked_by=None,
+                    locked_at=None,
+                    completed_at=now,
+                    error_message=f"No result within {self.job_timeout:.0f}s on the last attempt",
+                )
+            else:
+                values = dict(
+                    status=RPASubmissionStatus.PROCESSING,
+                    locked_by=self.worker_id,
+                    locked_at=now,
+                    started_at=now,
+                )
+                if reclaim:
+                    values["retry_count"] = RPASubmission.retry_count + 1
+            # Matches only if no other worker claimed (or finished) the row since the SELECT
+            claimed = db.execute(
+                update(RPASubmission)
+                .where(RPASubmission.id == job_id, RPASubmission.status == status, due)
+                .values(**values)
+                .execution_options(synchronize_session=False)
+            )
+            if claimed.rowcount != 1:
+                continue
+            if values["status"] == RPASubmissionStatus.FAILED:
+                db.commit()
+                self.logger.warning(f"RPA job {job_id} failed: its worker stopped responding on the last attempt")
+                with self._lock:
+                    self.failed += 1
+                continue
+            # Loaded before the commit; with expire_on_commit off (see start)
+            # it stays usable without opening another transaction
+            job = db.get(RPASubmission, job_id, populate_existing=True)
+            db.commit()
+            if reclaim:
+                self.logger.warning(
+                    f"Reclaimed RPA job {job_id} from an unresponsive worker, "
+                    f"attempt {retry_count + 2}/{max_retries + 1}"
+                )
+            return job
+        db.rollback()
+        return None
+
+    def run(self, db: Session, job: RPASubmission) -> None:
+        """Run a claimed job's automation and record the outcome"""
+        claimed_at = job.locked_at
+        try:
+            result = AUTOMATIONS[job.target_website](dict(job.submission_data or {}))
+        except Exception as e:
+            self.logger.exception(f"RPA job {job.id} raised")
+            result = {"success": False, "message": f"Automation failed: {e}"}
+
+        db.refresh(job)
+        if job.status != RPASubmissionStatus.PROCESSING or job.locked_at != claimed_at:
+            # Ran past job_timeout and another worker took it over; its result wins
+            self.logger.warning(f"RPA job {job.id} was reclaimed while running, discarding this result")
+            db.rollback()
+            return
+
+        now = utcnow()
+        # The provider's echo of the form is personal data we already hold in submission_data
+        job.response_data = {key: value for key, value in result.items() if key != "submitted_data"}
+        job.locked_by = None
+        job.locked_at = None
+        if result.get("success"):
+            job.status = RPASubmissionStatus.SUCCESS
+            job.confirmation_number = result.get("application_number")
+            job.error_message = None
+            job.completed_at = now
+            if job.application_id is not None and job.confirmation_number:
+                application = db.get(Application, job.application_id)
+                if application is not None:
+                    application.external_reference = job.confirmation_number
+            outcome = "succeeded"
+        elif result.get("retryable", True) and job.retry_count < job.max_retries:
+            delay = self.backoff(job.retry_count)
+            job.status = RPASubmissionStatus.RETRY
+            job.retry_count += 1
+            job.next_attempt_at = now + timedelta(seconds=delay)
+            job.error_message = result.get("message")
+            outcome = "retried"
+            self.logger.info(f"RPA job {job.id} failed, retry {job.retry_count}/{job.max_retries} in {delay:.0f}s")
+        else:
+            job.status = RPASubmissionStatus.FAILED
+            job.error_message = result.get("message")
+            job.completed_at = now
+            outcome = "failed"
+            self.logger.warning(f"RPA job {job.id} failed after {job.retry_count} retries: {job.error_message}")
+        db.commit()
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+
+    def process_next(self) -> bool:
+        """Claim and run one job, returns False when none is due"""
+        with self._sessions() as db:
+            job = self.claim(db)
+            if job is None:
+                return False
+            self.run(db, job)
+            return True
+
+    def _work(self, poll_interval: float) -> None:
+        while not self._stop.is_set():
+            try:
+                if self.process_next():
+                    continue
+            except Exception as e:
+                self.logger.error(f"RPA worker error: {e}")
+            self._wake.wait(poll_interval)
+            self._wake.clear()
+
+    def start(self, engine: Engine, workers: int, poll_interval: float) -> None:
+        """Bind to engine; with workers > 0 also start processing jobs"""
+        self._sessions = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+        if workers <= 0 or self._workers:
+            return
+        self._stop.clear()
+        for n in range(workers):
+            worker = threading.Thread(target=self._work, args=(poll_interval,), name=f"rpa-worker-{n}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+        self.logger.info(f"RPA queue started with {workers} workers ({self.worker_id})")
+
+    def stop(self) -> None:
+        """Wait briefly for running jobs; one that outlives this is reclaimed after job_timeout"""
+        self._stop.set()
+        self._wake.set()
+        for worker in self._workers:
+            worker.join(timeout=10)
+        self._workers = []
+
+    def stats(self, db: Session) -> Dict[str, Any]:
+        counts = dict(db.execute(select(RPASubmission.status, func.count()).group_by(RPASubmission.status)).all())
+        return {
+            "workers": len(self._workers),
+            "worker_id": self.worker_id,
+            "jobs": {status.value: counts.get(status, 0) for status in RPASubmissionStatus},
+            "processed_here": {"succeeded": self.succeeded, "retried": self.retried, "failed": self.failed},
+        }
+
+
+# Global service instance
+rpa_queue_service = RPAQueueService(
+    base_delay=settings.RPA_RETRY_BASE_DELAY,
+    max_delay=settings.RPA_RETRY_MAX_DELAY,
+    max_retries=settings.RPA_MAX_RETRIES,
+    job_timeout=settings.RPA_JOB_TIMEOUT,
+)
@@ -0,0 +1,152 @@
+"""
+Async database benchmark
+Throughput of GET /api/documents/ at 200 concurrent clients, comparing the
+old handler (blocking Session queries inside an async def) with the current
+AsyncSession route. While the load runs, /health is probed to show how long
+the event loop is blocked for requests that don't touch the database.
+
+Usage:
+    python benchmarks/async_db_benchmark.py
+    python benchmarks/async_db_benchmark.py --clients 200 --requests 4000 --database-url postgresql://...
+
+With --database-url the tables are dropped and recreated, so point it at a
+scratch database. Without it a temporary SQLite file is used.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=4000)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--documents", type=int, default=20, help="documents per user")
+    parser.add_argument("--database-url")
+    return parser.parse_args()
+
+
+args = parse_args()
+_tmp = None
+if args.database_url:
+    os.environ["DATABASE_URL"] = args.database_url
+else:
+    _tmp = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+    _tmp.close()
+    os.environ["DATABASE_URL"] = f"sqlite:///{_tmp.name}"
+
+import httpx  # noqa: E402
+from fastapi import Depends  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from app.main import app  # noqa: E402
+from app.database import Base, engine, get_db  # noqa: E402
+from app.auth import auth_cache, create_access_token, get_current_user  # noqa: E402
+from app.models import Document, DocumentType, User  # noqa: E402
+
+
+async def legacy_get_user_documents(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """The route as it was before AsyncSession: blocking queries on the event loop"""
+    return db.query(Document).filter(
+        Document.user_id == current_user.id
+    ).order_by(Document.created_at.desc()).all()
+
+
+app.add_api_route("/bench/legacy-documents/", legacy_get_user_documents, methods=["GET"])
+
+
+def load(users: int, documents: int):
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {"id": i, "email": f"user{i}@example.com", "mobile": f"9{i:09d}", "hashed_password": "x"}
+            for i in range(1, users + 1)
+        ])
+        conn.execute(insert(Document), [
+            {
+                "user_id": user_id, "doc_type": DocumentType.AADHAAR,
+                "file_url": f"/uploads/documents/{user_id}_{n}.pdf", "file_name": f"{n}.pdf",
+                "extracted_data": {}, "is_verified": 0,
+            }
+            for user_id in range(1, users + 1) for n in range(documents)
+        ])
+
+
+async def run(path: str, tokens, clients: int, total: int):
+    latencies = []
+    probes = []
+    statuses = {}
+    remaining = iter(range(total))
+    done = asyncio.Event()
+
+    limits = httpx.Limits(max_connections=None)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", limits=limits) as client:
+        async def worker():
+            for i in remaining:
+                headers = {"Authorization": f"Bearer {tokens[i % len(tokens)]}"}
+                start = time.perf_counter()
+                response = await client.get(path, headers=headers)
+                latencies.append((time.perf_counter() - start) * 1000)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        async def probe():
+            while not done.is_set():
+                start = time.perf_counter()
+                await client.get("/health")
+                probes.append((time.perf_counter() - start) * 1000)
+                await asyncio.sleep(0.01)
+
+        prober = asyncio.create_task(probe())
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(clients)))
+        elapsed = time.perf_counter() - start
+        done.set()
+        await prober
+
+    latencies.sort()
+    probes.sort()
+    return {
+        "rps": total / elapsed,
+        "p50": statistics.median(latencies),
+        "p99": latencies[max(0, int(len(latencies) * 0.99) - 1)],
+        "probe_p50": statistics.median(probes) if probes else 0.0,
+        "probe_max": probes[-1] if probes else 0.0,
+        "statuses": statuses,
+    }
+
+
+def main():
+    print(f"{engine.dialect.name}: {args.users} users x {args.documents} documents, "
+          f"{args.requests} requests from {args.clients} clients")
+    load(args.users, args.documents)
+    tokens = [create_access_token({"sub": str(i)}) for i in range(1, args.users + 1)]
+
+    print(f"{'route':<22} {'req/s':>8} {'p50 ms':>9} {'p99 ms':>9} {'/health p50':>12} {'/health max':>12}  statuses")
+    try:
+        for name, path in [("sync Session (before)", "/bench/legacy-documents/"), ("AsyncSession (after)", "/api/documents/")]:
+            # Both paths do the full token + user lookup on every request
+            auth_cache.clear()
+            auth_cache.ttl = 0
+            result = asyncio.run(run(path, tokens, args.clients, args.requests))
+            print(f"{name:<22} {result['rps']:>8.1f} {result['p50']:>9.1f} {result['p99']:>9.1f} "
+                  f"{result['probe_p50']:>12.1f} {result['probe_max']:>12.1f}  {result['statuses']}")
+    finally:
+        engine.dispose()
+        if _tmp:
+            os.unlink(_tmp.name)
+
+
+if __name__ == "__main__":
+    main()
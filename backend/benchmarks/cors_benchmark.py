@@ -0,0 +1,153 @@
+"""
+CORS middleware benchmark
+Requests per second through a minimal FastAPI app with no CORS handling, the
+old CORSMiddleware + force_cors_headers (BaseHTTPMiddleware) stack, and the
+pure ASGI CORSLayer. Requests are driven straight into the ASGI app, so the
+numbers are middleware overhead without a server or client in the way.
+
+Usage:
+    python benchmarks/cors_benchmark.py
+    python benchmarks/cors_benchmark.py --requests 20000 --concurrency 50
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import FastAPI, Request, Response
+from fastapi.middleware.cors import CORSMiddleware
+
+from app.cors import CORSLayer
+
+ORIGINS = ["http://localhost:3000", "http://localhost:5173"]
+ORIGIN_REGEX = r"^https?://(localhost|127\.0\.0\.1)(:\d+)?$"
+
+REQUESTS = {
+    "GET": ("GET", [(b"origin", b"http://localhost:3000")]),
+    "preflight": ("OPTIONS", [
+        (b"origin", b"http://localhost:3000"),
+        (b"access-control-request-method", b"POST"),
+        (b"access-control-request-headers", b"authorization,content-type"),
+    ]),
+}
+
+
+def make_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/health")
+    def health():
+        return {"status": "healthy"}
+
+    return app
+
+
+def bare_app():
+    return make_app()
+
+
+def legacy_app():
+    """The stack main.py used before CORSLayer"""
+    app = make_app()
+    app.add_middleware(
+        CORSMiddleware, allow_origins=ORIGINS, allow_origin_regex=ORIGIN_REGEX,
+        allow_credentials=True, allow_methods=["*"], allow_headers=["*"],
+    )
+
+    @app.middleware("http")
+    async def force_cors_headers(request: Request, call_next):
+        cors_headers = {
+            "Access-Control-Allow-Origin": "*",
+            "Access-Control-Allow-Methods": "GET,POST,PUT,PATCH,DELETE,OPTIONS",
+            "Access-Control-Allow-Headers": "*",
+        }
+        if request.method == "OPTIONS":
+            return Response(status_code=204, headers=cors_headers)
+        try:
+            response = await call_next(request)
+        except Exception:
+            response = Response(status_code=500)
+        for key, value in cors_headers.items():
+            response.headers[key] = value
+        return response
+
+    return app
+
+
+def layer_app():
+    app = make_app()
+    app.add_middleware(CORSLayer, allow_origins=ORIGINS, allow_origin_regex=ORIGIN_REGEX, allow_credentials=True)
+    return app
+
+
+APPS = [("no CORS", bare_app), ("CORSMiddleware + force_cors_headers", legacy_app), ("CORSLayer", layer_app)]
+
+
+async def call(app, method: str, headers):
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": method,
+        "scheme": "http", "path": "/health", "raw_path": b"/health", "root_path": "", "query_string": b"",
+        "headers": [(b"host", b"bench")] + headers, "client": ("127.0.0.1", 1), "server": ("bench", 80),
+    }
+    status = None
+    body_sent = False
+
+    async def receive():
+        nonlocal body_sent
+        if body_sent:
+            # Like a client that stays connected; BaseHTTPMiddleware listens for disconnects
+            await asyncio.Event().wait()
+        body_sent = True
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+
+async def run(app, method: str, headers, requests: int, concurrency: int) -> float:
+    async def worker(count):
+        for _ in range(count):
+            await call(app, method, headers)
+
+    per_worker = requests // concurrency
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(per_worker) for _ in range(concurrency)))
+    return per_worker * concurrency / (time.perf_counter() - start)
+
+
+async def main_async(args):
+    apps = []
+    for name, factory in APPS:
+        app = factory()
+        # Builds the middleware stack; lifespan isn't needed for these routes
+        await call(app, "GET", [])
+        apps.append((name, app))
+
+    print(f"{args.requests} requests per run, concurrency {args.concurrency}, best of {args.runs}")
+    print(f"{'stack':<38} " + " ".join(f"{kind + ' req/s':>16}" for kind in REQUESTS))
+    for name, app in apps:
+        row = []
+        for method, headers in REQUESTS.values():
+            row.append(max([await run(app, method, headers, args.requests, args.concurrency) for _ in range(args.runs)]))
+        print(f"{name:<38} " + " ".join(f"{rps:>16.0f}" for rps in row))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=10000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
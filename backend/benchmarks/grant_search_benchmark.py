@@ -0,0 +1,134 @@
+"""
+Grant search benchmark
+Compares the old ILIKE scan with the full-text index at 10k and 100k grants
+
+Usage:
+    python benchmarks/grant_search_benchmark.py
+    python benchmarks/grant_search_benchmark.py --sizes 10000 100000 --database-url postgresql://...
+
+With --database-url the tables are dropped and recreated, so point it at a
+scratch database. Without it a temporary SQLite file is used.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+import app.models  # noqa: F401 - registers every table on Base.metadata
+from app.models_grants import Grant, GrantCategory, Ministry, GrantLevel, GrantStatus
+from app.services.grant_search_service import GrantSearchService
+
+WORDS = [
+    "startup", "seed", "fund", "innovation", "technology", "export", "women",
+    "entrepreneur", "msme", "credit", "guarantee", "subsidy", "agriculture",
+    "manufacturing", "rural", "digital", "incubation", "loan", "capital",
+    "scheme", "development", "skill", "employment", "cluster", "research",
+]
+HINDI_WORDS = ["योजना", "स्टार्टअप", "उद्यम", "निधि", "कृषि", "महिला", "विकास"]
+QUERIES = ["startup", "seed fund", "women entre", "योजना", "cluster research", "nomatchword"]
+
+
+def make_text(rng: random.Random, words: int, keywords: int) -> str:
+    # Mostly low-frequency filler so keyword queries are selective, like real schemes
+    filler = [f"term{rng.randrange(20000)}" for _ in range(words)]
+    return " ".join(filler + rng.choices(WORDS, k=keywords))
+
+
+def make_rows(count: int, rng: random.Random):
+    categories = list(GrantCategory)
+    ministries = list(Ministry)
+    statuses = list(GrantStatus)
+    for i in range(count):
+        yield {
+            "name": make_text(rng, 3, 1) + f" {i}",
+            "name_hindi": " ".join(rng.choices(HINDI_WORDS, k=1)) + f" {i}",
+            "category": rng.choice(categories),
+            "ministry": rng.choice(ministries),
+            "level": GrantLevel.CENTRAL,
+            "status": rng.choice(statuses),
+            "description": make_text(rng, 40, 1),
+            "eligibility_summary": make_text(rng, 10, 0),
+            "tags": rng.choices(WORDS, k=1),
+            "priority": rng.randint(0, 10),
+            "view_count": 0,
+            "application_count": 0,
+        }
+
+
+def load(engine, count: int):
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    rng = random.Random(42)
+    rows = make_rows(count, rng)
+    with engine.begin() as conn:
+        while True:
+            chunk = [row for _, row in zip(range(5000), rows)]
+            if not chunk:
+                break
+            conn.execute(insert(Grant), chunk)
+
+
+def time_queries(Session, service: GrantSearchService, repeat: int):
+    results = {}
+    for search in QUERIES:
+        samples = []
+        with Session() as db:
+            for _ in range(repeat):
+                start = time.perf_counter()
+                query = service.apply(db.query(Grant), db, search)
+                query.order_by(Grant.priority.desc(), Grant.status).limit(50).all()
+                samples.append((time.perf_counter() - start) * 1000)
+        samples.sort()
+        results[search] = (statistics.median(samples), samples[int(len(samples) * 0.95) - 1])
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--database-url")
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        tmp = None
+        url = args.database_url
+        if not url:
+            tmp = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+            tmp.close()
+            url = f"sqlite:///{tmp.name}"
+        engine = create_engine(url)
+        Session = sessionmaker(bind=engine)
+
+        print(f"\n{engine.dialect.name}: loading {size} grants...")
+        load(engine, size)
+
+        ilike = GrantSearchService()
+        ilike._available = False
+        baseline = time_queries(Session, ilike, args.repeat)
+
+        fts = GrantSearchService()
+        fts.setup(engine)
+        indexed = time_queries(Session, fts, args.repeat)
+
+        print(f"{'query':<20} {'ILIKE p50/p95 ms':>20} {'FTS p50/p95 ms':>20}")
+        for search in QUERIES:
+            b, f = baseline[search], indexed[search]
+            print(f"{search:<20} {b[0]:>9.2f} / {b[1]:<8.2f} {f[0]:>9.2f} / {f[1]:<8.2f}")
+
+        engine.dispose()
+        if tmp:
+            os.unlink(tmp.name)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Import time report
+Cold-start cost of importing the app, from python -X importtime run in fresh
+subprocesses. Prints the wall time of the whole import plus the slowest
+modules by cumulative and by self time.
+
+Usage:
+    python benchmarks/import_time_report.py
+    python benchmarks/import_time_report.py --module app.main --top 25 --runs 5
+
+Each run imports against a throwaway SQLite database, so nothing is written
+to the real one.
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)$")
+
+
+def import_once(module: str):
+    """(wall ms, [(module, self us, cumulative us, depth)]) for one cold import"""
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, DATABASE_URL=f"sqlite:///{os.path.join(tmp, 'import_report.db')}")
+        start = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=BACKEND_DIR, env=env, capture_output=True, text=True
+        )
+        wall = (time.perf_counter() - start) * 1000
+    if result.returncode != 0:
+        sys.exit(f"import {module} failed:\n{result.stderr[-2000:]}")
+
+    modules = []
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules.append((name, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    return wall, modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    runs = [import_once(args.module) for _ in range(args.runs)]
+    walls = sorted(wall for wall, _ in runs)
+    # Per-module numbers from the median run
+    _, modules = sorted(runs, key=lambda run: run[0])[len(runs) // 2]
+
+    total = next((cumulative for name, _, cumulative, depth in modules if name == args.module and depth == 0), 0)
+    print(f"import {args.module}: wall p50 {statistics.median(walls):.0f} ms "
+          f"(min {walls[0]:.0f}, max {walls[-1]:.0f}) over {args.runs} runs, "
+          f"importtime total {total / 1000:.0f} ms, {len(modules)} modules")
+
+    by_package = {}
+    for name, self_us, _, _ in modules:
+        package = name.split(".")[0]
+        by_package[package] = by_package.get(package, 0) + self_us
+
+    print(f"\n{'top-level package':<40} {'self ms':>9}")
+    for package, self_us in sorted(by_package.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"{package:<40} {self_us / 1000:>9.1f}")
+
+    print(f"\n{'module (cumulative)':<50} {'cumulative ms':>14} {'self ms':>9}")
+    for name, self_us, cumulative_us, _ in sorted(modules, key=lambda m: -m[2])[:args.top]:
+        print(f"{name:<50} {cumulative_us / 1000:>14.1f} {self_us / 1000:>9.1f}")
+
+    print(f"\n{'module (self)':<50} {'self ms':>9}")
+    for name, self_us, _, _ in sorted(modules, key=lambda m: -m[1])[:args.top]:
+        print(f"{name:<50} {self_us / 1000:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Password hash benchmark
+Login latency (p50/p99) and throughput at several bcrypt costs, to pick
+PASSWORD_HASH_ROUNDS from data. Each cost is measured twice: logins against
+a hash already at that cost, and first logins that upgrade a 4-round hash.
+
+Usage:
+    python benchmarks/password_hash_benchmark.py
+    python benchmarks/password_hash_benchmark.py --rounds 10 11 12 --logins 100 --concurrency 16
+
+Requests go through the real /api/auth/login route in-process against a
+temporary SQLite database, so numbers include the hashing pool's queueing.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_db = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+_db.close()
+os.environ["DATABASE_URL"] = f"sqlite:///{_db.name}"
+
+import bcrypt  # noqa: E402
+import httpx  # noqa: E402
+
+from app.main import app  # noqa: E402
+from app.database import SessionLocal  # noqa: E402
+from app.models import User  # noqa: E402
+import app.auth as auth  # noqa: E402
+from app.services.password_hashing_service import password_hashing_service  # noqa: E402
+
+PASSWORD = "correct horse battery staple"
+
+
+def reset_users(count: int, rounds: int):
+    """count users whose stored hash has the given cost"""
+    hashed = bcrypt.hashpw(PASSWORD.encode("utf-8"), bcrypt.gensalt(rounds=rounds)).decode("utf-8")
+    with SessionLocal() as db:
+        db.query(User).delete()
+        db.add_all([
+            User(email=f"user{i}@example.com", mobile=f"9{i:09d}", hashed_password=hashed, full_name=f"User {i}")
+            for i in range(count)
+        ])
+        db.commit()
+
+
+async def run_logins(count: int, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+    samples = []
+    statuses = {}
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        async def login(i: int):
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.post(
+                    "/api/auth/login", json={"email": f"user{i}@example.com", "password": PASSWORD}
+                )
+                samples.append((time.perf_counter() - start) * 1000)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(login(i) for i in range(count)))
+        elapsed = time.perf_counter() - start
+
+    samples.sort()
+    p99 = samples[max(0, int(len(samples) * 0.99) - 1)]
+    return statistics.median(samples), p99, count / elapsed, statuses
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, nargs="+", default=[4, 8, 10, 12])
+    parser.add_argument("--logins", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    print(
+        f"{password_hashing_service.workers} hashing workers, queue {password_hashing_service.max_queue}, "
+        f"{args.logins} logins at concurrency {args.concurrency}"
+    )
+    print(f"{'rounds':>6} {'case':<10} {'p50 ms':>9} {'p99 ms':>9} {'logins/s':>9}  statuses")
+    try:
+        for rounds in args.rounds:
+            auth.settings.PASSWORD_HASH_ROUNDS = rounds
+            cases = [("steady", rounds)]
+            if rounds > 4:
+                cases.append(("upgrade", 4))
+            for case, stored_rounds in cases:
+                reset_users(args.logins, stored_rounds)
+                p50, p99, rate, statuses = asyncio.run(run_logins(args.logins, args.concurrency))
+                print(f"{rounds:>6} {case:<10} {p50:>9.1f} {p99:>9.1f} {rate:>9.1f}  {statuses}")
+    finally:
+        password_hashing_service.shutdown()
+        os.unlink(_db.name)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Proxy cache benchmark
+/api/proxy/website latency with and without the proxy page cache, against
+a local stub upstream that stands in for a slow portal. Also fires a burst
+of concurrent requests at a cold URL to show they share one upstream fetch.
+
+Usage:
+    python benchmarks/proxy_cache_benchmark.py
+    python benchmarks/proxy_cache_benchmark.py --latency 0.5 --page-kb 200 --requests 50 --burst 50
+
+Cache entries go to a temporary directory.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("PROXY_CACHE_DIR", tempfile.mkdtemp(prefix="proxy_cache_"))
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/proxy_cache_benchmark.db")
+
+import httpx
+
+from app.main import app
+from app.services.proxy_cache_service import proxy_cache_service
+
+
+class StubPortal(BaseHTTPRequestHandler):
+    """Slow upstream page with validators and a short max-age"""
+
+    protocol_version = "HTTP/1.1"
+    latency = 0.3
+    body = b""
+    fetches = 0
+    not_modified = 0
+
+    def do_GET(self):
+        time.sleep(self.latency)
+        if self.headers.get("If-None-Match") == '"v1"':
+            StubPortal.not_modified += 1
+            self.send_response(304)
+            self.send_header("ETag", '"v1"')
+            self.send_header("Cache-Control", "max-age=60, stale-while-revalidate=300")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        StubPortal.fetches += 1
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("ETag", '"v1"')
+        self.send_header("Cache-Control", "max-age=60, stale-while-revalidate=300")
+        self.send_header("Content-Length", str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, *args):
+        pass
+
+
+def make_page(size: int) -> bytes:
+    row = '<tr><td><a href="/portal/item">Item</a></td><td><img src="/static/icon.png"></td></tr>\n'
+    rows = row * (size // len(row) + 1)
+    return f"<html><head></head><body><table>{rows}</table></body></html>".encode()
+
+
+async def timed_get(client, url):
+    start = time.perf_counter()
+    response = await client.get("/api/proxy/website", params={"url": url})
+    return (time.perf_counter() - start) * 1000, response.headers.get("x-proxy-cache")
+
+
+async def run(args, base_url):
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+            print(f"upstream latency {args.latency * 1000:.0f} ms, page {len(StubPortal.body) // 1024} KB")
+            print(f"{'mode':<22} {'p50 ms':>8} {'p95 ms':>8} {'upstream fetches':>17}")
+            for enabled in (False, True):
+                proxy_cache_service.enabled = enabled
+                await proxy_cache_service.clear()
+                before = StubPortal.fetches
+                url = f"{base_url}/sequential-{enabled}"
+                samples = sorted([(await timed_get(client, url))[0] for _ in range(args.requests)])
+                print(f"{'cache on' if enabled else 'cache off':<22} {statistics.median(samples):>8.1f} "
+                      f"{samples[int(len(samples) * 0.95) - 1]:>8.1f} {StubPortal.fetches - before:>17}")
+
+            proxy_cache_service.enabled = True
+            before = StubPortal.fetches
+            results = await asyncio.gather(*(timed_get(client, f"{base_url}/burst") for _ in range(args.burst)))
+            samples = sorted(ms for ms, _ in results)
+            statuses = {}
+            for _, status in results:
+                statuses[status] = statuses.get(status, 0) + 1
+            print(f"{f'cold burst x{args.burst}':<22} {statistics.median(samples):>8.1f} "
+                  f"{samples[int(len(samples) * 0.95) - 1]:>8.1f} {StubPortal.fetches - before:>17}   {statuses}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.3, help="upstream response delay in seconds")
+    parser.add_argument("--page-kb", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=30, help="sequential requests per mode")
+    parser.add_argument("--burst", type=int, default=30, help="concurrent requests for one cold URL")
+    args = parser.parse_args()
+
+    StubPortal.latency = args.latency
+    StubPortal.body = make_page(args.page_kb * 1024)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubPortal)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        asyncio.run(run(args, f"http://127.0.0.1:{server.server_port}"))
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
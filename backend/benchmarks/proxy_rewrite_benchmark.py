@@ -0,0 +1,112 @@
+"""
+Proxy HTML rewrite benchmark
+The old buffered rewrite (response.text, then four re.sub passes and a
+str.replace over the whole document) against the streaming HTMLRewriter fed
+in network-sized chunks. Reports total time, time to first output chunk and
+peak memory allocated while rewriting one page.
+
+Usage:
+    python benchmarks/proxy_rewrite_benchmark.py
+    python benchmarks/proxy_rewrite_benchmark.py --sizes 100000 1000000 10000000 --chunk 65536
+"""
+import argparse
+import os
+import re
+import sys
+import time
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.html_rewriter import HTMLRewriter
+
+PAGE_URL = "https://portal.example/tplcp/application/page"
+INJECT = "<script>console.log('injected')</script>"
+
+ROW = (
+    '<tr><td><a href="/tplcp/view?id={i}">Request {i}</a></td>'
+    '<td><img src="/static/icon.png" alt=""></td>'
+    '<td><form action="/tplcp/submit" method="post"><input name="id" value="{i}"></form></td></tr>\n'
+)
+
+
+def make_page(size: int) -> bytes:
+    head = (
+        '<!DOCTYPE html><html><head><meta http-equiv="X-Frame-Options" content="deny">'
+        '<link href="/css/site.css" rel="stylesheet"><script src="/js/app.js"></script></head><body><table>\n'
+    )
+    rows = []
+    length = len(head)
+    i = 0
+    while length < size:
+        row = ROW.format(i=i)
+        rows.append(row)
+        length += len(row)
+        i += 1
+    return (head + "".join(rows) + "</table></body></html>").encode()
+
+
+def legacy_rewrite(body: bytes) -> str:
+    """What proxy_torrent_power did before streaming"""
+    html_content = body.decode()
+    html_content = re.sub(r'<meta[^>]*http-equiv=["\']X-Frame-Options["\'][^>]*>', '', html_content, flags=re.IGNORECASE)
+    html_content = html_content.replace('</body>', INJECT + '</body>')
+    base_url = "https://portal.example"
+    html_content = re.sub(r'src="(?!http)', f'src="{base_url}', html_content)
+    html_content = re.sub(r'href="(?!http)', f'href="{base_url}', html_content)
+    html_content = re.sub(r'action="(?!http)', f'action="{base_url}', html_content)
+    return html_content
+
+
+def measure(fn, *args):
+    """(total ms, first chunk ms, peak MB); timed without tracemalloc, which slows allocations down"""
+    start = time.perf_counter()
+    first = fn(*args)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    fn(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed * 1000, (first if first is not None else elapsed) * 1000, peak / 1e6
+
+
+def run_legacy(body: bytes, chunk: int):
+    # The whole page has to arrive and be rewritten before anything is sent
+    chunks = [body[i:i + chunk] for i in range(0, len(body), chunk)]
+    legacy_rewrite(b"".join(chunks)).encode()
+    return None
+
+
+def run_streaming(body: bytes, chunk: int):
+    start = time.perf_counter()
+    first = None
+    rewriter = HTMLRewriter(PAGE_URL, INJECT)
+    for raw in (body[i:i + chunk] for i in range(0, len(body), chunk)):
+        out = rewriter.feed(raw.decode()).encode()
+        if out and first is None:
+            first = time.perf_counter() - start
+    rewriter.close()
+    return first
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000, 10_000_000])
+    parser.add_argument("--chunk", type=int, default=65536, help="bytes per upstream chunk")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"chunk {args.chunk} bytes, best of {args.repeat}")
+    print(f"{'page':>10} {'rewriter':<10} {'total ms':>10} {'first chunk ms':>15} {'peak MB':>9}")
+    for size in args.sizes:
+        body = make_page(size)
+        for name, fn in [("buffered", run_legacy), ("streaming", run_streaming)]:
+            runs = [measure(fn, body, args.chunk) for _ in range(args.repeat)]
+            total = min(run[0] for run in runs)
+            first = min(run[1] for run in runs)
+            peak = min(run[2] for run in runs)
+            print(f"{len(body) / 1e6:>8.1f}MB {name:<10} {total:>10.1f} {first:>15.2f} {peak:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+RPA queue benchmark
+POST /api/automation/water/name-change latency now that it only enqueues,
+against the time the same automation would hold the request inline, and how
+long the worker pool takes to drain the batch. Portal latency is simulated
+by wrapping the automation with a sleep.
+
+Usage:
+    python benchmarks/rpa_queue_benchmark.py
+    python benchmarks/rpa_queue_benchmark.py --latency 2 --jobs 50 --workers 4
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/rpa_queue_benchmark.db")
+
+from fastapi.testclient import TestClient
+
+from app.auth import get_current_admin
+from app.database import engine
+from app.main import app
+from app.models import RPASubmissionStatus
+from app.services import rpa_queue_service as queue_module
+from app.services.rpa_queue_service import rpa_queue_service
+
+PAYLOAD = {"currentName": "A Shah", "newName": "B Shah", "connectionNumber": "WC-1001", "mobile": "9800000000"}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=1.0, help="simulated portal automation time in seconds")
+    parser.add_argument("--jobs", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+
+    automation = queue_module.AUTOMATIONS["water"]
+
+    def slow_portal(form_data):
+        time.sleep(args.latency)
+        return automation(form_data)
+
+    queue_module.AUTOMATIONS["water"] = slow_portal
+    # The queue stats endpoint is admin-only; the benchmark reads it as a stand-in admin
+    app.dependency_overrides[get_current_admin] = lambda: None
+
+    with TestClient(app) as client:
+        # Replace the pool the lifespan started with one of the requested size
+        rpa_queue_service.stop()
+        rpa_queue_service.start(engine, args.workers, 0.2)
+
+        samples = []
+        status_urls = []
+        start = time.perf_counter()
+        for _ in range(args.jobs):
+            request_start = time.perf_counter()
+            response = client.post("/api/automation/water/name-change", json=PAYLOAD)
+            samples.append((time.perf_counter() - request_start) * 1000)
+            status_urls.append(response.json()["status_url"])
+
+        done = set()
+        while len(done) < len(status_urls):
+            for status_url in status_urls:
+                if status_url not in done:
+                    status = client.get(status_url).json()["status"]
+                    if status in (RPASubmissionStatus.SUCCESS.value, RPASubmissionStatus.FAILED.value):
+                        done.add(status_url)
+            time.sleep(0.05)
+        drained = time.perf_counter() - start
+
+        samples.sort()
+        print(f"{args.jobs} jobs, portal latency {args.latency * 1000:.0f} ms, {args.workers} workers")
+        print(f"inline (before):   {args.latency * 1000:>8.0f} ms per request, {args.jobs * args.latency:.1f} s sequential")
+        print(f"enqueue p50/p95:   {statistics.median(samples):>8.1f} / {samples[int(len(samples) * 0.95) - 1]:.1f} ms")
+        print(f"queue drained in:  {drained:>8.1f} s")
+        print(client.get("/api/internal/rpa-queue").json())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Upstream guard benchmark
+/api/proxy/website against a local stub portal that is slow and answers
+500, with the circuit breaker off and on. Without it every request waits
+for the broken portal; with it the first few do and the rest get a 503
+straight away. Ends with the per-host stats from /api/internal/upstreams.
+
+Usage:
+    python benchmarks/upstream_guard_benchmark.py
+    python benchmarks/upstream_guard_benchmark.py --latency 2 --requests 40 --concurrency 10
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("PROXY_CACHE_ENABLED", "false")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/upstream_guard_benchmark.db")
+
+import httpx
+
+from app.auth import get_current_admin
+from app.main import app
+from app.services.http_client_service import http_client_service
+
+
+class BrokenPortal(BaseHTTPRequestHandler):
+    """Upstream that takes its time and then fails"""
+
+    protocol_version = "HTTP/1.1"
+    latency = 1.0
+    hits = 0
+
+    def do_GET(self):
+        BrokenPortal.hits += 1
+        time.sleep(self.latency)
+        body = b"<html><body>Service Unavailable</body></html>"
+        self.send_response(500)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+async def timed_get(client, url, limit):
+    async with limit:
+        start = time.perf_counter()
+        response = await client.get("/api/proxy/website", params={"url": url})
+        return (time.perf_counter() - start) * 1000, response.status_code
+
+
+async def run(args, base_url):
+    # The stats endpoint is admin-only; the benchmark reads it as a stand-in admin
+    app.dependency_overrides[get_current_admin] = lambda: None
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+            print(f"upstream latency {args.latency * 1000:.0f} ms, {args.requests} requests, "
+                  f"{args.concurrency} concurrent")
+            print(f"{'breaker':<10} {'total s':>8} {'p50 ms':>8} {'p95 ms':>8} {'upstream hits':>14}   statuses")
+            for failures in (10 ** 9, args.breaker_failures):
+                http_client_service.breaker_failures = failures
+                http_client_service._hosts = {}
+                before = BrokenPortal.hits
+                limit = asyncio.Semaphore(args.concurrency)
+                start = time.perf_counter()
+                results = await asyncio.gather(
+                    *(timed_get(client, f"{base_url}/page", limit) for _ in range(args.requests))
+                )
+                total = time.perf_counter() - start
+                samples = sorted(ms for ms, _ in results)
+                statuses = {}
+                for _, status in results:
+                    statuses[status] = statuses.get(status, 0) + 1
+                label = "off" if failures == 10 ** 9 else f"on ({failures})"
+                print(f"{label:<10} {total:>8.2f} {statistics.median(samples):>8.1f} "
+                      f"{samples[int(len(samples) * 0.95) - 1]:>8.1f} {BrokenPortal.hits - before:>14}   {statuses}")
+
+            response = await client.get("/api/internal/upstreams")
+            print(json.dumps(response.json()["hosts"], indent=2))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=1.0, help="upstream response delay in seconds")
+    parser.add_argument("--requests", type=int, default=30)
+    parser.add_argument("--concurrency", type=int, default=5, help="requests in flight at once")
+    parser.add_argument("--breaker-failures", type=int, default=5, help="consecutive failures that open the circuit")
+    args = parser.parse_args()
+
+    BrokenPortal.latency = args.latency
+    server = ThreadingHTTPServer(("127.0.0.1", 0), BrokenPortal)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        asyncio.run(run(args, f"http://127.0.0.1:{server.server_port}"))
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
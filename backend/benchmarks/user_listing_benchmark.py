@@ -0,0 +1,157 @@
+"""
+Per-user listing benchmark
+Latency of the "my rows, newest first" queries with and without the
+(user_id, created_at) indexes, on a fixture of one million rows per table
+
+Usage:
+    python benchmarks/user_listing_benchmark.py
+    python benchmarks/user_listing_benchmark.py --rows 1000000 --users 20000 --database-url postgresql://...
+
+With --database-url the tables are dropped and recreated, so point it at a
+scratch database. Without it a temporary SQLite file is used.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import Application, ApplicationStatus, Document, DocumentType, ElectricityAccount, ServiceType, User
+from app.models_grants import Grant, GrantApplication, GrantApplicationStatus, GrantCategory, Ministry
+
+EPOCH = datetime(2024, 1, 1)
+GRANTS = 100
+
+
+def document_row(rng, user_id, i):
+    return {
+        "user_id": user_id, "doc_type": DocumentType.AADHAAR, "file_url": f"/uploads/documents/{i}.pdf",
+        "file_name": f"{i}.pdf", "extracted_data": {}, "is_verified": 0,
+    }
+
+
+def application_row(rng, user_id, i):
+    return {
+        "user_id": user_id, "service_type": ServiceType.ELECTRICITY, "application_type": "name_change",
+        "status": ApplicationStatus.SUBMITTED, "form_data": {},
+    }
+
+
+def grant_application_row(rng, user_id, i):
+    return {
+        "user_id": user_id, "grant_id": rng.randint(1, GRANTS), "application_number": f"GA{i:09d}",
+        "status": GrantApplicationStatus.SUBMITTED,
+    }
+
+
+def electricity_account_row(rng, user_id, i):
+    return {"user_id": user_id, "provider": "Torrent Power", "service_number": f"{i:010d}"}
+
+
+# model -> row factory; every listing filters on user_id and sorts by created_at desc
+TABLES = [
+    (Document, document_row),
+    (Application, application_row),
+    (GrantApplication, grant_application_row),
+    (ElectricityAccount, electricity_account_row),
+]
+
+
+def load_parents(engine, users: int):
+    """Users and grants the fixture rows point at, so foreign keys hold on PostgreSQL"""
+    with engine.begin() as conn:
+        for start in range(1, users + 1, 10000):
+            conn.execute(insert(User), [
+                {"id": i, "email": f"user{i}@example.com", "mobile": f"9{i:09d}", "hashed_password": "x"}
+                for i in range(start, min(start + 10000, users + 1))
+            ])
+        conn.execute(insert(Grant), [
+            {"id": i, "name": f"Grant {i}", "category": GrantCategory.STARTUP, "ministry": Ministry.DPIIT}
+            for i in range(1, GRANTS + 1)
+        ])
+
+
+def load(engine, model, make_row, rows: int, users: int):
+    rng = random.Random(7)
+    with engine.begin() as conn:
+        for start in range(0, rows, 10000):
+            chunk = []
+            for i in range(start, min(start + 10000, rows)):
+                row = make_row(rng, rng.randint(1, users), i)
+                row["created_at"] = EPOCH + timedelta(seconds=rng.randrange(365 * 86400))
+                chunk.append(row)
+            conn.execute(insert(model), chunk)
+
+
+def time_listing(Session, model, user_ids, repeat: int):
+    samples = []
+    with Session() as db:
+        for _ in range(repeat):
+            for user_id in user_ids:
+                start = time.perf_counter()
+                db.query(model).filter(model.user_id == user_id).order_by(model.created_at.desc()).limit(50).all()
+                samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.95) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000, help="rows per table")
+    parser.add_argument("--users", type=int, default=20000)
+    parser.add_argument("--samples", type=int, default=50, help="users queried per run")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--database-url")
+    args = parser.parse_args()
+
+    tmp = None
+    url = args.database_url
+    if not url:
+        tmp = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+        tmp.close()
+        url = f"sqlite:///{tmp.name}"
+    engine = create_engine(url)
+    Session = sessionmaker(bind=engine)
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    load_parents(engine, args.users)
+    indexes = {model: next(i for i in model.__table__.indexes if i.name.endswith("_user_id_created_at")) for model, _ in TABLES}
+    for index in indexes.values():
+        index.drop(bind=engine)
+
+    user_ids = random.Random(1).sample(range(1, args.users + 1), args.samples)
+    print(f"{engine.dialect.name}: {args.rows} rows per table, {args.users} users "
+          f"(~{args.rows // args.users} rows each), {args.samples} users x {args.repeat} runs")
+    print(f"{'table':<24} {'no index p50/p95 ms':>22} {'indexed p50/p95 ms':>22} {'speedup':>8}")
+    try:
+        for model, make_row in TABLES:
+            load(engine, model, make_row, args.rows, args.users)
+            with engine.begin() as conn:
+                conn.exec_driver_sql(f"ANALYZE {model.__tablename__}")
+            before = time_listing(Session, model, user_ids, args.repeat)
+
+            indexes[model].create(bind=engine)
+            with engine.begin() as conn:
+                conn.exec_driver_sql(f"ANALYZE {model.__tablename__}")
+            after = time_listing(Session, model, user_ids, args.repeat)
+
+            print(f"{model.__tablename__:<24} {before[0]:>11.2f} / {before[1]:<8.2f} "
+                  f"{after[0]:>11.2f} / {after[1]:<8.2f} {before[0] / after[0]:>7.0f}x")
+    finally:
+        engine.dispose()
+        if tmp:
+            os.unlink(tmp.name)
+
+
+if __name__ == "__main__":
+    main()
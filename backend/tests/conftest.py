@@ -0,0 +1,46 @@
+"""
+Shared fixtures: every test session gets a throwaway SQLite database,
+migrated to the latest schema before the app touches it
+"""
+import os
+import sys
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Settings are read once per process, so these must be set before app imports
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/test.db"
+os.environ["RPA_QUEUE_WORKERS"] = "0"
+os.environ["PROXY_CACHE_DIR"] = tempfile.mkdtemp(prefix="proxy_cache_")
+
+import pytest
+from sqlalchemy import event
+
+from app.database import SessionLocal, engine
+from app.migrations import upgrade
+
+
+@pytest.fixture(scope="session", autouse=True)
+def schema():
+    upgrade(engine)
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def count_queries():
+    """Returns a list that collects every statement sent through the sync engine"""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    yield statements
+    event.remove(engine, "before_cursor_execute", record)
@@ -0,0 +1,56 @@
+"""Operational endpoints are for admins only, not every signed-in user"""
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.auth import get_current_user
+from app.main import app
+from app.models import User, UserRole, UserRoleModel
+
+ADMIN_ENDPOINTS = [
+    ("POST", "/admin/services/reload"),
+    ("GET", "/admin/auth-cache"),
+    ("GET", "/admin/password-hashing"),
+    ("GET", "/admin/proxy-cache"),
+    ("DELETE", "/admin/proxy-cache"),
+    ("GET", "/api/internal/db-pool"),
+    ("GET", "/api/internal/upstreams"),
+    ("GET", "/api/internal/rpa-queue"),
+]
+
+
+def make_user(db, role: UserRole = None) -> User:
+    suffix = uuid.uuid4().hex[:10]
+    user = User(email=f"{suffix}@example.com", mobile=suffix, hashed_password="x", full_name="Test User")
+    db.add(user)
+    db.flush()
+    if role is not None:
+        db.add(UserRoleModel(user_id=user.id, role=role))
+    db.commit()
+    db.refresh(user)
+    db.expunge(user)
+    return user
+
+
+def request_as(user: User, method: str, path: str):
+    app.dependency_overrides[get_current_user] = lambda: user
+    try:
+        return TestClient(app).request(method, path)
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
+
+
+@pytest.mark.parametrize("method,path", ADMIN_ENDPOINTS)
+def test_regular_user_is_forbidden(db, method, path):
+    assert request_as(make_user(db), method, path).status_code == 403
+
+
+@pytest.mark.parametrize("method,path", ADMIN_ENDPOINTS)
+def test_admin_role_is_allowed(db, method, path):
+    assert request_as(make_user(db, UserRole.ADMIN), method, path).status_code == 200
+
+
+@pytest.mark.parametrize("path", ["/admin/auth-cache", "/api/internal/db-pool"])
+def test_anonymous_is_rejected(path):
+    assert TestClient(app).get(path).status_code == 401
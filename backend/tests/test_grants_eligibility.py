@@ -0,0 +1,42 @@
+"""Batch /eligible scoring agrees with the single-grant eligibility check"""
+import uuid
+
+from fastapi.testclient import TestClient
+
+from app.auth import get_current_user
+from app.main import app
+from app.models import User
+from app.models_grants import Grant, GrantCategory, GrantStatus, Ministry
+
+PROFILE = {"business_type": "Startup", "category": "Women", "sector": None, "registration": "Udyam"}
+
+
+def test_batch_criteria_match_the_single_grant_check(db):
+    suffix = uuid.uuid4().hex[:10]
+    user = User(email=f"{suffix}@example.com", mobile=suffix, hashed_password="x", full_name="Test User")
+    grant = Grant(
+        name=f"Eligibility {suffix}", category=GrantCategory.STARTUP, ministry=Ministry.MSME,
+        status=GrantStatus.OPEN, eligibility_criteria={
+            "business_type": ["Startup", "MSME"], "category": "Women",
+            "sector": "Manufacturing", "registration": "Udyam",
+        },
+    )
+    db.add_all([user, grant])
+    db.commit()
+    db.refresh(user)
+    db.expunge(user)
+
+    app.dependency_overrides[get_current_user] = lambda: user
+    try:
+        client = TestClient(app)
+        single = client.post("/api/grants/check-eligibility", json={"grant_id": grant.id, **PROFILE}).json()
+        batch = client.post("/api/grants/eligible", json=PROFILE).json()
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
+
+    result = next(item for item in batch if item["grant_id"] == grant.id)
+    assert result["score"] == single["score"] == 80
+    assert result["matching_criteria"] == single["matching_criteria"] == [
+        "Business type: Startup", "Category: Women", "Registration: Udyam",
+    ]
+    assert result["missing_criteria"] == single["missing_criteria"] == ["Sector requirement: Manufacturing"]
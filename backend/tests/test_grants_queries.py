@@ -0,0 +1,51 @@
+"""Query counts for the grant endpoints that used to run one query per row"""
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.auth import get_current_user
+from app.main import app
+from app.models import User
+from app.models_grants import Grant, GrantApplication, GrantApplicationStatus, GrantCategory, Ministry
+
+# The applications and their grant names come from one joined SELECT
+MY_APPLICATIONS_QUERIES = 1
+
+
+def make_user(db, applications: int) -> User:
+    suffix = uuid.uuid4().hex[:10]
+    user = User(email=f"{suffix}@example.com", mobile=suffix, hashed_password="x", full_name="Test User")
+    db.add(user)
+    db.flush()
+    for n in range(applications):
+        grant = Grant(name=f"Grant {suffix} {n}", category=GrantCategory.STARTUP, ministry=Ministry.MSME)
+        db.add(grant)
+        db.flush()
+        db.add(GrantApplication(
+            user_id=user.id,
+            grant_id=grant.id,
+            application_number=f"GA-{suffix}-{n}",
+            status=GrantApplicationStatus.SUBMITTED,
+        ))
+    db.commit()
+    db.refresh(user)
+    db.expunge(user)
+    return user
+
+
+@pytest.mark.parametrize("applications", [1, 5, 25])
+def test_my_applications_query_count_is_constant(db, count_queries, applications):
+    user = make_user(db, applications)
+    app.dependency_overrides[get_current_user] = lambda: user
+    try:
+        count_queries.clear()
+        response = TestClient(app).get("/api/grants/applications/my")
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert len(body) == applications
+    assert all(item["grant_name"].startswith("Grant ") for item in body)
+    assert len(count_queries) <= MY_APPLICATIONS_QUERIES, count_queries
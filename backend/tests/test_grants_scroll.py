@@ -0,0 +1,57 @@
+"""Keyset pagination over grants, including NULL priority and status"""
+import uuid
+
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.main import app
+from app.models_grants import Grant, GrantCategory, GrantStatus, Ministry
+
+
+def make_grants(db, tag: str):
+    rows = [
+        (5, GrantStatus.OPEN), (5, None), (5, GrantStatus.CLOSED), (None, GrantStatus.OPEN),
+        (None, None), (0, GrantStatus.OPEN), (0, None), (None, GrantStatus.CLOSED), (5, GrantStatus.OPEN),
+    ]
+    for n, (priority, status) in enumerate(rows):
+        db.add(Grant(
+            name=f"Scroll {tag} {n}", category=GrantCategory.STARTUP, ministry=Ministry.MSME,
+            priority=priority, status=status,
+        ))
+    db.commit()
+
+
+def test_scroll_pages_cover_every_grant_once_in_listing_order(db):
+    tag = uuid.uuid4().hex[:8]
+    make_grants(db, tag)
+    client = TestClient(app)
+
+    seen, cursor = [], None
+    while True:
+        params = {"search": f"Scroll {tag}", "limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/api/grants/scroll", params=params)
+        assert response.status_code == 200, response.text
+        body = response.json()
+        seen.extend(body["items"])
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+
+    grants = {grant.id: grant for grant in db.query(Grant).filter(Grant.name.like(f"Scroll {tag} %"))}
+    # priority desc with NULLs last, then status with NULLs first, then id
+    expected = sorted(grants.values(), key=lambda grant: (
+        grant.priority is None, -(grant.priority or 0),
+        grant.status is not None, grant.status.name if grant.status else "",
+        grant.id,
+    ))
+    assert [grant["id"] for grant in seen] == [grant.id for grant in expected]
+
+
+def test_listing_order_uses_the_keyset_index(db):
+    plan = db.execute(text(
+        "EXPLAIN QUERY PLAN SELECT id FROM grants "
+        "ORDER BY priority DESC NULLS LAST, status NULLS FIRST, id LIMIT 5"
+    )).all()
+    assert any("ix_grants_priority_status_id" in row[-1] for row in plan), plan
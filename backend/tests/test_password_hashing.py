@@ -0,0 +1,17 @@
+"""Admission control in the bcrypt pool"""
+import asyncio
+
+import pytest
+
+from app.services.password_hashing_service import PasswordHashingService
+
+
+def test_failed_submission_releases_its_slot():
+    service = PasswordHashingService(workers=1, max_queue=0)
+    service._get_executor().shutdown()
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(service.run(lambda: None))
+
+    assert service.stats()["queued"] == 0
+    assert service._in_flight == 0
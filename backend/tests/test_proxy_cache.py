@@ -0,0 +1,159 @@
+"""/api/proxy/website through the page cache, against a local stub portal"""
+import asyncio
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+from app.main import app
+from app.services import proxy_cache_service as cache_module
+from app.services.http_client_service import http_client_service
+from app.services.proxy_cache_service import CachedPage, ProxyCacheService, proxy_cache_service
+
+BODY = b"<html><head></head><body><a href='/next'>Next</a></body></html>"
+
+# path -> response headers the stub portal sends for it
+PAGES = {
+    "/fresh": {"Cache-Control": "max-age=60", "ETag": '"v1"'},
+    "/stale": {"Cache-Control": "max-age=0, stale-while-revalidate=60", "ETag": '"v1"'},
+    "/validators-only": {"ETag": '"v1"'},
+    "/no-headers": {},
+    "/cookie": {"Cache-Control": "max-age=60", "ETag": '"v1"', "Set-Cookie": "session=abc"},
+    "/slow": {"Cache-Control": "max-age=60"},
+}
+
+
+class StubPortal(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    fetches = {}
+    not_modified = {}
+
+    def do_GET(self):
+        headers = PAGES[self.path]
+        if self.path == "/slow":
+            time.sleep(0.3)
+        if "ETag" in headers and self.headers.get("If-None-Match") == headers["ETag"]:
+            StubPortal.not_modified[self.path] = StubPortal.not_modified.get(self.path, 0) + 1
+            self.send_response(304)
+            body = b""
+        else:
+            StubPortal.fetches[self.path] = StubPortal.fetches.get(self.path, 0) + 1
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            body = BODY
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def portal():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubPortal)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+
+
+@pytest.fixture(autouse=True)
+def reset():
+    StubPortal.fetches = {}
+    StubPortal.not_modified = {}
+    asyncio.run(proxy_cache_service.clear())
+
+
+def through_proxy(portal: str, *paths: str, concurrent: bool = False):
+    """X-Proxy-Cache of each request for paths, sent one after another or all at once"""
+
+    async def scenario():
+        http_client_service.start()
+        try:
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                async def get(path):
+                    response = await client.get("/api/proxy/website", params={"url": portal + path})
+                    assert response.status_code == 200, response.text
+                    assert b"Next" in response.content
+                    return response.headers["x-proxy-cache"]
+
+                if concurrent:
+                    statuses = await asyncio.gather(*(get(path) for path in paths))
+                else:
+                    statuses = [await get(path) for path in paths]
+                # Let background refreshes finish before the loop goes away
+                while proxy_cache_service._background:
+                    await asyncio.gather(*proxy_cache_service._background)
+                return list(statuses)
+        finally:
+            await http_client_service.close()
+
+    return asyncio.run(scenario())
+
+
+def test_fresh_page_is_a_miss_then_a_hit(portal):
+    assert through_proxy(portal, "/fresh", "/fresh") == ["MISS", "HIT"]
+    assert StubPortal.fetches == {"/fresh": 1}
+
+
+def test_stale_page_is_served_while_it_revalidates(portal):
+    assert through_proxy(portal, "/stale", "/stale") == ["MISS", "STALE"]
+    assert StubPortal.fetches == {"/stale": 1}
+    assert StubPortal.not_modified == {"/stale": 1}
+
+
+def test_page_without_freshness_headers_is_revalidated_every_time(portal):
+    assert through_proxy(portal, "/validators-only", "/validators-only") == ["MISS", "REVALIDATED"]
+    assert StubPortal.fetches == {"/validators-only": 1}
+    assert StubPortal.not_modified == {"/validators-only": 1}
+
+
+def test_page_with_nothing_to_revalidate_by_is_not_stored(portal):
+    assert through_proxy(portal, "/no-headers", "/no-headers") == ["MISS", "MISS"]
+
+
+def test_page_setting_a_cookie_is_not_stored(portal):
+    assert through_proxy(portal, "/cookie", "/cookie") == ["MISS", "MISS"]
+    assert StubPortal.fetches == {"/cookie": 2}
+
+
+def test_concurrent_misses_share_one_fetch(portal):
+    statuses = through_proxy(portal, *["/slow"] * 5, concurrent=True)
+    assert sorted(statuses) == ["COLLAPSED"] * 4 + ["MISS"]
+    assert StubPortal.fetches == {"/slow": 1}
+
+
+def test_default_ttl_applies_only_when_asked():
+    service = ProxyCacheService(True, "unused", 1024, 1024, 1024, default_ttl=60, stale_while_revalidate=300)
+    headers = {"etag": '"v1"'}
+    assert service.make_page(BODY, headers, heuristic=True).max_age == 60
+    page = service.make_page(BODY, headers)
+    assert (page.max_age, page.stale_while_revalidate) == (0.0, 0.0)
+
+
+def test_disk_limit_holds_across_workers(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache_module, "DISK_RESCAN_INTERVAL", 0.0)
+    workers = [ProxyCacheService(True, str(tmp_path), 10_000, 3_000, 2_000, 60, 300) for _ in range(2)]
+    page = CachedPage(b"x" * 1_000, None, None, time.time(), 60, 0)
+
+    for n, worker in enumerate([0, 0, 1, 0, 1, 0]):
+        workers[worker]._write(f"page {n}", page)
+        on_disk = sum(entry.stat().st_size for entry in os.scandir(tmp_path) if entry.name.endswith(".body"))
+        assert on_disk <= 3_000
+
+
+
+def test_page_written_by_another_worker_is_indexed_when_read(tmp_path):
+    reader, writer = (ProxyCacheService(True, str(tmp_path), 10_000, 10_000, 2_000, 60, 300) for _ in range(2))
+    reader._load_disk_index()
+    writer._write("shared", CachedPage(b"x" * 1_000, None, None, time.time(), 60, 0))
+
+    assert reader._read("shared") is not None
+    assert reader.stats()["disk_entries"] == 1
+    assert reader.stats()["disk_bytes"] == 1_000
@@ -0,0 +1,210 @@
+"""Claiming, retrying and reporting jobs in the rpa_submissions queue"""
+import uuid
+from datetime import timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.auth import get_current_user
+from app.database import engine
+from app.main import app
+from app.models import Application, RPASubmission, RPASubmissionStatus, ServiceType, User
+from app.services import rpa_queue_service as queue_module
+from app.services.rpa_queue_service import RPAQueueService, utcnow
+
+WATER_FORM = {"currentName": "A Shah", "newName": "B Shah", "connectionNumber": "WC-1001", "mobile": "9800000000"}
+
+
+@pytest.fixture(autouse=True)
+def empty_queue(db):
+    db.query(RPASubmission).delete()
+    db.commit()
+
+
+@pytest.fixture
+def queue():
+    service = RPAQueueService(base_delay=10, max_delay=60, max_retries=2, job_timeout=300)
+    service.start(engine, workers=0, poll_interval=1)
+    return service
+
+
+@pytest.fixture
+def automation(monkeypatch):
+    """Replaces the water automation; set .result to what the portal answers"""
+
+    class Portal:
+        result = {"success": True, "application_number": "WTR-1"}
+        calls = 0
+
+        def __call__(self, form_data):
+            Portal.calls += 1
+            return dict(self.result)
+
+    portal = Portal()
+    monkeypatch.setitem(queue_module.AUTOMATIONS, "water", portal)
+    return portal
+
+
+def expire_lock(db, job_id: int, queue: RPAQueueService) -> None:
+    """Make a processing job look abandoned by its worker"""
+    db.query(RPASubmission).filter(RPASubmission.id == job_id).update(
+        {RPASubmission.locked_at: utcnow() - timedelta(seconds=queue.job_timeout + 1)}
+    )
+    db.commit()
+
+
+def test_backoff_doubles_within_jitter_and_cap(queue):
+    for retry_count, delay in [(0, 10), (1, 20), (2, 40), (3, 60), (10, 60)]:
+        samples = [queue.backoff(retry_count) for _ in range(200)]
+        assert all(delay / 2 <= sample <= delay for sample in samples)
+
+
+def test_claim_takes_each_due_job_once(db, queue):
+    jobs = [queue.enqueue(db, "water", WATER_FORM) for _ in range(3)]
+    db.query(RPASubmission).filter(RPASubmission.id == jobs[2].id).update(
+        {RPASubmission.next_attempt_at: utcnow() + timedelta(minutes=5)}
+    )
+    db.commit()
+
+    with queue._sessions() as worker_db:
+        first, second = queue.claim(worker_db), queue.claim(worker_db)
+        # Nothing is held open while the automation runs
+        assert not worker_db.in_transaction()
+        assert [first.id, second.id] == [jobs[0].id, jobs[1].id]
+        assert first.status == second.status == RPASubmissionStatus.PROCESSING
+        assert first.locked_by == queue.worker_id
+        assert queue.claim(worker_db) is None
+
+
+def test_claim_skips_a_job_another_worker_took_after_the_select(db, queue):
+    job = queue.enqueue(db, "water", WATER_FORM)
+    rival = RPAQueueService(base_delay=10, max_delay=60, max_retries=2, job_timeout=300)
+    rival.start(engine, workers=0, poll_interval=1)
+    rival.worker_id = "rival:1"
+    rival_claims = []
+
+    with queue._sessions() as worker_db, rival._sessions() as rival_db:
+        execute = worker_db.execute
+
+        def select_then_lose_race(statement, *args, **kwargs):
+            result = execute(statement, *args, **kwargs)
+            if statement.is_select and not rival_claims:
+                frozen = result.freeze()
+                rival_claims.append(rival.claim(rival_db))
+                return frozen()
+            return result
+
+        worker_db.execute = select_then_lose_race
+        assert queue.claim(worker_db) is None
+
+    assert rival_claims[0].id == job.id
+    db.refresh(job)
+    assert job.locked_by == "rival:1"
+
+
+def test_reclaim_counts_as_an_attempt_and_fails_when_retries_are_used(db, queue):
+    job = queue.enqueue(db, "water", WATER_FORM)
+
+    with queue._sessions() as worker_db:
+        assert queue.claim(worker_db).retry_count == 0
+        for attempt in range(1, queue.max_retries + 1):
+            expire_lock(db, job.id, queue)
+            reclaimed = queue.claim(worker_db)
+            assert reclaimed.id == job.id
+            assert reclaimed.retry_count == attempt
+
+        expire_lock(db, job.id, queue)
+        assert queue.claim(worker_db) is None
+
+    db.refresh(job)
+    assert job.status == RPASubmissionStatus.FAILED
+    assert job.locked_by is None
+    assert job.completed_at is not None
+    assert queue.failed == 1
+
+
+def test_failed_attempts_retry_with_backoff_then_fail(db, queue, automation):
+    automation.result = {"success": False, "message": "Portal down"}
+    job = queue.enqueue(db, "water", WATER_FORM)
+
+    for attempt in range(1, queue.max_retries + 1):
+        assert queue.process_next()
+        db.refresh(job)
+        assert job.status == RPASubmissionStatus.RETRY
+        assert job.retry_count == attempt
+        assert job.next_attempt_at > utcnow().replace(tzinfo=None) + timedelta(seconds=4)
+        # Not due yet
+        assert not queue.process_next()
+        db.query(RPASubmission).filter(RPASubmission.id == job.id).update(
+            {RPASubmission.next_attempt_at: utcnow()}
+        )
+        db.commit()
+
+    assert queue.process_next()
+    db.refresh(job)
+    assert job.status == RPASubmissionStatus.FAILED
+    assert job.error_message == "Portal down"
+    assert automation.calls == queue.max_retries + 1
+
+
+def test_result_of_a_reclaimed_run_is_discarded(db, queue, automation):
+    job = queue.enqueue(db, "water", WATER_FORM)
+
+    with queue._sessions() as worker_db, queue._sessions() as rival_db:
+        stale = queue.claim(worker_db)
+        expire_lock(db, job.id, queue)
+        assert queue.claim(rival_db).retry_count == 1
+        queue.run(worker_db, stale)
+
+    db.refresh(job)
+    assert job.status == RPASubmissionStatus.PROCESSING
+    assert job.response_data is None
+
+
+def make_user(db) -> User:
+    suffix = uuid.uuid4().hex[:10]
+    user = User(email=f"{suffix}@example.com", mobile=suffix, hashed_password="x", full_name="Test User")
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    db.expunge(user)
+    return user
+
+
+def get_as(user, path: str):
+    app.dependency_overrides[get_current_user] = lambda: user
+    try:
+        return TestClient(app).get(path)
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
+
+
+def test_anonymous_job_is_polled_by_token_only(db):
+    client = TestClient(app)
+    response = client.post("/api/automation/water/name-change", json=WATER_FORM)
+    assert response.status_code == 202
+    job = response.json()
+    assert job["status"] == "queued"
+    assert job["status_url"] == f"/api/automation/jobs/token/{job['job_token']}"
+
+    polled = client.get(job["status_url"])
+    assert polled.status_code == 200
+    assert polled.json()["job_id"] == job["job_id"]
+    assert "submission_data" not in polled.json()
+    assert client.get("/api/automation/jobs/token/not-a-token").status_code == 404
+    assert get_as(make_user(db), f"/api/automation/jobs/{job['job_id']}").status_code == 404
+
+
+def test_application_job_is_visible_to_its_owner_only(db, queue):
+    owner, other = make_user(db), make_user(db)
+    application = Application(user_id=owner.id, service_type=ServiceType.WATER, application_type="name_change")
+    db.add(application)
+    db.commit()
+    job = queue.enqueue(db, "water", WATER_FORM, application_id=application.id)
+
+    response = get_as(owner, f"/api/automation/jobs/{job.id}")
+    assert response.status_code == 200
+    assert response.json()["application_id"] == application.id
+    assert response.json()["job_token"] is None
+    assert get_as(other, f"/api/automation/jobs/{job.id}").status_code == 404
+    assert TestClient(app).get(f"/api/automation/jobs/token/{job.job_token}").status_code == 404
@@ -399,8 +399,8 @@ const NameChangeApplication = () => {
                       onClick={async () => {
                         setLoading(true);
                         try {
-                          // Call backend automation API
-                          const response = await axios.post('/api/automation/torrent-power/name-change', {
+                          // Queue the automation job, then poll it until a worker finishes
+                          let { data: job } = await axios.post('/api/automation/torrent-power/name-change', {
                             city: formData.city,
                             serviceNumber: formData.serviceNumber,
                             tNumber: formData.tNumber,
@@ -408,18 +408,30 @@ const NameChangeApplication = () => {
                             email: formData.email,
                             confirmEmail: formData.confirmEmail
                           });
+                          // Give up waiting after two minutes; the job itself stays queued
+                          for (let polls = 0; polls < 120 && (job.status === 'queued' || job.status === 'processing'); polls++) {
+                            await new Promise((resolve) => setTimeout(resolve, 1000));
+                            ({ data: job } = await axios.get(`/automation/jobs/token/${job.job_token}`));
+                          }
 
-                          if (response.data.success) {
+                          const result = job.result || {};
+                          if (job.status === 'queued' || job.status === 'processing') {
+                            alert(`The submission is still in the queue and will finish in the background (job #${job.job_id}).`);
+                            setShowAutomation(false);
+                          } else if (job.status === 'success') {
                             setAutomationCompleted(true);
                             setAutomationResult({
                               success: true,
-                              applicationNumber: response.data.application_number,
-                              message: response.data.message,
-                              estimatedTime: response.data.estimated_processing_time || '5-10 business days',
-                              trackingUrl: response.data.tracking_url
+                              applicationNumber: job.confirmation_number,
+                              message: result.message,
+                              estimatedTime: result.estimated_processing_time || '5-10 business days',
+                              trackingUrl: result.tracking_url
                             });
+                          } else if (job.status === 'retry') {
+                            alert(`The portal did not accept the submission yet; it will be retried automatically (job #${job.job_id}).`);
+                            setShowAutomation(false);
                           } else {
-                            alert('Automation failed: ' + response.data.message);
+                            alert('Automation failed: ' + job.error_message);
                             setShowAutomation(false);
                           }
                         } catch (error) {
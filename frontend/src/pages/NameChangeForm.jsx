@@ -184,8 +184,8 @@ const NameChangeForm = () => {
       // Special handling for Torrent Power - RPA automation
       if (selectedSupplier.id === 'torrent-power') {
         try {
-          // Call Torrent Power RPA automation
-          const rpaResponse = await api.post('/automation/torrent-power/name-change', {
+          // Queue the Torrent Power RPA job, then poll it until a worker finishes
+          let { data: job } = await api.post('/automation/torrent-power/name-change', {
             city: formData.city || 'Ahmedabad',
             serviceNumber: formData.service_number || formData.serviceNumber || '',
             tNumber: formData.t_no || formData.tNumber || 'NA',
@@ -193,10 +193,21 @@ const NameChangeForm = () => {
             email: formData.email || '',
             confirmEmail: formData.confirm_email || formData.confirmEmail || formData.email || ''
           });
+          // Give up waiting after two minutes; the job itself stays queued
+          for (let polls = 0; polls < 120 && (job.status === 'queued' || job.status === 'processing'); polls++) {
+            await new Promise((resolve) => setTimeout(resolve, 1000));
+            ({ data: job } = await api.get(`/automation/jobs/token/${job.job_token}`));
+          }
 
-          if (rpaResponse.data.success) {
+          if (job.status === 'queued' || job.status === 'processing') {
+            setStep(3);
+            setMessage(`Application saved. Torrent Power automation is still in the queue and will finish in the background (job #${job.job_id}).`);
+          } else if (job.status === 'success') {
+            setStep(3);
+            setMessage(`Torrent Power automation completed. ${job.result?.message || ''}`);
+          } else if (job.status === 'retry') {
             setStep(3);
-            setMessage(`Torrent Power automation completed. ${rpaResponse.data.message}`);
+            setMessage(`Application saved. Torrent Power did not accept it yet; it will be retried automatically (job #${job.job_id}).`);
           } else {
             // If RPA fails, open Torrent Power website directly
             window.open(selectedSupplier.nameChangeUrl || selectedSupplier.portal, '_blank');